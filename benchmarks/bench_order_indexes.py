@@ -0,0 +1,130 @@
+# benchmarks/bench_order_indexes.py
+# Индексы заказов (миграции 0006/0007): методы сервисов без индексов и с индексами
+# Запуск: python -m benchmarks.bench_order_indexes --orders 1000000
+import argparse
+import itertools
+
+from sqlalchemy import text
+
+from database import SessionLocal, engine
+from migrations import MIGRATIONS, apply_migrations
+from models import Order
+from auth_service import AuthService
+from order_service import OrderService
+from product_service import ProductService, PAGE_SIZE
+from benchmarks.common import (BENCH_ARTICLE_PREFIX, BENCH_LOGIN_PREFIX, measure, print_table,
+                               generate_products, generate_orders, remove_generated_orders,
+                               remove_generated_products)
+
+# Индексы, которые снимаются для замера "до"
+INDEX_MIGRATIONS = ("0006_order_items_order_product_unique", "0007_orders_lookup_indexes")
+INDEX_NAMES = ["ux_order_items_order_product", "ix_order_items_product_article",
+               "ix_orders_user_id", "ix_orders_pickup_point_id", "ix_orders_order_date",
+               "ix_orders_status", "ix_users_login"]
+
+
+def index_statements():
+    statements = []
+    for name, migration in MIGRATIONS:
+        if name in INDEX_MIGRATIONS:
+            statements.extend(s for s in migration if "CREATE UNIQUE INDEX" in s or "CREATE INDEX" in s)
+    return statements
+
+
+def drop_indexes():
+    with engine.begin() as conn:
+        for name in INDEX_NAMES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        conn.execute(text("ANALYZE orders"))
+        conn.execute(text("ANALYZE order_items"))
+
+
+def create_indexes():
+    with engine.begin() as conn:
+        for statement in index_statements():
+            conn.execute(text(statement))
+        conn.execute(text("ANALYZE orders"))
+        conn.execute(text("ANALYZE order_items"))
+
+
+def orders_page(**filters):
+    """Первая страница списка заказов (ORDER BY order_date, как в окне заказов)"""
+    db = SessionLocal()
+    try:
+        query = db.query(Order)
+        for field, value in filters.items():
+            query = query.filter(getattr(Order, field) == value)
+        return query.order_by(Order.order_date.desc(), Order.id.desc()).limit(PAGE_SIZE).all()
+    finally:
+        db.close()
+
+
+def sample(sql, limit):
+    with engine.connect() as conn:
+        return [row[0] for row in conn.execute(text(sql + " LIMIT :limit"), {"limit": limit})]
+
+
+def run_cases(repeat, order_ids, deletable_ids, user_id, pickup_point_id):
+    """Замеры методов сервисов: {название: мс}"""
+    login = f"{BENCH_LOGIN_PREFIX}00001"
+    order_cycle = itertools.cycle(order_ids)
+    return {
+        "AuthService.authenticate": measure(lambda: AuthService.authenticate(login, "bench"), repeat),
+        "ProductService.can_delete_product": measure(
+            lambda: ProductService.can_delete_product(f"{BENCH_ARTICLE_PREFIX}-NONE"), repeat),
+        "OrderService.get_order_items": measure(
+            lambda: OrderService.get_order_items(next(order_cycle)), repeat),
+        # Каждый вызов удаляет очередной синтетический заказ
+        "OrderService.delete_order": measure(
+            lambda: OrderService.delete_order(next(deletable_ids)), repeat),
+        "список заказов, ORDER BY order_date": measure(orders_page, repeat),
+        "заказы со статусом": measure(lambda: orders_page(status="отменен"), repeat),
+        "заказы клиента": measure(lambda: orders_page(user_id=user_id), repeat),
+        "заказы пункта выдачи": measure(lambda: orders_page(pickup_point_id=pickup_point_id), repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер индексов заказов")
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="не удалять синтетические данные")
+    args = parser.parse_args()
+
+    engine.echo = False
+    apply_migrations()
+
+    try:
+        generate_products(args.products)
+        generate_orders(args.orders, args.products)
+
+        order_ids = sample("SELECT id FROM orders ORDER BY random()", 100)
+        deletable_ids = iter(sample("SELECT id FROM orders ORDER BY id DESC", 2 * (args.repeat + 1)))
+        user_id = sample(f"SELECT id FROM users WHERE login = '{BENCH_LOGIN_PREFIX}00001'", 1)[0]
+        pickup_point_id = sample("SELECT pickup_point_id FROM orders WHERE pickup_point_id IS NOT NULL", 1)[0]
+
+        print("\n⏱️ Замер с индексами...")
+        indexed = run_cases(args.repeat, order_ids, deletable_ids, user_id, pickup_point_id)
+
+        print("⏱️ Замер без индексов...")
+        drop_indexes()
+        try:
+            plain = run_cases(args.repeat, order_ids, deletable_ids, user_id, pickup_point_id)
+        finally:
+            create_indexes()
+
+        print_table(
+            f"Методы сервисов, {args.orders} синтетических заказов (медиана, мс)",
+            ["метод", "без индексов", "с индексами", "ускорение"],
+            [(name, f"{plain[name]:.1f}", f"{indexed[name]:.1f}", f"{plain[name] / indexed[name]:.1f}x")
+             for name in indexed]
+        )
+    finally:
+        if not args.keep:
+            remove_generated_orders()
+            remove_generated_products()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/bench_order_loading.py
+# Загрузка списка заказов: прежний joinedload (заказ x товары x продукт) против
+# load_only + selectinload (OrderService.list_options)
+# Считаются строки, пришедшие из БД, число запросов и созданных ORM-объектов.
+# Запуск: python -m benchmarks.bench_order_loading --orders 100000
+import argparse
+
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload
+
+from database import SessionLocal, engine
+from migrations import apply_migrations
+from models import Order, OrderItem
+from order_service import OrderService
+from benchmarks.common import (measure, print_table, generate_products, generate_orders,
+                               remove_generated_orders, remove_generated_products)
+
+
+class RowCounter:
+    """Число запросов и строк результата (rowcount курсора psycopg2 для SELECT)"""
+
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+
+    def __enter__(self):
+        event.listen(engine, "after_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "after_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements += 1
+        self.rows += max(cursor.rowcount, 0)
+
+
+def legacy_orders(db):
+    """Прежний get_all_orders"""
+    return db.query(Order)\
+        .options(
+            joinedload(Order.user),
+            joinedload(Order.pickup_point),
+            joinedload(Order.order_items).joinedload(OrderItem.product)
+        )\
+        .order_by(Order.order_date.desc())\
+        .all()
+
+
+def selectin_orders(db):
+    """Текущий get_all_orders"""
+    return db.query(Order)\
+        .options(*OrderService.list_options())\
+        .order_by(Order.order_date.desc())\
+        .all()
+
+
+def load(query):
+    """(заказов, ORM-объектов в сессии) для одного способа загрузки"""
+    db = SessionLocal()
+    try:
+        orders = query(db)
+        return len(orders), len(db.identity_map)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер загрузки списка заказов")
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--keep", action="store_true", help="не удалять синтетические данные")
+    args = parser.parse_args()
+
+    engine.echo = False
+    apply_migrations()
+
+    try:
+        generate_products(args.products)
+        generate_orders(args.orders, args.products)
+
+        results = []
+        for title, query in [("joinedload (прежний)", legacy_orders),
+                             ("load_only + selectinload", selectin_orders)]:
+            with RowCounter() as counter:
+                orders, objects = load(query)
+            elapsed_ms = measure(lambda: load(query), args.repeat)
+            results.append((title, orders, counter.statements, counter.rows, objects, f"{elapsed_ms:.0f}"))
+
+        print_table(
+            f"Список заказов, {args.orders} синтетических заказов",
+            ["способ", "заказов", "запросов", "строк из БД", "ORM-объектов", "время, мс"],
+            results
+        )
+    finally:
+        if not args.keep:
+            remove_generated_orders()
+            remove_generated_products()
+
+
+if __name__ == "__main__":
+    main()
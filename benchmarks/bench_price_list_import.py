@@ -0,0 +1,85 @@
+# benchmarks/bench_price_list_import.py
+# Загрузка прайс-листа: COPY во временную таблицу + INSERT ... ON CONFLICT
+# (первая загрузка, повторная без изменений, повторная с новыми ценами)
+# Запуск: python -m benchmarks.bench_price_list_import --rows 100000
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from database import engine
+from migrations import apply_migrations
+from price_list_service import PriceListService
+from benchmarks.common import (BENCH_ARTICLE_PREFIX, CATEGORIES, MANUFACTURERS, SUPPLIERS,
+                               print_table, remove_generated_products)
+
+
+def write_price_list(path, rows, price_shift=0):
+    """Синтетический прайс-лист с русскими заголовками"""
+    with open(path, "w", encoding="utf-8-sig", newline="") as target:
+        writer = csv.writer(target, delimiter=";")
+        writer.writerow(["Артикул", "Наименование", "Ед. изм.", "Цена", "Поставщик",
+                         "Производитель", "Категория", "Скидка", "Кол-во на складе", "Описание"])
+        for g in range(1, rows + 1):
+            writer.writerow([
+                f"{BENCH_ARTICLE_PREFIX}{g:08d}",
+                f"{CATEGORIES[g % len(CATEGORIES)]} модель {g}",
+                "шт.",
+                f"{500 + g % 14500 + price_shift},50",
+                SUPPLIERS[(g // 7) % len(SUPPLIERS)],
+                MANUFACTURERS[(g // 11) % len(MANUFACTURERS)],
+                CATEGORIES[g % len(CATEGORIES)],
+                f"{g % 30}%",
+                g % 50,
+                f"Описание товара {g}",
+            ])
+
+
+def timed_import(path):
+    started = time.perf_counter()
+    report = PriceListService.import_price_list(path)
+    return report, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер загрузки прайс-листа")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--keep", action="store_true", help="не удалять синтетические товары")
+    args = parser.parse_args()
+
+    engine.echo = False
+    apply_migrations()
+
+    workdir = tempfile.mkdtemp(prefix="price_list_")
+    first_path = os.path.join(workdir, "price_list.csv")
+    changed_path = os.path.join(workdir, "price_list_changed.csv")
+    try:
+        remove_generated_products()
+        write_price_list(first_path, args.rows)
+        write_price_list(changed_path, args.rows, price_shift=100)
+
+        results = []
+        for title, path in [("первая загрузка", first_path),
+                            ("повторная, без изменений", first_path),
+                            ("повторная, новые цены", changed_path)]:
+            report, seconds = timed_import(path)
+            results.append((title, report['inserted'], report['updated'], report['unchanged'],
+                            report['rejected'], f"{seconds:.2f}", f"{args.rows / seconds:.0f}"))
+
+        print_table(
+            f"Загрузка прайс-листа, {args.rows} строк",
+            ["загрузка", "добавлено", "обновлено", "без изменений", "отклонено", "время, с", "строк/с"],
+            results
+        )
+    finally:
+        for path in (first_path, changed_path):
+            if os.path.exists(path):
+                os.remove(path)
+        os.rmdir(workdir)
+        if not args.keep:
+            remove_generated_products()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/bench_product_search.py
+# Поиск товаров: прежняя цепочка ilike по 6 столбцам против search_text с GIN-индексом pg_trgm
+# Запуск: python -m benchmarks.bench_product_search --rows 100000 1000000
+import argparse
+
+from sqlalchemy import func, or_
+
+from database import SessionLocal, engine
+from migrations import apply_migrations
+from models import Product
+from product_service import ProductService
+from benchmarks.common import (measure, print_table, generate_products,
+                               remove_generated_products)
+
+QUERIES = [
+    "кроссовки",
+    "nike мужские",
+    "ботинки kari зимние",
+    "3f9a",
+    "bench0000123",
+]
+
+
+def _words(search_text):
+    return [word for word in search_text.split() if word]
+
+
+def legacy_count(search_text):
+    """Прежний фильтр: ilike по каждому из 6 столбцов для каждого слова"""
+    db = SessionLocal()
+    try:
+        query = db.query(func.count(Product.article))
+        for word in _words(search_text):
+            query = query.filter(or_(
+                Product.name.ilike(f"%{word}%"),
+                Product.description.ilike(f"%{word}%"),
+                Product.category.ilike(f"%{word}%"),
+                Product.manufacturer.ilike(f"%{word}%"),
+                Product.supplier.ilike(f"%{word}%"),
+                Product.article.ilike(f"%{word}%")
+            ))
+        return query.scalar()
+    finally:
+        db.close()
+
+
+def indexed_count(search_text):
+    """Новый фильтр: одно условие на слово по индексированному search_text"""
+    db = SessionLocal()
+    try:
+        query = db.query(func.count(Product.article))
+        for word in _words(search_text):
+            query = query.filter(Product.search_text.ilike(f"%{word}%"))
+        return query.scalar()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер поиска товаров")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="не удалять синтетические товары")
+    args = parser.parse_args()
+
+    engine.echo = False
+    apply_migrations()
+
+    try:
+        for rows in sorted(args.rows):
+            generate_products(rows)
+            results = []
+            for search_text in QUERIES:
+                found = indexed_count(search_text)
+                legacy_ms = measure(lambda: legacy_count(search_text), args.repeat)
+                indexed_ms = measure(lambda: indexed_count(search_text), args.repeat)
+                service_ms = measure(
+                    lambda: ProductService.get_products_with_filters(search_text=search_text),
+                    args.repeat
+                )
+                results.append((search_text, found, f"{legacy_ms:.1f}", f"{indexed_ms:.1f}",
+                                f"{legacy_ms / indexed_ms:.1f}x", f"{service_ms:.1f}"))
+            print_table(
+                f"Поиск товаров, {rows} синтетических строк (медиана, мс)",
+                ["запрос", "найдено", "ilike x6", "search_text", "ускорение", "сервис целиком"],
+                results
+            )
+    finally:
+        if not args.keep:
+            remove_generated_products()
+
+
+if __name__ == "__main__":
+    main()
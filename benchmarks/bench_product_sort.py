@@ -0,0 +1,133 @@
+# benchmarks/bench_product_sort.py
+# Сортировка и фильтр по поставщику: SQL (ORDER BY по индексам) против столбцового снимка NumPy
+# Перед замером проверяется, что снимок фильтрует по цене со скидкой так же, как SQL.
+# Запуск: python -m benchmarks.bench_product_sort --rows 1000000
+import argparse
+import time
+
+from sqlalchemy import text
+
+from database import SessionLocal, engine
+from migrations import apply_migrations
+from models import Product
+from product_service import ProductService, PAGE_SIZE
+from catalog_columns import COLUMN_SORT_KEYS, ColumnarCatalog, numpy_available
+from benchmarks.common import (BENCH_ARTICLE_PREFIX, SUPPLIERS, measure, print_table,
+                               generate_products, remove_generated_products)
+
+# Граничные товары: цены, у которых округление float и numeric (половина вверх) расходятся
+EDGE_ARTICLE_PREFIX = f"{BENCH_ARTICLE_PREFIX}EDGE"
+EDGE_DISCOUNTS = [10, 25, 50, 75, 90]
+EDGE_MAX_CENTS = 200
+
+
+def sql_articles(sort_by, supplier_filter="", limit=None):
+    """Артикулы в порядке сортировки средствами PostgreSQL (все или первая страница)"""
+    db = SessionLocal()
+    try:
+        sort_expr, direction = ProductService._sort_key(sort_by)
+        query = db.query(Product.article)
+        if supplier_filter:
+            query = query.filter(Product.supplier == supplier_filter)
+        if direction == "asc":
+            query = query.order_by(sort_expr.asc(), Product.article.asc())
+        else:
+            query = query.order_by(sort_expr.desc(), Product.article.desc())
+        if limit:
+            query = query.limit(limit)
+        return [row[0] for row in query.all()]
+    finally:
+        db.close()
+
+
+def edge_articles_sql(**filters):
+    """Артикулы граничных товаров, прошедших фильтры ProductService, в порядке final_price"""
+    db = SessionLocal()
+    try:
+        query = db.query(Product.article).filter(Product.article.like(f"{EDGE_ARTICLE_PREFIX}%"))
+        query = ProductService._apply_value_filters(query, **filters)
+        return [row[0] for row in query.order_by(Product.final_price.asc(), Product.article.asc())]
+    finally:
+        db.close()
+
+
+def check_final_price_filters():
+    """Фильтр по цене со скидкой и сортировка final_price в снимке совпадают с SQL
+    на граничных значениях. Возвращает число расхождений."""
+    edge_rows = [{"article": f"{EDGE_ARTICLE_PREFIX}{cents:03d}_{discount}",
+                  "price": cents / 100, "discount": discount}
+                 for cents in range(1, EDGE_MAX_CENTS + 1) for discount in EDGE_DISCOUNTS]
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO products (article, name, unit, price, discount, stock_quantity)
+            VALUES (:article, 'Граничная цена', 'шт.', :price, :discount, 1)
+            ON CONFLICT (article) DO NOTHING
+        """), edge_rows)
+    try:
+        columns = ColumnarCatalog.from_database()
+        rows = columns.rows_for(row["article"] for row in edge_rows)
+        bounds = sorted({float(price) for price in columns.final_price[rows]})
+
+        mismatches = 0
+        for bound in bounds:
+            for filters in ({"min_price": bound}, {"max_price": bound}):
+                expected = edge_articles_sql(**filters)
+                actual = list(columns.sorted_articles("final_price_asc", rows, **filters))
+                if actual != expected:
+                    mismatches += 1
+                    print(f"   ⚠️ {filters}: снимок {len(actual)}, SQL {len(expected)} товаров")
+        print(f"{'✅' if not mismatches else '❌'} Фильтр по цене со скидкой: "
+              f"{len(bounds)} границ, расхождений с SQL: {mismatches}")
+        return mismatches
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM products WHERE article LIKE :prefix"),
+                         {"prefix": f"{EDGE_ARTICLE_PREFIX}%"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер сортировки каталога")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="не удалять синтетические товары")
+    args = parser.parse_args()
+
+    if not numpy_available():
+        print("❌ Для замера нужен numpy (pip install numpy)")
+        return
+
+    engine.echo = False
+    apply_migrations()
+
+    try:
+        if check_final_price_filters():
+            return
+
+        for rows in sorted(args.rows):
+            generate_products(rows)
+
+            started = time.perf_counter()
+            columns = ColumnarCatalog.from_database()
+            snapshot_ms = (time.perf_counter() - started) * 1000
+            print(f"\n📦 Снимок каталога: {len(columns)} строк за {snapshot_ms:.0f} мс")
+
+            results = []
+            for supplier in ["", SUPPLIERS[0]]:
+                for sort_by in COLUMN_SORT_KEYS:
+                    sql_page_ms = measure(lambda: sql_articles(sort_by, supplier, PAGE_SIZE), args.repeat)
+                    sql_all_ms = measure(lambda: sql_articles(sort_by, supplier), args.repeat)
+                    numpy_ms = measure(lambda: columns.order(sort_by, supplier_filter=supplier), args.repeat)
+                    results.append((sort_by, supplier or "все", f"{sql_page_ms:.1f}", f"{sql_all_ms:.1f}",
+                                    f"{numpy_ms:.1f}", f"{sql_all_ms / numpy_ms:.1f}x"))
+            print_table(
+                f"Сортировка каталога, {rows} синтетических строк (медиана, мс)",
+                ["сортировка", "поставщик", "SQL страница", "SQL весь порядок", "NumPy", "ускорение"],
+                results
+            )
+    finally:
+        if not args.keep:
+            remove_generated_products()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+# benchmarks/common.py - общие функции для замеров производительности
+# ВНИМАНИЕ: генераторы добавляют синтетические данные в БД из .env,
+# поэтому замеры лучше запускать на отдельной базе (DB_NAME=shoe_shop_bench)
+import statistics
+import time
+
+from sqlalchemy import text
+
+from database import engine
+from order_service import ORDER_STATUSES
+
+# Артикулы синтетических товаров: BENCH00000001 ...
+BENCH_ARTICLE_PREFIX = "BENCH"
+
+CATEGORIES = ["Кроссовки", "Туфли", "Ботинки", "Сапоги", "Тапочки",
+              "Сандалии", "Мокасины", "Босоножки", "Слипоны"]
+MANUFACTURERS = ["Nike", "Adidas", "Reebok", "Puma", "New Balance",
+                 "Geox", "Ecco", "Clarks", "Salomon", "Timberland"]
+SUPPLIERS = ["Kari", "Обувь для вас", "ОбувьОпт", "СпортМастер", "ТД Башмачок"]
+ADJECTIVES = ["мужские", "женские", "детские", "зимние", "летние", "демисезонные"]
+
+
+def _sql_array(values):
+    return "ARRAY[" + ", ".join("'" + v.replace("'", "''") + "'" for v in values) + "]"
+
+
+def measure(func, repeat=5):
+    """Медианное время выполнения func в миллисекундах (после одного прогрева)"""
+    func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def print_table(title, header, rows):
+    """Печать результатов замера в виде таблицы"""
+    widths = [max(len(str(value)) for value in column) for column in zip(header, *rows)]
+    print(f"\n=== {title} ===")
+    print(" | ".join(str(value).ljust(width) for value, width in zip(header, widths)))
+    print("-+-".join("-" * width for width in widths))
+    for row in rows:
+        print(" | ".join(str(value).ljust(width) for value, width in zip(row, widths)))
+
+
+def count_generated_products():
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT count(*) FROM products WHERE article LIKE :prefix"),
+            {"prefix": f"{BENCH_ARTICLE_PREFIX}%"}
+        ).scalar()
+
+
+def generate_products(total, chunk_size=100000):
+    """Дополняет products синтетическими товарами до total штук (генерация на стороне БД)"""
+    existing = count_generated_products()
+    start = existing + 1
+    while start <= total:
+        stop = min(start + chunk_size - 1, total)
+        with engine.begin() as conn:
+            conn.execute(text(f"""
+                INSERT INTO products (article, name, unit, price, supplier, manufacturer,
+                                      category, discount, stock_quantity, description)
+                SELECT '{BENCH_ARTICLE_PREFIX}' || lpad(g::text, 8, '0'),
+                       ({_sql_array(CATEGORIES)})[1 + g % {len(CATEGORIES)}] || ' ' ||
+                       ({_sql_array(ADJECTIVES)})[1 + (g / 3) % {len(ADJECTIVES)}] || ' ' ||
+                       left(md5(g::text), 8),
+                       'шт.',
+                       round((500 + random() * 14500)::numeric, 2),
+                       ({_sql_array(SUPPLIERS)})[1 + (g / 7) % {len(SUPPLIERS)}],
+                       ({_sql_array(MANUFACTURERS)})[1 + (g / 11) % {len(MANUFACTURERS)}],
+                       ({_sql_array(CATEGORIES)})[1 + g % {len(CATEGORIES)}],
+                       g % 30,
+                       g % 50,
+                       'Описание ' || md5((g * 7)::text) || ' ' || md5((g * 13)::text)
+                FROM generate_series(:start, :stop) AS g
+                ON CONFLICT (article) DO NOTHING
+            """), {"start": start, "stop": stop})
+        print(f"   📦 Сгенерировано товаров: {stop}")
+        start = stop + 1
+
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE products"))
+
+
+def remove_generated_products():
+    """Удаляет синтетические товары (и строки заказов, которые на них ссылаются)"""
+    with engine.begin() as conn:
+        conn.execute(
+            text("DELETE FROM order_items WHERE product_article LIKE :prefix"),
+            {"prefix": f"{BENCH_ARTICLE_PREFIX}%"}
+        )
+        conn.execute(
+            text("DELETE FROM products WHERE article LIKE :prefix"),
+            {"prefix": f"{BENCH_ARTICLE_PREFIX}%"}
+        )
+
+
+# Синтетические заказы принадлежат пользователям bench_user_00001 ... и
+# пунктам выдачи "BENCH пункт выдачи N" - по ним же и удаляются
+BENCH_LOGIN_PREFIX = "bench_user_"
+BENCH_PICKUP_PREFIX = "BENCH пункт выдачи"
+
+
+def count_generated_orders():
+    with engine.connect() as conn:
+        return conn.execute(text("""
+            SELECT count(*) FROM orders JOIN users ON users.id = orders.user_id
+            WHERE users.login LIKE :prefix
+        """), {"prefix": f"{BENCH_LOGIN_PREFIX}%"}).scalar()
+
+
+def generate_orders(total, products, users=1000, pickup_points=50, items_per_order=3,
+                    chunk_size=100000):
+    """Дополняет orders синтетическими заказами до total штук; у каждого заказа
+    items_per_order строк с синтетическими товарами (их должно быть products штук,
+    см. generate_products)"""
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO users (role, full_name, login, password)
+            SELECT 'клиент', 'Тестовый клиент ' || g, :prefix || lpad(g::text, 5, '0'), 'bench'
+            FROM generate_series(1, :users) AS g
+            WHERE NOT EXISTS (
+                SELECT 1 FROM users WHERE login = :prefix || lpad(g::text, 5, '0')
+            )
+        """), {"prefix": BENCH_LOGIN_PREFIX, "users": users})
+        conn.execute(text("""
+            INSERT INTO pickup_points (address)
+            SELECT :prefix || ' ' || g
+            FROM generate_series(1, :points) AS g
+            WHERE NOT EXISTS (
+                SELECT 1 FROM pickup_points WHERE address = :prefix || ' ' || g
+            )
+        """), {"prefix": BENCH_PICKUP_PREFIX, "points": pickup_points})
+
+    start = count_generated_orders() + 1
+    while start <= total:
+        stop = min(start + chunk_size - 1, total)
+        with engine.begin() as conn:
+            # Заказы и их строки - одним запросом: строки берут id из RETURNING
+            conn.execute(text(f"""
+                WITH bench_users AS (
+                    SELECT array_agg(id ORDER BY id) AS ids FROM users WHERE login LIKE :login_prefix
+                ), bench_points AS (
+                    SELECT array_agg(id ORDER BY id) AS ids FROM pickup_points
+                    WHERE address LIKE :pickup_prefix
+                ), new_orders AS (
+                    INSERT INTO orders (user_id, order_date, delivery_date, pickup_point_id,
+                                        receive_code, status)
+                    SELECT bench_users.ids[1 + g % array_length(bench_users.ids, 1)],
+                           now() - make_interval(days => g % 730, secs => g % 86400),
+                           now() - make_interval(days => g % 730 - 3),
+                           bench_points.ids[1 + (g / 3) % array_length(bench_points.ids, 1)],
+                           100 + g % 900,
+                           ({_sql_array(ORDER_STATUSES)})[1 + (g / 5) % {len(ORDER_STATUSES)}]
+                    FROM generate_series(:start, :stop) AS g, bench_users, bench_points
+                    RETURNING id
+                )
+                INSERT INTO order_items (order_id, product_article, quantity)
+                SELECT new_orders.id,
+                       '{BENCH_ARTICLE_PREFIX}' || lpad((1 + (new_orders.id * 7919 + item * 104729)
+                                                        % :products)::text, 8, '0'),
+                       1 + item
+                FROM new_orders, generate_series(0, :items - 1) AS item
+                ON CONFLICT DO NOTHING
+            """), {"login_prefix": f"{BENCH_LOGIN_PREFIX}%", "pickup_prefix": f"{BENCH_PICKUP_PREFIX}%",
+                   "start": start, "stop": stop, "products": products, "items": items_per_order})
+        print(f"   🧾 Сгенерировано заказов: {stop}")
+        start = stop + 1
+
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE orders"))
+        conn.execute(text("ANALYZE order_items"))
+
+
+def remove_generated_orders():
+    """Удаляет синтетические заказы с их строками, пользователей и пункты выдачи"""
+    with engine.begin() as conn:
+        bench_orders = """
+            SELECT orders.id FROM orders JOIN users ON users.id = orders.user_id
+            WHERE users.login LIKE :login_prefix
+        """
+        params = {"login_prefix": f"{BENCH_LOGIN_PREFIX}%"}
+        conn.execute(text(f"DELETE FROM order_items WHERE order_id IN ({bench_orders})"), params)
+        conn.execute(text(f"DELETE FROM orders WHERE id IN ({bench_orders})"), params)
+        conn.execute(text("DELETE FROM users WHERE login LIKE :login_prefix"), params)
+        conn.execute(
+            text("""
+                DELETE FROM pickup_points WHERE address LIKE :pickup_prefix
+                AND NOT EXISTS (SELECT 1 FROM orders WHERE orders.pickup_point_id = pickup_points.id)
+            """),
+            {"pickup_prefix": f"{BENCH_PICKUP_PREFIX}%"}
+        )
@@ -0,0 +1,171 @@
+# catalog_columns.py - столбцовый снимок каталога для фильтрации и сортировки в памяти
+# Числовые поля хранятся массивами NumPy, поставщики - целочисленными кодами,
+# названия и артикулы - рангами сортировки, посчитанными в PostgreSQL (порядок строк
+# в правилах сортировки БД, как у ORDER BY в SQL). Фильтр - векторная маска,
+# сортировка - np.lexsort по ключу и рангу артикула (как ORDER BY ключ, article).
+# NumPy - необязательная зависимость: без нее снимок недоступен (numpy_available()).
+from decimal import Decimal, ROUND_HALF_UP
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - зависит от окружения
+    np = None
+
+from sqlalchemy import func
+
+from database import SessionLocal
+from models import Product
+
+# Ключ сортировки -> (столбец снимка, по убыванию); ключи как в PRODUCT_SORT_KEYS
+COLUMN_SORT_KEYS = {
+    "name_asc": ("name_rank", False),
+    "name_desc": ("name_rank", True),
+    "price_asc": ("price", False),
+    "price_desc": ("price", True),
+    "stock_quantity_asc": ("stock_quantity", False),
+    "stock_quantity_desc": ("stock_quantity", True),
+    "final_price_asc": ("final_price", False),
+    "final_price_desc": ("final_price", True),
+}
+
+
+def numpy_available():
+    return np is not None
+
+
+def final_price_value(price, discount, final_price=None):
+    """Цена со скидкой: посчитанная БД (Product.final_price), а если ее нет -
+    так же, как PRODUCT_FINAL_PRICE_SQL (numeric, округление половины вверх)"""
+    if final_price is None:
+        final_price = (Decimal(str(price or 0)) * (100 - (discount or 0)) / 100).quantize(
+            Decimal("0.01"), rounding=ROUND_HALF_UP)
+    return float(final_price)
+
+
+# Ранг товара, которого не было в БД при подсчете рангов (в конец списка)
+UNRANKED = 2 ** 62
+
+
+def _rank_columns():
+    """Ранги в правилах сортировки БД: название (как PRODUCT_SORT_KEYS["name_*"],
+    при равенстве - артикул) и артикул"""
+    name_rank = func.row_number().over(order_by=(func.coalesce(Product.name, ""), Product.article))
+    article_rank = func.row_number().over(order_by=Product.article)
+    return name_rank, article_rank
+
+
+def sort_ranks():
+    """Ранги сортировки всех товаров: {артикул: (ранг названия, ранг артикула)}"""
+    db = SessionLocal()
+    try:
+        rows = db.query(Product.article, *_rank_columns())
+        return {article: (name_rank, article_rank) for article, name_rank, article_rank in rows}
+    finally:
+        db.close()
+
+
+class ColumnarCatalog:
+    """Снимок каталога по столбцам (строка снимка = товар)"""
+
+    def __init__(self, articles, prices, discounts, stock_quantities, suppliers, final_prices,
+                 name_ranks, article_ranks, products=None):
+        if np is None:
+            raise RuntimeError("Для столбцового снимка каталога нужен пакет numpy")
+
+        self.articles = np.array(articles, dtype=object)
+        self.products = products  # Объекты Product в том же порядке (если снимок из списка товаров)
+        self.price = np.array([float(price or 0) for price in prices], dtype=np.float64)
+        self.discount = np.array([discount or 0 for discount in discounts], dtype=np.int32)
+        self.stock_quantity = np.array([quantity or 0 for quantity in stock_quantities], dtype=np.int32)
+        # Product.final_price из БД: пересчет во float округлял бы иначе, чем numeric в SQL
+        self.final_price = np.array([final_price_value(price, discount, final_price)
+                                     for price, discount, final_price in zip(prices, discounts, final_prices)],
+                                    dtype=np.float64)
+
+        # Поставщики: словарь названий + код для каждой строки
+        self.supplier_names, supplier_codes = np.unique(
+            np.array([supplier or "" for supplier in suppliers], dtype=object), return_inverse=True)
+        self.supplier_codes = supplier_codes.astype(np.int32)
+        self._supplier_index = {name: code for code, name in enumerate(self.supplier_names)}
+
+        self.name_rank = np.array(name_ranks, dtype=np.int64)
+        self.article_rank = np.array(article_ranks, dtype=np.int64)
+        self._positions = {article: row for row, article in enumerate(articles)}
+
+    def __len__(self):
+        return len(self.articles)
+
+    @classmethod
+    def from_products(cls, products, ranks):
+        """Снимок из объектов Product; ranks - sort_ranks() на момент их загрузки"""
+        products = list(products)
+        product_ranks = [ranks.get(product.article, (UNRANKED, UNRANKED)) for product in products]
+        return cls(
+            [product.article for product in products],
+            [product.price for product in products],
+            [product.discount for product in products],
+            [product.stock_quantity for product in products],
+            [product.supplier for product in products],
+            [product.final_price for product in products],
+            [name_rank for name_rank, _ in product_ranks],
+            [article_rank for _, article_rank in product_ranks],
+            products=products,
+        )
+
+    @classmethod
+    def from_database(cls, batch_size=50000):
+        """Снимок прямо из БД: читаются только нужные столбцы, без объектов Product"""
+        db = SessionLocal()
+        try:
+            rows = db.query(Product.article, Product.price, Product.discount,
+                            Product.stock_quantity, Product.supplier, Product.final_price,
+                            *_rank_columns()).yield_per(batch_size)
+            columns = list(zip(*rows)) or [()] * 8
+            return cls(*columns)
+        finally:
+            db.close()
+
+    def rows_for(self, articles):
+        """Номера строк снимка для набора артикулов"""
+        positions = self._positions
+        return np.fromiter((positions[article] for article in articles if article in positions),
+                           dtype=np.int64)
+
+    def mask(self, supplier_filter="", min_price=None, max_price=None, min_discount=None,
+             in_stock_only=False):
+        """Маска строк, прошедших фильтры (те же, что ProductService._apply_value_filters)"""
+        mask = np.ones(len(self), dtype=bool)
+        if supplier_filter and supplier_filter != "Все поставщики":
+            code = self._supplier_index.get(supplier_filter)
+            if code is None:
+                return np.zeros(len(self), dtype=bool)
+            mask &= self.supplier_codes == code
+        if min_price is not None:
+            mask &= self.final_price >= min_price
+        if max_price is not None:
+            mask &= self.final_price <= max_price
+        if min_discount:
+            mask &= self.discount >= min_discount
+        if in_stock_only:
+            mask &= self.stock_quantity > 0
+        return mask
+
+    def order(self, sort_by="name_asc", rows=None, **filters):
+        """Номера строк (из rows или всего снимка), прошедших фильтры, в порядке sort_by"""
+        mask = self.mask(**filters)
+        if rows is None:
+            rows = np.flatnonzero(mask)
+        else:
+            rows = np.asarray(rows, dtype=np.int64)
+            rows = rows[mask[rows]]
+
+        column, descending = COLUMN_SORT_KEYS.get(sort_by, COLUMN_SORT_KEYS["name_asc"])
+        key = getattr(self, column)[rows]
+        tiebreak = self.article_rank[rows]
+        if descending:
+            key, tiebreak = -key, -tiebreak
+        # lexsort: последний ключ - главный
+        return rows[np.lexsort((tiebreak, key))]
+
+    def sorted_articles(self, sort_by="name_asc", rows=None, **filters):
+        return self.articles[self.order(sort_by, rows, **filters)]
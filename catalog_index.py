@@ -0,0 +1,282 @@
+# catalog_index.py - поиск по каталогу в памяти (без запросов к PostgreSQL)
+# Инвертированный индекс: слово (токен) -> артикулы товаров, и триграммы -> токены.
+# Слово запроса ищется как подстрока токенов: кандидаты берутся из пересечения
+# списков по его триграммам, затем проверяются. Семантика та же, что у
+# ProductService.get_products_with_filters: все слова запроса (И), подстрока без
+# учета регистра в названии, описании, категории, производителе, поставщике, артикуле.
+import os
+import threading
+from collections import Counter, defaultdict
+
+from catalog_columns import ColumnarCatalog, UNRANKED, final_price_value, numpy_available, sort_ranks
+from product_service import ProductService, FACET_FIELDS
+
+# Индекс строится только для каталогов не больше этого размера (0 - не использовать,
+# по умолчанию поиск выполняется в БД)
+CATALOG_INDEX_MAX_PRODUCTS = int(os.getenv("CATALOG_INDEX_MAX_PRODUCTS", "0"))
+
+NGRAM_SIZE = 3
+
+# Ключи сортировки - как PRODUCT_SORT_KEYS в product_service (артикул - второй ключ).
+# Названия и артикулы сравниваются по рангам из БД (sort_ranks): порядок строк в Python
+# (casefold и т.п.) не совпадает с правилами сортировки PostgreSQL
+INDEX_SORT_KEYS = {
+    "name_asc": (lambda p, rank: rank[0], False),
+    "name_desc": (lambda p, rank: rank[0], True),
+    "price_asc": (lambda p, rank: float(p.price or 0), False),
+    "price_desc": (lambda p, rank: float(p.price or 0), True),
+    "stock_quantity_asc": (lambda p, rank: p.stock_quantity or 0, False),
+    "stock_quantity_desc": (lambda p, rank: p.stock_quantity or 0, True),
+    "final_price_asc": (lambda p, rank: product_final_price(p), False),
+    "final_price_desc": (lambda p, rank: product_final_price(p), True),
+}
+
+_shared_index = None
+_shared_lock = threading.Lock()
+
+
+def product_tokens(product):
+    """Токены товара: те же поля, что в Product.search_text, в нижнем регистре"""
+    fields = (product.name, product.description, product.category,
+              product.manufacturer, product.supplier, product.article)
+    return set(" ".join(field or "" for field in fields).lower().split())
+
+
+def product_final_price(product):
+    return final_price_value(product.price, product.discount, product.final_price)
+
+
+def matches_filters(product, supplier_filter="", min_price=None, max_price=None,
+                    min_discount=None, in_stock_only=False):
+    """Те же фильтры, что ProductService._apply_value_filters, для одного товара"""
+    if supplier_filter and supplier_filter != "Все поставщики" and product.supplier != supplier_filter:
+        return False
+    final_price = product_final_price(product)
+    if min_price is not None and final_price < min_price:
+        return False
+    if max_price is not None and final_price > max_price:
+        return False
+    if min_discount and (product.discount or 0) < min_discount:
+        return False
+    if in_stock_only and (product.stock_quantity or 0) <= 0:
+        return False
+    return True
+
+
+def ngrams(text):
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class CatalogIndex:
+    """Инвертированный индекс каталога с n-граммными списками для поиска подстрок"""
+
+    def __init__(self, products=(), version=None, ranks=None):
+        self._lock = threading.RLock()
+        self.version = version  # Версия каталога в БД, по которой построен индекс
+        self._ranks = ranks or {}  # артикул -> ранги сортировки в БД (sort_ranks)
+        self._products = {}                     # артикул -> товар
+        self._article_tokens = {}               # артикул -> токены товара
+        self._token_articles = defaultdict(set)  # токен -> артикулы
+        self._ngram_tokens = defaultdict(set)    # триграмма -> токены
+        self._columns = None  # Столбцовый снимок для фильтра и сортировки (строится лениво)
+        for product in products:
+            self.add(product)
+
+    def __len__(self):
+        return len(self._products)
+
+    # === Изменение индекса ===
+    def add(self, product):
+        """Добавление товара (или замена, если артикул уже есть)"""
+        with self._lock:
+            self.remove(product.article)
+            self._columns = None
+            tokens = product_tokens(product)
+            self._products[product.article] = product
+            self._article_tokens[product.article] = tokens
+            for token in tokens:
+                if token not in self._token_articles:
+                    for gram in ngrams(token):
+                        self._ngram_tokens[gram].add(token)
+                self._token_articles[token].add(product.article)
+
+    def remove(self, article):
+        with self._lock:
+            if self._products.pop(article, None) is None:
+                return
+            self._columns = None
+            for token in self._article_tokens.pop(article, ()):
+                articles = self._token_articles.get(token)
+                if articles is None:
+                    continue
+                articles.discard(article)
+                if not articles:
+                    # Токен больше не встречается - убираем его из n-граммных списков
+                    del self._token_articles[token]
+                    for gram in ngrams(token):
+                        tokens = self._ngram_tokens.get(gram)
+                        if tokens is not None:
+                            tokens.discard(token)
+                            if not tokens:
+                                del self._ngram_tokens[gram]
+
+    def reload(self, products, version=None, ranks=None):
+        """Полная замена содержимого индекса"""
+        with self._lock:
+            self.version = version
+            self._ranks = ranks or {}
+            self._products.clear()
+            self._article_tokens.clear()
+            self._token_articles.clear()
+            self._ngram_tokens.clear()
+            self._columns = None
+            for product in products:
+                self.add(product)
+
+    def on_product_changed(self, action, article, product):
+        """Слушатель изменений ProductService (created/updated/deleted/imported)"""
+        if action == "imported":
+            # После массовой загрузки товары перечитываются из БД целиком
+            self.reload(*self.load_catalog())
+            return
+        if action == "deleted" or product is None:
+            self.remove(article)
+            return
+        if article != product.article:
+            self.remove(article)
+        self.add(product)
+
+    @staticmethod
+    def load_catalog():
+        """(товары, версия каталога, ранги сортировки) для построения индекса.
+        Версия читается первой: изменение между запросами даст лишнее перечитывание,
+        но не устаревший индекс"""
+        version = ProductService.get_catalog_version()
+        return ProductService.get_all_products(), version, sort_ranks()
+
+    def is_current(self):
+        """Индекс соответствует БД: версия каталога не менялась с построения.
+        Изменения через слушатель тоже меняют версию - после них индекс перечитывается."""
+        return self.version is not None and ProductService.get_catalog_version() == self.version
+
+    # === Поиск ===
+    def _articles_for_word(self, word):
+        """Артикулы товаров, у которых word - подстрока хотя бы одного токена"""
+        if len(word) >= NGRAM_SIZE:
+            candidates = None
+            for gram in ngrams(word):
+                tokens = self._ngram_tokens.get(gram)
+                if not tokens:
+                    return set()
+                candidates = set(tokens) if candidates is None else candidates & tokens
+                if not candidates:
+                    return set()
+        else:
+            # Короткие слова проверяются по словарю токенов (он меньше каталога)
+            candidates = self._token_articles.keys()
+
+        articles = set()
+        for token in candidates:
+            if word in token:
+                articles |= self._token_articles[token]
+        return articles
+
+    def _columnar(self):
+        if self._columns is None:
+            self._columns = ColumnarCatalog.from_products(self._products.values(), self._ranks)
+        return self._columns
+
+    def _match_words(self, search_text):
+        """Артикулы товаров, содержащих все слова запроса (None - запрос пустой)"""
+        words = [word.lower() for word in (search_text or "").split()]
+        if not words:
+            return None
+        matched = None
+        # Сначала самое редкое слово: дальнейшие пересечения дешевле
+        for articles in sorted((self._articles_for_word(word) for word in words), key=len):
+            matched = articles if matched is None else matched & articles
+            if not matched:
+                break
+        return matched
+
+    def facets(self, search_text="", **filters):
+        """Фасеты как у ProductService.get_facets (фильтр по поставщику не учитывается)"""
+        filters.pop("supplier_filter", None)
+        counters = {field: Counter() for field in FACET_FIELDS}
+        with self._lock:
+            matched = self._match_words(search_text)
+            articles = self._products.keys() if matched is None else matched
+            for article in articles:
+                product = self._products[article]
+                if not matches_filters(product, **filters):
+                    continue
+                for field, counter in counters.items():
+                    value = getattr(product, field)
+                    if value:
+                        counter[value] += 1
+        return {field: sorted(counter.items()) for field, counter in counters.items()}
+
+    def search(self, search_text="", supplier_filter="", sort_by="name_asc", **filters):
+        """Товары, содержащие все слова запроса и прошедшие фильтры, в порядке sort_by"""
+        with self._lock:
+            matched = self._match_words(search_text)
+
+            if numpy_available():
+                # Фильтры и сортировка - векторно по столбцовому снимку
+                columns = self._columnar()
+                rows = None if matched is None else columns.rows_for(matched)
+                ordered = columns.order(sort_by, rows, supplier_filter=supplier_filter, **filters)
+                return [columns.products[row] for row in ordered]
+
+            if matched is not None:
+                products = [self._products[article] for article in matched]
+            else:
+                products = list(self._products.values())
+
+        products = [product for product in products
+                    if matches_filters(product, supplier_filter, **filters)]
+
+        key, reverse = INDEX_SORT_KEYS.get(sort_by, INDEX_SORT_KEYS["name_asc"])
+
+        def sort_key(product):
+            rank = self._ranks.get(product.article, (UNRANKED, UNRANKED))
+            return key(product, rank), rank[1]
+
+        products.sort(key=sort_key, reverse=reverse)
+        return products
+
+    # === Общий экземпляр ===
+    @classmethod
+    def shared(cls, max_products=CATALOG_INDEX_MAX_PRODUCTS):
+        """Индекс каталога на весь процесс (строится при первом вызове, далее
+        обновляется через слушатель ProductService). None - если индекс выключен
+        или каталог больше max_products.
+
+        Изменения из других процессов (import_products.py, другие клиенты) слушатель
+        не видит: если версия каталога в БД изменилась, индекс перечитывается."""
+        global _shared_index
+        if max_products <= 0:
+            return None
+        with _shared_lock:
+            version = ProductService.get_catalog_version()
+            if _shared_index is not None and _shared_index.version == version:
+                return _shared_index
+            if ProductService.count_products() > max_products:
+                if _shared_index is not None:
+                    ProductService.remove_change_listener(_shared_index.on_product_changed)
+                    _shared_index = None
+                return None
+
+            if _shared_index is not None:
+                print("🗂️ Каталог изменился - перечитываем индекс")
+                _shared_index.reload(*cls.load_catalog())
+                return _shared_index
+
+            print("🗂️ Строим индекс каталога в памяти...")
+            index = cls(*cls.load_catalog())
+            ProductService.add_change_listener(index.on_product_changed)
+            if numpy_available():
+                index._columnar()
+            print(f"🗂️ Индекс каталога готов: {len(index)} товаров")
+            _shared_index = index
+            return index
@@ -1,5 +1,7 @@
 import os
-from sqlalchemy import create_engine
+import threading
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.pool import StaticPool
 from dotenv import load_dotenv
@@ -27,6 +29,75 @@ engine = create_engine(
     pool_recycle=300
 )
 
+# Отмена выполняющихся запросов из другого потока (например, при новом поиске)
+class QueryCancelled(Exception):
+    """Запрос отменен до начала выполнения"""
+
+
+class QueryCancelToken:
+    """Токен отмены: хранит DBAPI-соединение, на котором сейчас идет запрос,
+    и по cancel() отправляет серверу PostgreSQL запрос на отмену (psycopg2 connection.cancel())"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connection = None
+        self.cancelled = False
+
+    def bind(self, dbapi_connection):
+        with self._lock:
+            if self.cancelled:
+                raise QueryCancelled("Запрос отменен")
+            self._connection = dbapi_connection
+
+    def unbind(self):
+        with self._lock:
+            self._connection = None
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            if self._connection is not None:
+                try:
+                    self._connection.cancel()
+                except Exception as e:
+                    print(f"Не удалось отменить запрос: {e}")
+
+
+_cancel_scope = threading.local()
+
+
+@contextmanager
+def cancellable(token):
+    """Все запросы текущего потока внутри блока можно прервать через token.cancel()"""
+    _cancel_scope.token = token
+    try:
+        yield token
+    finally:
+        _cancel_scope.token = None
+        token.unbind()
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _bind_cancel_token(conn, cursor, statement, parameters, context, executemany):
+    token = getattr(_cancel_scope, "token", None)
+    if token is not None:
+        token.bind(cursor.connection)
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _unbind_cancel_token(conn, cursor, statement, parameters, context, executemany):
+    token = getattr(_cancel_scope, "token", None)
+    if token is not None:
+        token.unbind()
+
+
+@event.listens_for(engine, "handle_error")
+def _unbind_cancel_token_on_error(exception_context):
+    # Соединение вернется в пул раньше выхода из cancellable(), отвязываем сразу
+    token = getattr(_cancel_scope, "token", None)
+    if token is not None:
+        token.unbind()
+
 # Создаем фабрику сессий
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
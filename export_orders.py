@@ -0,0 +1,52 @@
+# export_orders.py - выгрузка заказов с позициями для бухгалтерии (без графического интерфейса)
+# Запуск: python export_orders.py orders.csv --from 2025-01-01 --to 2025-03-31
+#         python export_orders.py orders.jsonl --status доставлен
+import argparse
+import sys
+from datetime import date
+
+from database import engine
+from migrations import apply_migrations
+from order_service import OrderService, EXPORT_FORMATS, EXPORT_BATCH_SIZE, ORDER_STATUSES
+
+
+def parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Дата должна быть в формате ГГГГ-ММ-ДД: {value}")
+
+
+def print_progress(done, total):
+    percent = done * 100 // total if total else 100
+    print(f"\r   📤 Выгружено заказов: {done} из {total} ({percent}%)", end="", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Выгрузка заказов в CSV или JSON Lines")
+    parser.add_argument("path", help="файл выгрузки (.csv или .jsonl)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="формат (по умолчанию - по расширению)")
+    parser.add_argument("--from", dest="date_from", type=parse_date, help="дата заказа с (включительно)")
+    parser.add_argument("--to", dest="date_to", type=parse_date, help="дата заказа по (включительно)")
+    parser.add_argument("--status", choices=ORDER_STATUSES, help="только заказы с этим статусом")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE,
+                        help="строк за одну выборку из БД")
+    args = parser.parse_args()
+
+    engine.echo = False
+    apply_migrations()
+
+    try:
+        rows = OrderService.export_orders(
+            args.path, args.format, progress=print_progress, batch_size=args.batch_size,
+            status=args.status, order_date_from=args.date_from, order_date_to=args.date_to
+        )
+    except Exception as e:
+        print(f"\n❌ Ошибка выгрузки заказов: {e}")
+        return 1
+    print()
+    return 0 if rows is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
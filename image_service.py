@@ -0,0 +1,138 @@
+# image_service.py - прием изображений товаров в каталог
+# Выбранный пользователем файл проверяется, уменьшается до IMAGE_MAX_SIZE,
+# перекодируется (JPEG, либо PNG при наличии прозрачности) и сохраняется
+# под именем из хэша содержимого: повторная загрузка того же файла не создает копию.
+import hashlib
+import os
+
+from PySide6.QtCore import Qt, QBuffer, QByteArray, QIODevice
+from PySide6.QtGui import QGuiApplication, QImageReader
+
+from thumbnail_cache import (CARD_THUMBNAIL_SIZE, EDIT_THUMBNAIL_SIZE, load_thumbnail_image,
+                             remove_disk_thumbnails)
+
+IMAGES_DIR = "resources/images"
+IMAGE_MAX_SIZE = int(os.getenv("IMAGE_MAX_SIZE", "800"))            # Длинная сторона, px
+IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "85"))
+IMAGE_MAX_FILE_MB = int(os.getenv("IMAGE_MAX_FILE_MB", "25"))
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", str(50_000_000)))  # Защита от огромных картинок
+ALLOWED_FORMATS = {"png", "jpg", "jpeg", "bmp", "gif"}
+HASH_LENGTH = 32
+
+
+class ImageIngestError(Exception):
+    """Файл нельзя использовать как изображение товара (текст ошибки - для пользователя)"""
+
+
+class ImageService:
+    @staticmethod
+    def content_hash(path):
+        """SHA-256 содержимого файла (читается частями)"""
+        digest = hashlib.sha256()
+        with open(path, "rb") as source:
+            for chunk in iter(lambda: source.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()[:HASH_LENGTH]
+
+    @staticmethod
+    def find_by_hash(content_hash):
+        """Имя уже сохраненного изображения с таким хэшем или None"""
+        for extension in ("jpg", "png"):
+            image_name = f"{content_hash}.{extension}"
+            if os.path.exists(os.path.join(IMAGES_DIR, image_name)):
+                return image_name
+        return None
+
+    @staticmethod
+    def ingest(source_path):
+        """Проверка, уменьшение, перекодирование и атомарное сохранение изображения.
+
+        Возвращает имя файла в resources/images (для Product.image_path).
+        При недопустимом файле выбрасывает ImageIngestError.
+        """
+        if not os.path.isfile(source_path):
+            raise ImageIngestError("Файл изображения не найден")
+        if os.path.getsize(source_path) > IMAGE_MAX_FILE_MB * 1024 * 1024:
+            raise ImageIngestError(f"Файл изображения больше {IMAGE_MAX_FILE_MB} МБ")
+
+        content_hash = ImageService.content_hash(source_path)
+        existing = ImageService.find_by_hash(content_hash)
+        if existing:
+            print(f"   🖼️ Изображение уже есть в каталоге: {existing}")
+            return existing
+
+        reader = QImageReader(source_path)
+        reader.setAutoTransform(True)
+        image_format = bytes(reader.format()).decode("ascii", "ignore").lower()
+        if not reader.canRead() or image_format not in ALLOWED_FORMATS:
+            raise ImageIngestError("Файл не является изображением поддерживаемого формата")
+
+        size = reader.size()
+        if not size.isValid() or size.width() * size.height() > IMAGE_MAX_PIXELS:
+            raise ImageIngestError("Недопустимый размер изображения")
+        if max(size.width(), size.height()) > IMAGE_MAX_SIZE:
+            # Уменьшаем при декодировании, полноразмерный кадр в память не попадает
+            reader.setScaledSize(size.scaled(IMAGE_MAX_SIZE, IMAGE_MAX_SIZE, Qt.KeepAspectRatio))
+
+        image = reader.read()
+        if image.isNull():
+            raise ImageIngestError(f"Не удалось прочитать изображение: {reader.errorString()}")
+
+        # Прозрачность сохраняем в PNG, все остальное - компактный JPEG
+        if image.hasAlphaChannel():
+            extension, save_format, quality = "png", "PNG", -1
+        else:
+            extension, save_format, quality = "jpg", "JPEG", IMAGE_JPEG_QUALITY
+
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.WriteOnly)
+        if not image.save(buffer, save_format, quality):
+            raise ImageIngestError("Не удалось перекодировать изображение")
+        buffer.close()
+
+        image_name = f"{content_hash}.{extension}"
+        ImageService._write_atomically(os.path.join(IMAGES_DIR, image_name), bytes(data))
+        ImageService.generate_thumbnails(os.path.join(IMAGES_DIR, image_name))
+
+        print(f"   🖼️ Изображение сохранено: {image_name} "
+              f"({image.width()}x{image.height()}, {data.size() // 1024} КБ)")
+        return image_name
+
+    @staticmethod
+    def generate_thumbnails(path):
+        """Заранее готовит миниатюры для списка товаров и окна редактирования"""
+        ratios = {1.0}
+        app = QGuiApplication.instance()
+        if app is not None and app.primaryScreen() is not None:
+            ratios.add(app.primaryScreen().devicePixelRatio())
+
+        for ratio in ratios:
+            load_thumbnail_image(path, CARD_THUMBNAIL_SIZE, CARD_THUMBNAIL_SIZE, ratio)
+            load_thumbnail_image(path, EDIT_THUMBNAIL_SIZE, EDIT_THUMBNAIL_SIZE, ratio)
+
+    @staticmethod
+    def remove_image(image_name):
+        """Удаление файла изображения из каталога (вместе с его миниатюрами на диске)"""
+        path = os.path.join(IMAGES_DIR, image_name)
+        remove_disk_thumbnails(path)
+        if os.path.exists(path):
+            try:
+                os.remove(path)
+            except Exception as e:
+                print(f"Не удалось удалить изображение: {e}")
+
+    @staticmethod
+    def _write_atomically(target_path, data):
+        """Запись через временный файл в том же каталоге и os.replace"""
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        tmp_path = f"{target_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as target:
+                target.write(data)
+                target.flush()
+                os.fsync(target.fileno())
+            os.replace(tmp_path, target_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
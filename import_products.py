@@ -0,0 +1,43 @@
+# import_products.py - загрузка прайс-листа поставщика в каталог (без графического интерфейса)
+# Запуск: python import_products.py price_list.xlsx
+#         python import_products.py price_list.csv --dry-run   (только проверка)
+# Из приложения прайс-лист загружается кнопкой в каталоге - тогда индекс каталога и
+# справочники обновляются сразу. После загрузки отсюда запущенные клиенты:
+#   - справочники перечитывают по истечении REFERENCE_DATA_TTL;
+#   - индекс каталога (если включен CATALOG_INDEX_MAX_PRODUCTS) перечитывают при
+#     следующем поиске: версия каталога в БД изменилась (см. CatalogIndex.is_current).
+import argparse
+import sys
+
+from database import engine
+from migrations import apply_migrations
+from price_list_service import PriceListService, PriceListError
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Загрузка прайс-листа (CSV/XLSX) в каталог товаров")
+    parser.add_argument("path", help="файл прайс-листа (.csv или .xlsx)")
+    parser.add_argument("--dry-run", action="store_true", help="только проверить, ничего не сохранять")
+    args = parser.parse_args()
+
+    engine.echo = False
+    apply_migrations()
+
+    try:
+        report = PriceListService.import_price_list(args.path, dry_run=args.dry_run)
+    except PriceListError as e:
+        print(f"❌ {e}")
+        return 1
+    except Exception as e:
+        print(f"❌ Ошибка загрузки прайс-листа: {e}")
+        return 1
+
+    for line_no, article, error in report['errors']:
+        print(f"   ⚠️ Строка {line_no} ({article or 'без артикула'}): {error}")
+    if report['rejected'] > len(report['errors']):
+        print(f"   ... и еще {report['rejected'] - len(report['errors'])} отклоненных строк")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
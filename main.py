@@ -7,6 +7,8 @@ from PySide6.QtWidgets import QApplication
 # Импортируем ВСЕ здесь
 from views.login_window import LoginWindow
 from views.main_window import MainWindow
+from migrations import apply_migrations
+from thumbnail_cache import prune_disk_cache
 
 class ApplicationController:
     """Простой контроллер приложения"""
@@ -19,6 +21,17 @@ class ApplicationController:
             with open("styles/style.css", "r", encoding="utf-8") as f:
                 self.app.setStyleSheet(f.read())
         
+        # Приводим схему БД к актуальной версии (индексы, вычисляемые столбцы)
+        try:
+            apply_migrations()
+        except Exception as e:
+            print(f"⚠️ Не удалось проверить миграции БД: {e}")
+        
+        # Дисковый кэш миниатюр не должен расти бесконечно
+        removed = prune_disk_cache()
+        if removed:
+            print(f"🧹 Из кэша миниатюр удалено файлов: {removed}")
+        
         # Окна
         self.login_window = None
         self.main_window = None
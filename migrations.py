@@ -0,0 +1,215 @@
+# migrations.py - управление схемой БД (индексы, вычисляемые столбцы, расширения)
+# Запуск вручную: python migrations.py (также выполняется при старте приложения)
+from sqlalchemy import text
+
+from database import engine
+from models import (PRODUCT_SEARCH_TEXT_SQL, PRODUCT_FINAL_PRICE_SQL, FULLTEXT_CONFIG,
+                    PICKUP_POINT_ADDRESS_KEY_SQL, ORDER_MISSING_DATE_SQL)
+
+# Ключ advisory-блокировки, чтобы несколько терминалов не применяли миграции одновременно
+MIGRATION_LOCK_KEY = 7310001
+
+# Миграции применяются по порядку, каждая - в отдельной транзакции.
+# Имя миграции записывается в schema_migrations и повторно она не выполняется.
+MIGRATIONS = [
+    ("0001_products_search_trgm", [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        f"""
+        ALTER TABLE products ADD COLUMN IF NOT EXISTS search_text TEXT
+            GENERATED ALWAYS AS ({PRODUCT_SEARCH_TEXT_SQL}) STORED
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_products_search_text_trgm
+            ON products USING gin (search_text gin_trgm_ops)
+        """,
+        "ANALYZE products",
+    ]),
+    ("0002_products_search_vector", [
+        "ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector",
+        f"""
+        CREATE OR REPLACE FUNCTION products_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('{FULLTEXT_CONFIG}', coalesce(NEW.name, '')), 'A') ||
+                setweight(to_tsvector('{FULLTEXT_CONFIG}', coalesce(NEW.category, '')), 'B') ||
+                setweight(to_tsvector('{FULLTEXT_CONFIG}', coalesce(NEW.manufacturer, '')), 'C') ||
+                setweight(to_tsvector('{FULLTEXT_CONFIG}', coalesce(NEW.description, '')), 'D');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP TRIGGER IF EXISTS products_search_vector_trigger ON products",
+        """
+        CREATE TRIGGER products_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF name, category, manufacturer, description ON products
+            FOR EACH ROW EXECUTE FUNCTION products_search_vector_update()
+        """,
+        # Заполняем вектор для уже существующих товаров (срабатывает триггер)
+        "UPDATE products SET name = name",
+        """
+        CREATE INDEX IF NOT EXISTS ix_products_search_vector
+            ON products USING gin (search_vector)
+        """,
+        "ANALYZE products",
+    ]),
+    ("0003_products_sort_indexes", [
+        # Индексы под ключи сортировки каталога (PRODUCT_SORT_KEYS) + артикул для keyset-пагинации
+        "CREATE INDEX IF NOT EXISTS ix_products_sort_name ON products ((coalesce(name, '')), article)",
+        "CREATE INDEX IF NOT EXISTS ix_products_sort_price ON products ((coalesce(price, 0)), article)",
+        "CREATE INDEX IF NOT EXISTS ix_products_sort_stock ON products ((coalesce(stock_quantity, 0)), article)",
+    ]),
+    ("0004_products_final_price", [
+        # Цена со скидкой для сортировки и фильтра по диапазону (Product.final_price)
+        f"ALTER TABLE products ADD COLUMN IF NOT EXISTS final_price NUMERIC(10, 2) "
+        f"GENERATED ALWAYS AS ({PRODUCT_FINAL_PRICE_SQL}) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_products_sort_final_price ON products (final_price, article)",
+        "ANALYZE products",
+    ]),
+    ("0005_pickup_points_address_unique", [
+        # Дубликаты адресов (с точностью до регистра и пробелов по краям) сводим
+        # к пункту с наименьшим id, заказы переносим на него
+        f"""
+        WITH ranked AS (
+            SELECT id, min(id) OVER (PARTITION BY {PICKUP_POINT_ADDRESS_KEY_SQL}) AS keep_id
+            FROM pickup_points
+            WHERE address IS NOT NULL
+        )
+        UPDATE orders SET pickup_point_id = ranked.keep_id
+        FROM ranked
+        WHERE orders.pickup_point_id = ranked.id AND ranked.id <> ranked.keep_id
+        """,
+        f"""
+        WITH ranked AS (
+            SELECT id, min(id) OVER (PARTITION BY {PICKUP_POINT_ADDRESS_KEY_SQL}) AS keep_id
+            FROM pickup_points
+            WHERE address IS NOT NULL
+        )
+        DELETE FROM pickup_points USING ranked
+        WHERE pickup_points.id = ranked.id AND ranked.id <> ranked.keep_id
+        """,
+        f"CREATE UNIQUE INDEX IF NOT EXISTS ux_pickup_points_address_key "
+        f"ON pickup_points (({PICKUP_POINT_ADDRESS_KEY_SQL}))",
+    ]),
+    ("0006_order_items_order_product_unique", [
+        # Повторяющиеся строки одного товара в заказе сводим в строку с наименьшим id
+        # (количество суммируется), остальные удаляем
+        """
+        WITH totals AS (
+            SELECT min(id) AS keep_id, sum(coalesce(quantity, 0)) AS quantity
+            FROM order_items
+            GROUP BY order_id, product_article
+            HAVING count(*) > 1
+        )
+        UPDATE order_items SET quantity = totals.quantity
+        FROM totals
+        WHERE order_items.id = totals.keep_id
+        """,
+        """
+        WITH ranked AS (
+            SELECT id, min(id) OVER (PARTITION BY order_id, product_article) AS keep_id
+            FROM order_items
+        )
+        DELETE FROM order_items USING ranked
+        WHERE order_items.id = ranked.id AND ranked.id <> ranked.keep_id
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_order_items_order_product "
+        "ON order_items (order_id, product_article)",
+    ]),
+    ("0007_orders_lookup_indexes", [
+        # Внешние ключи и поля фильтров/сортировки (имена - как у index=True в models.py).
+        # order_items.order_id уже покрыт ux_order_items_order_product
+        "CREATE INDEX IF NOT EXISTS ix_order_items_product_article ON order_items (product_article)",
+        "CREATE INDEX IF NOT EXISTS ix_orders_user_id ON orders (user_id)",
+        "CREATE INDEX IF NOT EXISTS ix_orders_pickup_point_id ON orders (pickup_point_id)",
+        "CREATE INDEX IF NOT EXISTS ix_orders_order_date ON orders (order_date)",
+        "CREATE INDEX IF NOT EXISTS ix_orders_status ON orders (status)",
+        # Повторяющийся логин - ошибка данных: миграция остановится, дубликаты нужно разобрать вручную
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_login ON users (login)",
+        "ANALYZE orders",
+        "ANALYZE order_items",
+        "ANALYZE users",
+    ]),
+    ("0008_orders_sort_indexes", [
+        # Индексы под ключи сортировки списка заказов (ORDER_SORT_KEYS) + id для keyset-пагинации
+        f"CREATE INDEX IF NOT EXISTS ix_orders_sort_order_date "
+        f"ON orders ((coalesce(order_date, {ORDER_MISSING_DATE_SQL})), id)",
+        f"CREATE INDEX IF NOT EXISTS ix_orders_sort_delivery_date "
+        f"ON orders ((coalesce(delivery_date, {ORDER_MISSING_DATE_SQL})), id)",
+        "CREATE INDEX IF NOT EXISTS ix_orders_sort_status ON orders ((coalesce(status, '')), id)",
+        # Фильтр по диапазону дат доставки
+        "CREATE INDEX IF NOT EXISTS ix_orders_delivery_date ON orders (delivery_date)",
+    ]),
+    ("0009_catalog_version", [
+        # Номер версии каталога: растет при любом изменении products (из любого клиента,
+        # import_products.py или вручную в SQL). По нему индекс каталога в памяти
+        # проверяет, что не устарел (CatalogIndex.is_current)
+        """
+        CREATE TABLE IF NOT EXISTS catalog_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version BIGINT NOT NULL
+        )
+        """,
+        "INSERT INTO catalog_version (id, version) VALUES (1, 1) ON CONFLICT (id) DO NOTHING",
+        """
+        CREATE OR REPLACE FUNCTION catalog_version_bump() RETURNS trigger AS $$
+        BEGIN
+            UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP TRIGGER IF EXISTS products_catalog_version_trigger ON products",
+        """
+        CREATE TRIGGER products_catalog_version_trigger
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON products
+            FOR EACH STATEMENT EXECUTE FUNCTION catalog_version_bump()
+        """,
+    ]),
+]
+
+
+def apply_migrations():
+    """Применяет еще не примененные миграции, возвращает список их имен"""
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                name VARCHAR(100) PRIMARY KEY,
+                applied_at TIMESTAMP NOT NULL DEFAULT now()
+            )
+        """))
+
+    applied = []
+    for name, statements in MIGRATIONS:
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                already_applied = conn.execute(
+                    text("SELECT 1 FROM schema_migrations WHERE name = :name"),
+                    {"name": name}
+                ).first()
+                if already_applied:
+                    continue
+
+                print(f"🛠️ Применяем миграцию {name}...")
+                for statement in statements:
+                    conn.execute(text(statement))
+                conn.execute(
+                    text("INSERT INTO schema_migrations (name) VALUES (:name)"),
+                    {"name": name}
+                )
+            applied.append(name)
+        except Exception as e:
+            # Следующие миграции могут зависеть от этой - останавливаемся
+            print(f"❌ Ошибка при применении миграции {name}: {e}")
+            break
+
+    return applied
+
+
+if __name__ == "__main__":
+    engine.echo = False
+    applied = apply_migrations()
+    if applied:
+        print(f"✅ Применено миграций: {len(applied)} ({', '.join(applied)})")
+    else:
+        print("✅ Схема БД в актуальном состоянии")
@@ -1,6 +1,7 @@
 # models.py - ФИНАЛЬНАЯ версия
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Numeric
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Numeric, Computed, Index
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from datetime import datetime
 from database import Base
 
@@ -10,11 +11,14 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)  # Автоинкремент через IDENTITY в БД
     role = Column(String(50))
     full_name = Column(String(100))
-    login = Column(String(100))
+    login = Column(String(100), unique=True, index=True)
     password = Column(String(100))
     
     orders = relationship("Order", back_populates="user")
 
+# Нормализованный адрес пункта выдачи: по нему уникальный индекс и upsert (см. migrations.py)
+PICKUP_POINT_ADDRESS_KEY_SQL = "lower(btrim(address))"
+
 class PickupPoint(Base):
     __tablename__ = 'pickup_points'
     
@@ -23,6 +27,20 @@ class PickupPoint(Base):
     
     orders = relationship("Order", back_populates="pickup_point")
 
+# Текст для поиска по подстроке: все поля, по которым ищет каталог, в нижнем регистре.
+# Хранится вычисляемым столбцом с GIN-индексом pg_trgm (см. migrations.py)
+PRODUCT_SEARCH_TEXT_SQL = (
+    "lower(coalesce(name, '') || ' ' || coalesce(description, '') || ' ' || "
+    "coalesce(category, '') || ' ' || coalesce(manufacturer, '') || ' ' || "
+    "coalesce(supplier, '') || ' ' || coalesce(article, ''))"
+)
+
+# Цена со скидкой (сколько платит покупатель), хранится вычисляемым столбцом с индексом
+PRODUCT_FINAL_PRICE_SQL = "round(coalesce(price, 0) * (100 - coalesce(discount, 0)) / 100, 2)"
+
+# Конфигурация полнотекстового поиска PostgreSQL (search_vector)
+FULLTEXT_CONFIG = "russian"
+
 class Product(Base):
     __tablename__ = 'products'
     
@@ -37,19 +55,27 @@ class Product(Base):
     stock_quantity = Column(Integer)
     description = Column(Text)
     image_path = Column(String(255))
+    final_price = Column(Numeric(10, 2), Computed(PRODUCT_FINAL_PRICE_SQL, persisted=True))
+    # Только для фильтрации в запросах, в объекты не загружается
+    search_text = deferred(Column(Text, Computed(PRODUCT_SEARCH_TEXT_SQL, persisted=True)))
+    # Полнотекстовый вектор (name > category > manufacturer > description), заполняется триггером
+    search_vector = deferred(Column(TSVECTOR))
     
     order_items = relationship("OrderItem", back_populates="product")
 
+# Вместо NULL в датах при сортировке списка заказов (под выражения есть индексы, см. migrations.py)
+ORDER_MISSING_DATE_SQL = "'1900-01-01'::timestamp"
+
 class Order(Base):
     __tablename__ = 'orders'
     
     id = Column(Integer, primary_key=True, index=True)  # Автоинкремент через IDENTITY в БД
-    user_id = Column(Integer, ForeignKey('users.id'))
-    order_date = Column(DateTime)
-    delivery_date = Column(DateTime)
-    pickup_point_id = Column(Integer, ForeignKey('pickup_points.id'))
+    user_id = Column(Integer, ForeignKey('users.id'), index=True)
+    order_date = Column(DateTime, index=True)
+    delivery_date = Column(DateTime, index=True)
+    pickup_point_id = Column(Integer, ForeignKey('pickup_points.id'), index=True)
     receive_code = Column(Integer)
-    status = Column(String(20))
+    status = Column(String(20), index=True)
     
     user = relationship("User", back_populates="orders")
     pickup_point = relationship("PickupPoint", back_populates="orders")
@@ -57,10 +83,15 @@ class Order(Base):
 
 class OrderItem(Base):
     __tablename__ = 'order_items'
+    # Товар встречается в заказе один раз (по этому индексу - upsert строк заказа)
+    __table_args__ = (
+        Index('ux_order_items_order_product', 'order_id', 'product_article', unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)  # Автоинкремент через IDENTITY в БД
+    # Поиск строк по order_id обслуживает ux_order_items_order_product (order_id - первый столбец)
     order_id = Column(Integer, ForeignKey('orders.id'))
-    product_article = Column(String(20), ForeignKey('products.article'))
+    product_article = Column(String(20), ForeignKey('products.article'), index=True)
     quantity = Column(Integer)
     
     order = relationship("Order", back_populates="order_items")
@@ -1,21 +1,87 @@
 # order_service.py - ДОБАВЛЯЕМ МЕТОД ДЛЯ СОХРАНЕНИЯ ТОВАРОВ
-from sqlalchemy.orm import Session, joinedload
+import csv
+import json
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, update, delete, select, true, tuple_, literal, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert, aggregate_order_by
+from sqlalchemy.orm import Session, joinedload, selectinload, load_only
 from database import get_db
-from models import Order, OrderItem, User, PickupPoint, Product
+from models import Order, OrderItem, User, PickupPoint, Product, ORDER_MISSING_DATE_SQL
+
+# Размер страницы списка заказов по умолчанию
+PAGE_SIZE = 50
+
+# Статусы заказа (для выбора в форме и фильтра списка)
+ORDER_STATUSES = ["новый", "в обработке", "собран", "доставлен", "отменен"]
+
+# Выгрузка заказов: форматы, строк за одну выборку с серверного курсора
+EXPORT_FORMATS = ("csv", "jsonl")
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+# Столбцы выгрузки: строка на каждую позицию заказа (заказ без товаров - одна строка)
+EXPORT_FIELDS = ["order_id", "order_date", "delivery_date", "status", "receive_code",
+                 "user_full_name", "pickup_point_address", "product_article", "product_name",
+                 "quantity", "price", "discount", "final_price", "line_total"]
+
+# Ключи сортировки списка заказов: выражение и направление. Вторым ключом идет id,
+# поэтому порядок однозначен и выборку можно продолжать с места (keyset).
+# coalesce - чтобы NULL не ломали сравнение строк; под выражения есть индексы (0008)
+ORDER_SORT_KEYS = {
+    "order_date_desc": (func.coalesce(Order.order_date, literal_column(ORDER_MISSING_DATE_SQL)), "desc"),
+    "order_date_asc": (func.coalesce(Order.order_date, literal_column(ORDER_MISSING_DATE_SQL)), "asc"),
+    "delivery_date_desc": (func.coalesce(Order.delivery_date, literal_column(ORDER_MISSING_DATE_SQL)), "desc"),
+    "delivery_date_asc": (func.coalesce(Order.delivery_date, literal_column(ORDER_MISSING_DATE_SQL)), "asc"),
+    "status_asc": (func.coalesce(Order.status, ""), "asc"),
+    "status_desc": (func.coalesce(Order.status, ""), "desc"),
+}
+
+# Слушатели изменений заказов: callback(action, order_id, order), где action -
+# "created" / "updated" / "deleted"
+_change_listeners = []
 
 class OrderService:
+    @staticmethod
+    def add_change_listener(callback):
+        """Подписка на создание, изменение и удаление заказов через сервис"""
+        if callback not in _change_listeners:
+            _change_listeners.append(callback)
+    
+    @staticmethod
+    def remove_change_listener(callback):
+        if callback in _change_listeners:
+            _change_listeners.remove(callback)
+    
+    @staticmethod
+    def _notify_change(action, order_id, order=None):
+        for callback in list(_change_listeners):
+            try:
+                callback(action, order_id, order)
+            except Exception as e:
+                print(f"Ошибка обработчика изменения заказа: {e}")
+    
+    @staticmethod
+    def list_options():
+        """Что загружать для списка заказов: только поля таблицы заказов.
+        Связанные строки читаются отдельными запросами selectin (пачками по id),
+        поэтому заказ не размножается по числу товаров, а товары не загружаются вовсе -
+        для артикула заказа хватает order_items.product_article."""
+        return (
+            load_only(Order.id, Order.user_id, Order.pickup_point_id, Order.order_date,
+                      Order.delivery_date, Order.receive_code, Order.status),
+            selectinload(Order.user).load_only(User.id, User.full_name),
+            selectinload(Order.pickup_point).load_only(PickupPoint.id, PickupPoint.address),
+            selectinload(Order.order_items).load_only(OrderItem.id, OrderItem.order_id,
+                                                      OrderItem.product_article, OrderItem.quantity),
+        )
+    
     @staticmethod
     def get_all_orders():
-        """Получение всех заказов с связанными данными (используем joinedload)"""
+        """Получение всех заказов для списка (см. list_options)"""
         db: Session = next(get_db())
         try:
-            # Используем joinedload для загрузки всех связанных данных
             orders = db.query(Order)\
-                .options(
-                    joinedload(Order.user),
-                    joinedload(Order.pickup_point),
-                    joinedload(Order.order_items).joinedload(OrderItem.product)
-                )\
+                .options(*OrderService.list_options())\
                 .order_by(Order.order_date.desc())\
                 .all()
             return orders
@@ -27,6 +93,242 @@ class OrderService:
         finally:
             db.close()
     
+    @staticmethod
+    def _apply_filters(query, status=None, order_date_from=None, order_date_to=None,
+                       delivery_date_from=None, delivery_date_to=None, pickup_point_id=None,
+                       user_id=None, product_article=None):
+        """Фильтры списка заказов (все необязательные, даты - включительно)"""
+        if status:
+            query = query.filter(Order.status == status)
+        for column, date_from, date_to in ((Order.order_date, order_date_from, order_date_to),
+                                           (Order.delivery_date, delivery_date_from, delivery_date_to)):
+            if date_from is not None:
+                query = query.filter(column >= date_from)
+            if isinstance(date_to, datetime):
+                query = query.filter(column <= date_to)
+            elif date_to is not None:
+                # Дата без времени - включая весь этот день
+                query = query.filter(column < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+        if pickup_point_id is not None:
+            query = query.filter(Order.pickup_point_id == pickup_point_id)
+        if user_id is not None:
+            query = query.filter(Order.user_id == user_id)
+        if product_article:
+            # EXISTS по ux_order_items_order_product, заказ не размножается по строкам
+            query = query.filter(Order.order_items.any(OrderItem.product_article == product_article.strip()))
+        return query
+    
+    @staticmethod
+    def _sort_key(sort_by):
+        """Выражение и направление сортировки для sort_by (по умолчанию - новые заказы сверху)"""
+        return ORDER_SORT_KEYS.get(sort_by, ORDER_SORT_KEYS["order_date_desc"])
+    
+    @staticmethod
+    def get_orders_page(sort_by="order_date_desc", cursor=None, page_size=PAGE_SIZE, **filters):
+        """Страница списка заказов (keyset-пагинация); filters - см. _apply_filters.
+        
+        Возвращает (строки заказов, курсор следующей страницы или None, всего заказов
+        по фильтрам). Строка - плоская запись из одного запроса (см. _query_orders_page),
+        объекты Order, OrderItem и Product не загружаются.
+        Курсор - пара (значение ключа сортировки, id) последнего заказа страницы.
+        Общее количество считается тем же запросом (count(*) OVER ()) только для
+        первой страницы, для следующих возвращается None.
+        """
+        db: Session = next(get_db())
+        try:
+            return OrderService._query_orders_page(db, sort_by, cursor, page_size, **filters)
+        except Exception as e:
+            print(f"❌ Ошибка при получении страницы заказов: {e}")
+            import traceback
+            traceback.print_exc()
+            return [], None, 0
+        finally:
+            db.close()
+    
+    @staticmethod
+    def _order_totals(order_id):
+        """LATERAL-подзапрос по строкам заказа order_id: артикул заказа ("АРТxКОЛ..."
+        в порядке добавления), число позиций, сумма без скидки и со скидкой"""
+        quantity = func.coalesce(OrderItem.quantity, 0)
+        item_article = func.concat(func.coalesce(OrderItem.product_article, "БЕЗ_АРТИКУЛА"), "x", quantity)
+        return select(
+            func.string_agg(item_article, aggregate_order_by(literal(""), OrderItem.id)).label("article"),
+            func.count(OrderItem.id).label("item_count"),
+            func.coalesce(func.sum(quantity * func.coalesce(Product.price, 0)), 0).label("gross_total"),
+            func.coalesce(func.sum(quantity * func.coalesce(Product.final_price, 0)), 0).label("net_total"),
+        ).select_from(OrderItem)\
+            .outerjoin(Product, Product.article == OrderItem.product_article)\
+            .where(OrderItem.order_id == order_id)\
+            .lateral("totals")
+    
+    @staticmethod
+    def _query_orders_page(db, sort_by="order_date_desc", cursor=None, page_size=PAGE_SIZE, **filters):
+        """Сначала выбираются id заказов страницы (фильтры, keyset, индекс сортировки),
+        затем только для них - поля заказа, адрес, ФИО клиента и итоги по строкам.
+        Поля строки: id, status, order_date, delivery_date, receive_code, user_id,
+        pickup_point_id, pickup_point_address, user_full_name, article, item_count,
+        gross_total, net_total"""
+        sort_expr, direction = OrderService._sort_key(sort_by)
+        columns = [Order.id, sort_expr.label("sort_key")]
+        if cursor is None:
+            # Окно считается до LIMIT - это число всех заказов, прошедших фильтры
+            columns.append(func.count().over().label("total"))
+        query = db.query(*columns)
+        query = OrderService._apply_filters(query, **filters)
+        
+        # Продолжаем строго после последней строки предыдущей страницы
+        if cursor is not None:
+            last_key, last_id = cursor
+            position = tuple_(sort_expr, Order.id)
+            boundary = tuple_(literal(last_key), literal(last_id))
+            query = query.filter(position > boundary if direction == "asc" else position < boundary)
+        
+        if direction == "asc":
+            query = query.order_by(sort_expr.asc(), Order.id.asc())
+        else:
+            query = query.order_by(sort_expr.desc(), Order.id.desc())
+        
+        # Одна лишняя строка показывает, есть ли следующая страница
+        page = query.limit(page_size + 1).subquery("page")
+        totals = OrderService._order_totals(page.c.id)
+        rows_query = db.query(
+            *page.c,
+            Order.status, Order.order_date, Order.delivery_date, Order.receive_code,
+            Order.user_id, Order.pickup_point_id,
+            PickupPoint.address.label("pickup_point_address"),
+            User.full_name.label("user_full_name"),
+            totals.c.article, totals.c.item_count, totals.c.gross_total, totals.c.net_total,
+        ).select_from(page)\
+            .join(Order, Order.id == page.c.id)\
+            .outerjoin(PickupPoint, PickupPoint.id == Order.pickup_point_id)\
+            .outerjoin(User, User.id == Order.user_id)\
+            .outerjoin(totals, true())
+        if direction == "asc":
+            rows_query = rows_query.order_by(page.c.sort_key.asc(), page.c.id.asc())
+        else:
+            rows_query = rows_query.order_by(page.c.sort_key.desc(), page.c.id.desc())
+        
+        rows = rows_query.all()
+        has_more = len(rows) > page_size
+        total = (rows[0].total if rows else 0) if cursor is None else None
+        rows = rows[:page_size]
+        
+        next_cursor = (rows[-1].sort_key, rows[-1].id) if has_more else None
+        print(f"✅ Страница заказов: {len(rows)} (всего: {total}), есть продолжение: {has_more}")
+        
+        return rows, next_cursor, total
+    
+    @staticmethod
+    def count_orders(**filters):
+        """Количество заказов по фильтрам (см. _apply_filters)"""
+        db: Session = next(get_db())
+        try:
+            return OrderService._apply_filters(db.query(func.count(Order.id)), **filters).scalar()
+        finally:
+            db.close()
+    
+    @staticmethod
+    def iter_export_rows(batch_size=EXPORT_BATCH_SIZE, **filters):
+        """Строки выгрузки (поля EXPORT_FIELDS) по порядку id заказа и позиции.
+        Читаются с серверного курсора пачками по batch_size - память не зависит
+        от объема истории заказов."""
+        quantity = func.coalesce(OrderItem.quantity, 0)
+        db: Session = next(get_db())
+        try:
+            query = db.query(
+                Order.id.label("order_id"), Order.order_date, Order.delivery_date, Order.status,
+                Order.receive_code,
+                User.full_name.label("user_full_name"),
+                PickupPoint.address.label("pickup_point_address"),
+                OrderItem.product_article,
+                Product.name.label("product_name"),
+                OrderItem.quantity, Product.price, Product.discount, Product.final_price,
+                (quantity * Product.final_price).label("line_total"),
+            ).select_from(Order)\
+                .outerjoin(User, User.id == Order.user_id)\
+                .outerjoin(PickupPoint, PickupPoint.id == Order.pickup_point_id)\
+                .outerjoin(OrderItem, OrderItem.order_id == Order.id)\
+                .outerjoin(Product, Product.article == OrderItem.product_article)
+            query = OrderService._apply_filters(query, **filters)
+            for row in query.order_by(Order.id, OrderItem.id).yield_per(batch_size):
+                yield row
+        finally:
+            db.close()
+    
+    @staticmethod
+    def export_orders(path, export_format=None, progress=None, batch_size=EXPORT_BATCH_SIZE, **filters):
+        """Выгрузка заказов с позициями в CSV или JSON Lines (filters - см. _apply_filters).
+        
+        export_format - "csv" / "jsonl" (по умолчанию - по расширению файла).
+        progress(выгружено_заказов, всего_заказов) вызывается после каждой пачки;
+        если он вернет False, выгрузка прерывается. Файл пишется во временный и
+        заменяется целиком в конце. Возвращает число строк или None, если прервано.
+        """
+        export_format = export_format or os.path.splitext(path)[1].lstrip(".").lower()
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Неизвестный формат выгрузки: {export_format} ({', '.join(EXPORT_FORMATS)})")
+        
+        total_orders = OrderService.count_orders(**filters)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        rows_written = 0
+        orders_written = 0
+        last_order_id = None
+        try:
+            # utf-8-sig: кириллица корректно открывается в Excel
+            encoding = "utf-8-sig" if export_format == "csv" else "utf-8"
+            with open(tmp_path, "w", encoding=encoding, newline="") as target:
+                write_row = OrderService._row_writer(target, export_format)
+                for row in OrderService.iter_export_rows(batch_size, **filters):
+                    write_row(row)
+                    rows_written += 1
+                    if row.order_id != last_order_id:
+                        orders_written += 1
+                        last_order_id = row.order_id
+                    if progress is not None and rows_written % batch_size == 0:
+                        if progress(orders_written, total_orders) is False:
+                            print("⏹️ Выгрузка заказов прервана")
+                            return None
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        
+        if progress is not None:
+            progress(orders_written, total_orders)
+        print(f"✅ Выгружено заказов: {orders_written}, строк: {rows_written} -> {path}")
+        return rows_written
+    
+    @staticmethod
+    def _row_writer(target, export_format):
+        """Функция записи одной строки выгрузки в открытый файл"""
+        if export_format == "csv":
+            writer = csv.writer(target, delimiter=";")
+            writer.writerow(EXPORT_FIELDS)
+            return lambda row: writer.writerow(
+                ["" if getattr(row, field) is None else OrderService._export_value(getattr(row, field))
+                 for field in EXPORT_FIELDS])
+        return lambda row: target.write(json.dumps(
+            {field: OrderService._export_value(getattr(row, field)) for field in EXPORT_FIELDS},
+            ensure_ascii=False) + "\n")
+    
+    @staticmethod
+    def _export_value(value):
+        """Даты - ISO 8601, суммы (Decimal) - строкой без потери точности"""
+        if isinstance(value, datetime):
+            return value.isoformat(sep=" ")
+        if value is not None and not isinstance(value, (int, str)):
+            return str(value)
+        return value
+    
+    @staticmethod
+    def get_customer_choices():
+        """Пользователи для фильтра заказов: строки (id, ФИО)"""
+        db: Session = next(get_db())
+        try:
+            return db.query(User.id, User.full_name).order_by(User.full_name, User.id).all()
+        finally:
+            db.close()
+    
     @staticmethod
     def get_order_by_id(order_id: int):
         """Получение заказа по ID со всеми связанными данными"""
@@ -52,17 +354,7 @@ class OrderService:
             pickup_point_id = order_data.get('pickup_point_id', None)
             
             if pickup_point_address and not pickup_point_id:
-                pickup_point = db.query(PickupPoint).filter(
-                    PickupPoint.address.ilike(pickup_point_address.strip())
-                ).first()
-                
-                if not pickup_point:
-                    pickup_point = PickupPoint(address=pickup_point_address.strip())
-                    db.add(pickup_point)
-                    db.commit()
-                    db.refresh(pickup_point)
-                
-                order_data['pickup_point_id'] = pickup_point.id
+                order_data['pickup_point_id'] = OrderService._upsert_pickup_point(db, pickup_point_address)
             
             order = Order(**order_data)
             db.add(order)
@@ -77,6 +369,7 @@ class OrderService:
                 .filter(Order.id == order.id)\
                 .first()
             
+            OrderService._notify_change("created", order.id, order)
             return order
         except Exception as e:
             db.rollback()
@@ -100,18 +393,8 @@ class OrderService:
             pickup_point_address = order_data.pop('pickup_point_address', None)
             
             if pickup_point_address:
-                # Находим или создаем пункт выдачи
-                pickup_point = db.query(PickupPoint).filter(
-                    PickupPoint.address.ilike(pickup_point_address.strip())
-                ).first()
-                
-                if not pickup_point:
-                    pickup_point = PickupPoint(address=pickup_point_address.strip())
-                    db.add(pickup_point)
-                    db.commit()
-                    db.refresh(pickup_point)
-                
-                order_data['pickup_point_id'] = pickup_point.id
+                # Находим или создаем пункт выдачи (в той же транзакции, что и заказ)
+                order_data['pickup_point_id'] = OrderService._upsert_pickup_point(db, pickup_point_address)
             
             # Обновляем остальные поля
             for key, value in order_data.items():
@@ -129,6 +412,7 @@ class OrderService:
                 .filter(Order.id == order.id)\
                 .first()
             
+            OrderService._notify_change("updated", order_id, order)
             return order
         except Exception as e:
             db.rollback()
@@ -150,6 +434,7 @@ class OrderService:
                 db.query(OrderItem).filter(OrderItem.order_id == order_id).delete()
                 db.delete(order)
                 db.commit()
+                OrderService._notify_change("deleted", order_id)
                 return True, "Заказ успешно удален"
             return False, "Заказ не найден"
         except Exception as e:
@@ -161,6 +446,68 @@ class OrderService:
         finally:
             db.close()
     
+    @staticmethod
+    def save_order(order_data: dict, items_data: list, order_id: int = None):
+        """Создание (order_id=None) или обновление заказа вместе с пунктом выдачи
+        и товарами в одной транзакции.
+        
+        items_data - список {'product_article', 'quantity'}; в БД пишется только разница
+        с текущими строками заказа (_sync_order_items). Возвращает id заказа или None.
+        """
+        db: Session = next(get_db())
+        try:
+            order_data = dict(order_data)
+            pickup_point_address = order_data.pop('pickup_point_address', None)
+            if pickup_point_address and not order_data.get('pickup_point_id'):
+                order_data['pickup_point_id'] = OrderService._upsert_pickup_point(db, pickup_point_address)
+            
+            if order_id is None:
+                order_id = db.execute(
+                    insert(Order).values(**order_data).returning(Order.id)
+                ).scalar_one()
+                existing_items = {}
+                action = "created"
+            else:
+                updated = db.execute(update(Order).where(Order.id == order_id).values(**order_data))
+                if updated.rowcount == 0:
+                    db.rollback()
+                    return None
+                existing_items = None
+                action = "updated"
+            
+            changed, removed = OrderService._sync_order_items(db, order_id, items_data, existing_items)
+            print(f"   🧾 Заказ #{order_id}: строк добавлено/изменено {changed}, удалено {removed}")
+            
+            # Заказ, пункт выдачи и товары фиксируются вместе или не фиксируются вовсе
+            db.commit()
+            OrderService._notify_change(action, order_id)
+            return order_id
+        except Exception as e:
+            db.rollback()
+            print(f"❌ Ошибка при сохранении заказа: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+        finally:
+            db.close()
+    
+    @staticmethod
+    def _upsert_pickup_point(db: Session, address: str):
+        """id пункта выдачи по адресу; новый адрес добавляется.
+        
+        Один запрос INSERT ... ON CONFLICT по уникальному индексу на
+        lower(btrim(address)), без commit: пункт выдачи пишется в транзакции
+        заказа, а одновременные сохранения с разных рабочих мест не создают дублей.
+        """
+        address = address.strip()
+        statement = pg_insert(PickupPoint).values(address=address)
+        statement = statement.on_conflict_do_update(
+            index_elements=[func.lower(func.btrim(PickupPoint.address))],
+            # Пустое обновление нужно, чтобы RETURNING вернул id уже существующей строки
+            set_={"address": PickupPoint.address},
+        ).returning(PickupPoint.id)
+        return db.execute(statement).scalar_one()
+    
     @staticmethod
     def get_all_pickup_points():
         """Получение всех пунктов выдачи"""
@@ -172,31 +519,57 @@ class OrderService:
             db.close()
     
     @staticmethod
-    def add_order_items(order_id: int, items_data: list):
-        """Добавление товаров в заказ"""
+    def sync_order_items(order_id: int, items_data: list):
+        """Приведение товаров заказа к items_data ({'product_article', 'quantity'}).
+        Меняются только отличающиеся строки. Возвращает (добавлено/изменено, удалено)
+        или None при ошибке."""
         db: Session = next(get_db())
         try:
-            # Удаляем старые товары из заказа
-            db.query(OrderItem).filter(OrderItem.order_id == order_id).delete()
-            
-            # Добавляем новые товары
-            for item in items_data:
-                order_item = OrderItem(
-                    order_id=order_id,
-                    product_article=item['product_article'],
-                    quantity=item['quantity']
-                )
-                db.add(order_item)
-            
+            changes = OrderService._sync_order_items(db, order_id, items_data)
             db.commit()
-            return True
+            OrderService._notify_change("updated", order_id)
+            return changes
         except Exception as e:
             db.rollback()
-            print(f"❌ Ошибка при добавлении товаров в заказ: {e}")
-            return False
+            print(f"❌ Ошибка при сохранении товаров заказа: {e}")
+            return None
         finally:
             db.close()
     
+    @staticmethod
+    def add_order_items(order_id: int, items_data: list):
+        """Добавление товаров в заказ (старое имя sync_order_items)"""
+        return OrderService.sync_order_items(order_id, items_data) is not None
+    
+    @staticmethod
+    def _sync_order_items(db: Session, order_id: int, items_data: list, existing=None):
+        """Разница между товарами заказа в БД и items_data в рамках транзакции db:
+        новые и изменившиеся строки - одним INSERT ... ON CONFLICT DO UPDATE,
+        лишние - одним DELETE. existing={} - заказ новый, строк в БД нет."""
+        wanted = {}
+        for item in items_data:
+            article = item['product_article']
+            wanted[article] = wanted.get(article, 0) + item['quantity']
+        
+        if existing is None:
+            existing = dict(db.query(OrderItem.product_article, OrderItem.quantity)
+                            .filter(OrderItem.order_id == order_id).all())
+        
+        changed = [{'order_id': order_id, 'product_article': article, 'quantity': quantity}
+                   for article, quantity in wanted.items() if existing.get(article) != quantity]
+        removed = [article for article in existing if article not in wanted]
+        
+        if changed:
+            statement = pg_insert(OrderItem).values(changed)
+            db.execute(statement.on_conflict_do_update(
+                index_elements=[OrderItem.order_id, OrderItem.product_article],
+                set_={'quantity': statement.excluded.quantity}
+            ))
+        if removed:
+            db.execute(delete(OrderItem).where(OrderItem.order_id == order_id,
+                                               OrderItem.product_article.in_(removed)))
+        return len(changed), len(removed)
+    
     @staticmethod
     def get_order_items(order_id: int):
         """Получение товаров в заказе"""
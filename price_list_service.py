@@ -0,0 +1,295 @@
+# price_list_service.py - массовая загрузка прайс-листа поставщика в каталог
+# Файл (CSV или XLSX) читается потоково и через COPY попадает во временную таблицу,
+# где проверяется запросами SQL; корректные строки сливаются в products одним
+# INSERT ... ON CONFLICT (article) DO UPDATE. Все - в одной транзакции.
+# XLSX читается пакетом openpyxl (необязательная зависимость).
+import csv
+import os
+import re
+import tempfile
+
+from sqlalchemy import text
+
+from database import engine
+
+try:
+    from openpyxl import load_workbook
+except ImportError:  # pragma: no cover - зависит от окружения
+    load_workbook = None
+
+STAGING_TABLE = "price_list_staging"
+IMPORT_ERROR_LIMIT = int(os.getenv("IMPORT_ERROR_LIMIT", "100"))  # Сколько ошибок вернуть в отчете
+COPY_SPOOL_MB = 32  # Данные для COPY держим в памяти до этого размера, дальше - во временном файле
+
+# Столбец products -> (максимальная длина текста или None, тип для приведения)
+IMPORT_COLUMNS = {
+    "article": (20, None),
+    "name": (100, None),
+    "unit": (20, None),
+    "price": (None, "numeric(10, 2)"),
+    "supplier": (100, None),
+    "manufacturer": (100, None),
+    "category": (50, None),
+    "discount": (None, "integer"),
+    "stock_quantity": (None, "integer"),
+    "description": (None, None),
+    "image_path": (255, None),
+}
+
+# Заголовки прайс-листа (без учета регистра и пробелов по краям) -> столбец products
+HEADER_ALIASES = {
+    "article": ["артикул", "арт.", "код товара", "article", "sku"],
+    "name": ["наименование", "наименование товара", "название", "товар", "name"],
+    "unit": ["единица измерения", "ед. изм.", "ед.изм.", "ед", "unit"],
+    "price": ["цена", "цена, руб", "цена, ₽", "стоимость", "price"],
+    "supplier": ["поставщик", "supplier"],
+    "manufacturer": ["производитель", "бренд", "manufacturer", "brand"],
+    "category": ["категория", "категория товара", "category"],
+    "discount": ["скидка", "действующая скидка", "скидка, %", "discount"],
+    "stock_quantity": ["кол-во на складе", "количество", "остаток", "stock_quantity", "stock"],
+    "description": ["описание", "описание товара", "description"],
+    "image_path": ["фото", "изображение", "image_path", "image"],
+}
+
+
+class PriceListError(Exception):
+    """Прайс-лист нельзя загрузить целиком (текст ошибки - для пользователя)"""
+
+
+class PriceListService:
+    @staticmethod
+    def import_price_list(path, dry_run=False):
+        """Загрузка прайс-листа (CSV/XLSX) в каталог.
+
+        Новые артикулы добавляются, существующие обновляются (пустая ячейка не
+        затирает значение в БД, неизменившиеся товары не перезаписываются).
+        Строки с ошибками отклоняются, остальные загружаются. dry_run - только
+        проверка, изменения откатываются.
+
+        Возвращает отчет: {'inserted', 'updated', 'unchanged', 'rejected',
+        'errors': [(номер строки, артикул, причина), ...]}.
+        """
+        columns, rows = PriceListService._read_price_list(path)
+
+        with tempfile.SpooledTemporaryFile(max_size=COPY_SPOOL_MB * 1024 * 1024, mode="w+",
+                                           encoding="utf-8", newline="") as buffer:
+            total = PriceListService._write_copy_data(buffer, columns, rows)
+            buffer.seek(0)
+            if total == 0:
+                raise PriceListError("В прайс-листе нет строк с товарами")
+
+            with engine.connect() as conn, conn.begin() as transaction:
+                PriceListService._create_staging(conn)
+                # COPY - через курсор psycopg2 того же соединения (та же транзакция)
+                cursor = conn.connection.cursor()
+                cursor.copy_expert(
+                    f"COPY {STAGING_TABLE} (line_no, {', '.join(IMPORT_COLUMNS)}) "
+                    f"FROM STDIN WITH (FORMAT csv)", buffer)
+                PriceListService._validate_staging(conn)
+                report = PriceListService._merge_staging(conn, total)
+                if dry_run:
+                    transaction.rollback()
+
+        print(f"✅ Прайс-лист {os.path.basename(path)}: добавлено {report['inserted']}, "
+              f"обновлено {report['updated']}, без изменений {report['unchanged']}, "
+              f"отклонено {report['rejected']}" + (" (проверка, без сохранения)" if dry_run else ""))
+
+        if not dry_run and (report['inserted'] or report['updated']):
+            # Индекс каталога и справочники перечитывают товары целиком
+            from product_service import ProductService
+            ProductService._notify_change("imported", None)
+        return report
+
+    # === Чтение файла ===
+    @staticmethod
+    def _read_price_list(path):
+        """(столбцы products по порядку столбцов файла или None, итератор строк данных)"""
+        extension = os.path.splitext(path)[1].lower()
+        if not os.path.isfile(path):
+            raise PriceListError(f"Файл не найден: {path}")
+        if extension == ".xlsx":
+            rows = PriceListService._xlsx_rows(path)
+        elif extension in (".csv", ".txt"):
+            rows = PriceListService._csv_rows(path)
+        else:
+            raise PriceListError("Поддерживаются прайс-листы CSV и XLSX")
+
+        header = next(rows, None)
+        if header is None:
+            raise PriceListError("Файл пуст")
+        columns = PriceListService._map_header(header)
+        return columns, rows
+
+    @staticmethod
+    def _csv_rows(path):
+        with open(path, encoding="utf-8-sig", newline="") as source:
+            sample = source.read(64 * 1024)
+            source.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=";,\t")
+            except csv.Error:
+                dialect = csv.excel
+            yield from csv.reader(source, dialect)
+
+    @staticmethod
+    def _xlsx_rows(path):
+        if load_workbook is None:
+            raise PriceListError("Для чтения XLSX нужен пакет openpyxl (pip install openpyxl)")
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for row in workbook.active.iter_rows():
+                yield tuple(PriceListService._xlsx_value(cell) for cell in row)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _xlsx_value(cell):
+        """Значение ячейки XLSX; в ячейке с процентным форматом хранится доля
+        (0.15 показывается как 15%) - возвращаем то, что видно в таблице"""
+        value = cell.value
+        if (isinstance(value, (int, float)) and not isinstance(value, bool)
+                and "%" in (getattr(cell, "number_format", None) or "")):
+            return round(value * 100, 6)
+        return value
+
+    @staticmethod
+    def _map_header(header):
+        aliases = {alias: column for column, names in HEADER_ALIASES.items() for alias in names}
+        columns = []
+        for cell in header:
+            key = re.sub(r"\s+", " ", str(cell or "")).strip().lower()
+            column = aliases.get(key)
+            columns.append(column if column not in columns else None)
+        if "article" not in columns:
+            raise PriceListError("В прайс-листе нет столбца с артикулом")
+        print(f"   📄 Столбцы прайс-листа: {', '.join(column for column in columns if column)}")
+        return columns
+
+    # === Подготовка данных для COPY ===
+    @staticmethod
+    def _cell_text(value):
+        """Значение ячейки текстом: 15.0 из XLSX -> "15", пустое -> None (NULL в COPY)"""
+        if value is None:
+            return None
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        value = str(value).strip()
+        return value or None
+
+    @staticmethod
+    def _normalize(column, value):
+        """Цена "1 500,50 ₽" -> "1500.50", скидка "15%" -> "15" (проверка - в SQL)"""
+        if value is None:
+            return None
+        if column == "price":
+            value = re.sub(r"[\s₽]|руб\.?", "", value).replace(",", ".")
+        elif column == "discount":
+            value = re.sub(r"[\s%]", "", value)
+        elif column == "stock_quantity":
+            value = re.sub(r"\s", "", value)
+        return value or None
+
+    @staticmethod
+    def _write_copy_data(buffer, columns, rows):
+        """Строки прайс-листа в формате CSV для COPY (все значения - текстом).
+        Возвращает число строк данных."""
+        writer = csv.writer(buffer)
+        total = 0
+        for line_no, row in enumerate(rows, start=2):
+            values = dict.fromkeys(IMPORT_COLUMNS)
+            for column, cell in zip(columns, row):
+                if column is not None:
+                    values[column] = PriceListService._normalize(column, PriceListService._cell_text(cell))
+            if not any(values.values()):
+                continue  # Пустые строки в конце таблиц - не ошибка
+            writer.writerow([line_no, *values.values()])
+            total += 1
+        return total
+
+    # === Проверка и слияние в SQL ===
+    @staticmethod
+    def _create_staging(conn):
+        column_defs = ", ".join(f"{column} text" for column in IMPORT_COLUMNS)
+        conn.execute(text(f"""
+            CREATE TEMP TABLE {STAGING_TABLE} (
+                line_no integer PRIMARY KEY,
+                {column_defs},
+                error text
+            ) ON COMMIT DROP
+        """))
+
+    @staticmethod
+    def _validate_staging(conn):
+        """Причина отклонения строки - в столбце error (первая найденная)"""
+        checks = ["WHEN article IS NULL THEN 'не указан артикул'"]
+        for column, (max_length, _) in IMPORT_COLUMNS.items():
+            if max_length:
+                checks.append(f"WHEN length({column}) > {max_length} "
+                              f"THEN '{column}: длиннее {max_length} символов'")
+        checks += [
+            r"WHEN price !~ '^\d{1,8}(\.\d{1,2})?$' THEN 'price: нужна неотрицательная цена не точнее копеек'",
+            r"WHEN discount !~ '^\d{1,3}$' THEN 'discount: нужно целое число процентов от 0 до 100'",
+            "WHEN discount::integer > 100 THEN 'discount: нужно целое число процентов от 0 до 100'",
+            r"WHEN stock_quantity !~ '^\d{1,9}$' THEN 'stock_quantity: нужно целое неотрицательное число'",
+            f"""WHEN name IS NULL AND NOT EXISTS (
+                    SELECT 1 FROM products WHERE products.article = {STAGING_TABLE}.article
+                ) THEN 'name: у нового товара нет названия'""",
+        ]
+        # CASE проверяет условия по порядку - приведение типа только после проверки формата
+        conn.execute(text(f"UPDATE {STAGING_TABLE} SET error = CASE {' '.join(checks)} END"))
+
+        # Повтор артикула в файле: загружается последняя корректная строка
+        conn.execute(text(f"""
+            UPDATE {STAGING_TABLE} AS staging
+            SET error = 'артикул повторяется в строке ' || duplicates.last_line
+            FROM (
+                SELECT article, max(line_no) AS last_line
+                FROM {STAGING_TABLE}
+                WHERE error IS NULL
+                GROUP BY article
+                HAVING count(*) > 1
+            ) AS duplicates
+            WHERE staging.article = duplicates.article
+              AND staging.line_no < duplicates.last_line
+              AND staging.error IS NULL
+        """))
+
+    @staticmethod
+    def _merge_staging(conn, total):
+        """INSERT ... ON CONFLICT DO UPDATE корректных строк, отчет о загрузке"""
+        columns = list(IMPORT_COLUMNS)
+        updated_columns = [column for column in columns if column != "article"]
+        select_list = ", ".join(f"{column}::{cast}" if cast else column
+                                for column, (_, cast) in IMPORT_COLUMNS.items())
+        new_values = [f"coalesce(EXCLUDED.{column}, products.{column})" for column in updated_columns]
+
+        # xmax = 0 у только что вставленной строки; неизменившиеся товары не перезаписываются
+        inserted, updated = conn.execute(text(f"""
+            WITH merged AS (
+                INSERT INTO products ({', '.join(columns)})
+                SELECT {select_list}
+                FROM {STAGING_TABLE}
+                WHERE error IS NULL
+                ON CONFLICT (article) DO UPDATE SET
+                    {', '.join(f'{column} = {value}' for column, value in zip(updated_columns, new_values))}
+                WHERE ({', '.join(f'products.{column}' for column in updated_columns)})
+                    IS DISTINCT FROM ({', '.join(new_values)})
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted)
+            FROM merged
+        """)).one()
+
+        rejected = conn.execute(text(f"SELECT count(*) FROM {STAGING_TABLE} WHERE error IS NOT NULL")).scalar()
+        errors = conn.execute(text(f"""
+            SELECT line_no, article, error FROM {STAGING_TABLE}
+            WHERE error IS NOT NULL ORDER BY line_no LIMIT :limit
+        """), {"limit": IMPORT_ERROR_LIMIT}).all()
+
+        return {
+            'inserted': inserted,
+            'updated': updated,
+            'unchanged': total - rejected - inserted - updated,
+            'rejected': rejected,
+            'errors': [tuple(row) for row in errors],
+        }
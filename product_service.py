@@ -1,10 +1,55 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, func, tuple_, literal, text
 from database import get_db
-from models import Product, OrderItem
+from image_service import ImageService
+from models import Product, OrderItem, FULLTEXT_CONFIG
 import os
 
+# Размер страницы каталога по умолчанию
+PAGE_SIZE = 50
+
+# Ключи сортировки каталога: выражение и направление. Вторым ключом всегда идет
+# артикул, поэтому порядок однозначен и выборку можно продолжать с места (keyset).
+# coalesce - чтобы NULL не ломали сравнение строк; под выражения есть индексы (0003)
+PRODUCT_SORT_KEYS = {
+    "name_asc": (func.coalesce(Product.name, ""), "asc"),
+    "name_desc": (func.coalesce(Product.name, ""), "desc"),
+    "price_asc": (func.coalesce(Product.price, 0), "asc"),
+    "price_desc": (func.coalesce(Product.price, 0), "desc"),
+    "stock_quantity_asc": (func.coalesce(Product.stock_quantity, 0), "asc"),
+    "stock_quantity_desc": (func.coalesce(Product.stock_quantity, 0), "desc"),
+    "final_price_asc": (Product.final_price, "asc"),
+    "final_price_desc": (Product.final_price, "desc"),
+}
+
+# Поля, по которым считаются фасеты каталога (количество товаров на значение)
+FACET_FIELDS = ("supplier", "category", "manufacturer")
+
+# Слушатели изменений каталога: callback(action, article, product), где action -
+# "created" / "updated" / "deleted", article - артикул до изменения;
+# "imported" (article и product - None) - массовая загрузка прайс-листа
+_change_listeners = []
+
 class ProductService:
+    @staticmethod
+    def add_change_listener(callback):
+        """Подписка на создание, изменение и удаление товаров через сервис"""
+        if callback not in _change_listeners:
+            _change_listeners.append(callback)
+    
+    @staticmethod
+    def remove_change_listener(callback):
+        if callback in _change_listeners:
+            _change_listeners.remove(callback)
+    
+    @staticmethod
+    def _notify_change(action, article, product=None):
+        for callback in list(_change_listeners):
+            try:
+                callback(action, article, product)
+            except Exception as e:
+                print(f"Ошибка обработчика изменения товара: {e}")
+    
     @staticmethod
     def get_all_products():
         """Получение всех товаров"""
@@ -19,47 +64,64 @@ class ProductService:
             db.close()
     
     @staticmethod
-    def get_products_with_filters(search_text="", supplier_filter="", sort_by="name"):
+    def _apply_filters(query, search_text="", supplier_filter="", min_price=None, max_price=None,
+                       min_discount=None, in_stock_only=False):
+        """Условия поиска и фильтров (общие для списка и страниц каталога)"""
+        if search_text:
+            search_text = search_text.strip()
+            print(f"🔍 Поисковый запрос: '{search_text}'")
+
+            words = [word.strip() for word in search_text.split() if word.strip()]
+            print(f"🔍 Слова для поиска: {words}")
+            
+            # Каждое слово ищется в search_text (все поля товара одной строкой):
+            # одно условие на слово использует GIN-индекс pg_trgm вместо seq scan
+            if words:
+                for word in words:
+                    query = query.filter(Product.search_text.ilike(f"%{word}%"))
+        
+        return ProductService._apply_value_filters(query, supplier_filter, min_price, max_price,
+                                                   min_discount, in_stock_only)
+    
+    @staticmethod
+    def _apply_value_filters(query, supplier_filter="", min_price=None, max_price=None,
+                             min_discount=None, in_stock_only=False):
+        """Фильтры по поставщику, итоговой цене, скидке и наличию"""
+        # Фильтрация по поставщику
+        if supplier_filter and supplier_filter != "Все поставщики":
+            query = query.filter(Product.supplier == supplier_filter)
+            print(f"🔍 Фильтр по поставщику: {supplier_filter}")
+        
+        # Диапазон цены - по цене со скидкой, которую платит покупатель
+        if min_price is not None:
+            query = query.filter(Product.final_price >= min_price)
+        if max_price is not None:
+            query = query.filter(Product.final_price <= max_price)
+        if min_discount:
+            query = query.filter(func.coalesce(Product.discount, 0) >= min_discount)
+        if in_stock_only:
+            query = query.filter(Product.stock_quantity > 0)
+        
+        return query
+    
+    @staticmethod
+    def _sort_key(sort_by):
+        """Выражение и направление сортировки для sort_by (по умолчанию - по названию)"""
+        return PRODUCT_SORT_KEYS.get(sort_by, PRODUCT_SORT_KEYS["name_asc"])
+    
+    @staticmethod
+    def get_products_with_filters(search_text="", supplier_filter="", sort_by="name", **filters):
+        """Товары по поиску и фильтрам; filters - min_price, max_price, min_discount, in_stock_only"""
         db: Session = next(get_db())
         try:
-            query = db.query(Product)
-            
-            if search_text:
-                search_text = search_text.strip()
-                print(f"🔍 Поисковый запрос: '{search_text}'")
-    
-                words = [word.strip() for word in search_text.split() if word.strip()]
-                print(f"🔍 Слова для поиска: {words}")
-                
-                if words:
-                    for word in words:
-                        word_condition = or_(
-                            Product.name.ilike(f"%{word}%"),
-                            Product.description.ilike(f"%{word}%"),
-                            Product.category.ilike(f"%{word}%"),
-                            Product.manufacturer.ilike(f"%{word}%"),
-                            Product.supplier.ilike(f"%{word}%"),
-                            Product.article.ilike(f"%{word}%")
-                        )
-                        query = query.filter(word_condition)
-            
-            # Фильтрация по поставщику
-            if supplier_filter and supplier_filter != "Все поставщики":
-                query = query.filter(Product.supplier == supplier_filter)
-                print(f"🔍 Фильтр по поставщику: {supplier_filter}")
+            query = ProductService._apply_filters(db.query(Product), search_text, supplier_filter, **filters)
             
             # Сортировка
-            sort_mapping = {
-                "stock_quantity_asc": Product.stock_quantity.asc(),
-                "stock_quantity_desc": Product.stock_quantity.desc(),
-                "price_asc": Product.price.asc(),
-                "price_desc": Product.price.desc(),
-                "name_desc": Product.name.desc(),
-                "name_asc": Product.name.asc()
-            }
-            
-            sort_order = sort_mapping.get(sort_by, Product.name.asc())
-            query = query.order_by(sort_order)
+            sort_expr, direction = ProductService._sort_key(sort_by)
+            if direction == "asc":
+                query = query.order_by(sort_expr.asc(), Product.article.asc())
+            else:
+                query = query.order_by(sort_expr.desc(), Product.article.desc())
             
             results = query.all()
             print(f"✅ Найдено товаров: {len(results)}")
@@ -74,6 +136,183 @@ class ProductService:
         finally:
             db.close()
     
+    @staticmethod
+    def get_products_page(search_text="", supplier_filter="", sort_by="name_asc",
+                          cursor=None, page_size=PAGE_SIZE, **filters):
+        """Страница каталога (keyset-пагинация).
+        
+        Возвращает (товары, курсор следующей страницы или None). Курсор - пара
+        (значение ключа сортировки, артикул) последнего товара страницы.
+        """
+        db: Session = next(get_db())
+        try:
+            return ProductService._query_products_page(db, search_text, supplier_filter, sort_by,
+                                                       cursor, page_size, **filters)
+        except Exception as e:
+            print(f"❌ Ошибка при получении страницы каталога: {e}")
+            import traceback
+            traceback.print_exc()
+            return [], None
+        finally:
+            db.close()
+    
+    @staticmethod
+    def _query_products_page(db, search_text="", supplier_filter="", sort_by="name_asc",
+                             cursor=None, page_size=PAGE_SIZE, **filters):
+        sort_expr, direction = ProductService._sort_key(sort_by)
+        query = db.query(Product, sort_expr.label("sort_key"))
+        query = ProductService._apply_filters(query, search_text, supplier_filter, **filters)
+        
+        # Продолжаем строго после последней строки предыдущей страницы
+        if cursor is not None:
+            last_key, last_article = cursor
+            position = tuple_(sort_expr, Product.article)
+            boundary = tuple_(literal(last_key), literal(last_article))
+            query = query.filter(position > boundary if direction == "asc" else position < boundary)
+        
+        if direction == "asc":
+            query = query.order_by(sort_expr.asc(), Product.article.asc())
+        else:
+            query = query.order_by(sort_expr.desc(), Product.article.desc())
+        
+        # Одна лишняя строка показывает, есть ли следующая страница
+        rows = query.limit(page_size + 1).all()
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        
+        products = [row[0] for row in rows]
+        next_cursor = (rows[-1].sort_key, rows[-1][0].article) if has_more else None
+        print(f"✅ Страница каталога: {len(products)} товаров, есть продолжение: {has_more}")
+        
+        return products, next_cursor
+    
+    @staticmethod
+    def get_catalog_first_page(check_orders=False, **page_query):
+        """Все данные для показа выборки одним обращением к БД (одно соединение):
+        (товары первой страницы, курсор, артикулы в заказах, фасеты)"""
+        page_query.pop("cursor", None)
+        facet_query = {key: value for key, value in page_query.items()
+                       if key not in ("sort_by", "page_size")}
+        
+        db: Session = next(get_db())
+        try:
+            products, next_cursor = ProductService._query_products_page(db, **page_query)
+            blocked = set()
+            if check_orders and products:
+                blocked = ProductService._query_articles_in_orders(
+                    db, [product.article for product in products])
+            facets = ProductService._query_facets(db, **facet_query)
+            return products, next_cursor, blocked, facets
+        except Exception as e:
+            print(f"❌ Ошибка при получении каталога: {e}")
+            import traceback
+            traceback.print_exc()
+            return [], None, set(), {field: [] for field in FACET_FIELDS}
+        finally:
+            db.close()
+    
+    @staticmethod
+    def search_products_fulltext(search_text="", supplier_filter="", limit=100, **filters):
+        """Полнотекстовый поиск по словам с ранжированием (ts_rank по search_vector)"""
+        search_text = (search_text or "").strip()
+        if not search_text:
+            return ProductService.get_products_with_filters(supplier_filter=supplier_filter, **filters)
+        
+        db: Session = next(get_db())
+        try:
+            ts_query = func.websearch_to_tsquery(FULLTEXT_CONFIG, search_text)
+            rank = func.ts_rank(Product.search_vector, ts_query)
+            
+            query = db.query(Product).filter(Product.search_vector.op("@@")(ts_query))
+            query = ProductService._apply_value_filters(query, supplier_filter, **filters)
+            
+            results = query.order_by(rank.desc(), Product.name.asc()).limit(limit).all()
+            print(f"✅ Полнотекстовый поиск '{search_text}': найдено {len(results)}")
+            return results
+        except Exception as e:
+            print(f"❌ Ошибка полнотекстового поиска: {e}")
+            import traceback
+            traceback.print_exc()
+            return []
+        finally:
+            db.close()
+    
+    @staticmethod
+    def count_products():
+        """Количество товаров в каталоге"""
+        db: Session = next(get_db())
+        try:
+            return db.query(func.count(Product.article)).scalar() or 0
+        finally:
+            db.close()
+    
+    @staticmethod
+    def get_catalog_version():
+        """Версия каталога (растет при любом изменении products, миграция 0009)"""
+        db: Session = next(get_db())
+        try:
+            return db.execute(text("SELECT version FROM catalog_version WHERE id = 1")).scalar()
+        finally:
+            db.close()
+    
+    @staticmethod
+    def get_facets(search_text="", fulltext=False, **filters):
+        """Фасеты каталога для текущего поиска: {поле: [(значение, количество), ...]}.
+        
+        Все поля считаются одним запросом GROUP BY GROUPING SETS. Фильтр по
+        поставщику в подсчете не участвует, чтобы в списке оставались все
+        поставщики с количеством найденных у них товаров.
+        """
+        db: Session = next(get_db())
+        try:
+            return ProductService._query_facets(db, search_text, fulltext, **filters)
+        except Exception as e:
+            print(f"❌ Ошибка при подсчете фасетов: {e}")
+            return {field: [] for field in FACET_FIELDS}
+        finally:
+            db.close()
+    
+    @staticmethod
+    def _query_facets(db, search_text="", fulltext=False, **filters):
+        filters.pop("supplier_filter", None)
+        columns = [getattr(Product, field) for field in FACET_FIELDS]
+        
+        query = db.query(*columns, func.grouping(*columns).label("grouping"),
+                         func.count().label("count"))
+        search_text = (search_text or "").strip()
+        if fulltext and search_text:
+            ts_query = func.websearch_to_tsquery(FULLTEXT_CONFIG, search_text)
+            query = query.filter(Product.search_vector.op("@@")(ts_query))
+            query = ProductService._apply_value_filters(query, **filters)
+        else:
+            query = ProductService._apply_filters(query, search_text, **filters)
+        query = query.group_by(func.grouping_sets(*[tuple_(column) for column in columns]))
+        
+        # GROUPING(...) - битовая маска: 0 у поля, по которому сгруппирована строка
+        facets = {field: [] for field in FACET_FIELDS}
+        width = len(FACET_FIELDS)
+        for row in query.all():
+            for position, field in enumerate(FACET_FIELDS):
+                if row.grouping == (1 << width) - 1 - (1 << (width - 1 - position)):
+                    value = row[position]
+                    if value:
+                        facets[field].append((value, row.count))
+        for values in facets.values():
+            values.sort()
+        return facets
+    
+    @staticmethod
+    def get_product_choices():
+        """Пары (артикул, название) для выбора товара - без загрузки объектов Product"""
+        db: Session = next(get_db())
+        try:
+            return db.query(Product.article, Product.name).order_by(Product.article).all()
+        except Exception as e:
+            print(f"Ошибка при получении списка товаров: {e}")
+            return []
+        finally:
+            db.close()
+    
     @staticmethod
     def get_all_suppliers():
         """Получение всех уникальных поставщиков"""
@@ -105,6 +344,7 @@ class ProductService:
             db.add(product)
             db.commit()
             db.refresh(product)
+            ProductService._notify_change("created", product.article, product)
             return product
         except Exception as e:
             db.rollback()
@@ -120,10 +360,14 @@ class ProductService:
         try:
             product = db.query(Product).filter(Product.article == article).first()
             if product:
+                old_image = product.image_path
                 for key, value in product_data.items():
                     setattr(product, key, value)
                 db.commit()
                 db.refresh(product)
+                if old_image and old_image != product.image_path:
+                    ProductService._remove_image_if_unused(db, old_image)
+                ProductService._notify_change("updated", article, product)
             return product
         except Exception as e:
             db.rollback()
@@ -146,6 +390,40 @@ class ProductService:
         finally:
             db.close()
     
+    @staticmethod
+    def get_articles_in_orders(articles):
+        """Какие из переданных товаров присутствуют в заказах (одним запросом на страницу)"""
+        if not articles:
+            return set()
+        db: Session = next(get_db())
+        try:
+            return ProductService._query_articles_in_orders(db, articles)
+        except Exception as e:
+            print(f"Ошибка при проверке товаров в заказах: {e}")
+            return set()
+        finally:
+            db.close()
+    
+    @staticmethod
+    def _query_articles_in_orders(db, articles):
+        rows = db.query(OrderItem.product_article)\
+            .filter(OrderItem.product_article.in_(list(articles)))\
+            .distinct()\
+            .all()
+        return {row[0] for row in rows}
+    
+    @staticmethod
+    def get_all_articles_in_orders():
+        """Артикулы всех товаров, присутствующих в заказах"""
+        db: Session = next(get_db())
+        try:
+            return {row[0] for row in db.query(OrderItem.product_article).distinct().all()}
+        except Exception as e:
+            print(f"Ошибка при проверке товаров в заказах: {e}")
+            return set()
+        finally:
+            db.close()
+    
     @staticmethod
     def delete_product(article: str):
         db: Session = next(get_db())
@@ -157,14 +435,12 @@ class ProductService:
             if not ProductService.can_delete_product(article):
                 return False, "Товар присутствует в заказе, удаление невозможно"
             
-            if product.image_path and os.path.exists(f"resources/images/{product.image_path}"):
-                try:
-                    os.remove(f"resources/images/{product.image_path}")
-                except Exception as e:
-                    print(f"Не удалось удалить изображение: {e}")
-            
+            image_name = product.image_path
             db.delete(product)
             db.commit()
+            if image_name:
+                ProductService._remove_image_if_unused(db, image_name)
+            ProductService._notify_change("deleted", article)
             return True, "Товар успешно удален"
         except Exception as e:
             db.rollback()
@@ -172,5 +448,11 @@ class ProductService:
             return False, f"Ошибка при удалении: {e}"
         finally:
             db.close()
-            
-            
\ No newline at end of file
+
+    @staticmethod
+    def _remove_image_if_unused(db: Session, image_name: str):
+        """Удаляет файл изображения, если на него больше не ссылается ни один товар
+        (одинаковые загрузки хранятся в одном файле)"""
+        still_used = db.query(Product.article).filter(Product.image_path == image_name).first()
+        if still_used is None:
+            ImageService.remove_image(image_name)
@@ -0,0 +1,202 @@
+# thumbnail_cache.py - двухуровневый кэш миниатюр изображений
+# 1) память: QPixmapCache (LRU с ограничением объема), 2) диск: уже уменьшенные PNG.
+# Ключ миниатюры включает путь, время изменения и размер файла, поэтому
+# замена изображения товара автоматически дает новую миниатюру.
+# Дисковый кэш: миниатюры прежних версий файла удаляются при записи новой и при
+# удалении изображения (remove_disk_thumbnails), общий объем ограничен
+# THUMBNAIL_DISK_CACHE_MB (prune_disk_cache при запуске приложения).
+import hashlib
+import os
+import time
+
+from PySide6.QtCore import Qt, QSize
+from PySide6.QtGui import QImage, QImageReader, QPixmap, QPixmapCache
+
+THUMBNAIL_CACHE_DIR = os.getenv("THUMBNAIL_CACHE_DIR", "resources/cache/thumbnails")
+MEMORY_CACHE_LIMIT_KB = int(os.getenv("THUMBNAIL_MEMORY_CACHE_KB", str(64 * 1024)))
+DISK_CACHE_LIMIT_MB = int(os.getenv("THUMBNAIL_DISK_CACHE_MB", "200"))
+
+# Размеры миниатюр (в логических пикселях) в разных окнах
+CARD_THUMBNAIL_SIZE = 180
+EDIT_THUMBNAIL_SIZE = 150
+LOGIN_ICON_SIZE = 120
+
+_memory_cache_configured = False
+
+
+def thumbnail_key(path, width, height, device_pixel_ratio=1.0):
+    """Ключ миниатюры: путь + mtime + размер файла + размер миниатюры (OSError, если файла нет)"""
+    stat = os.stat(path)
+    return (f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|"
+            f"{width}x{height}@{device_pixel_ratio:g}")
+
+
+def _source_prefix(path):
+    """Общее начало имен всех миниатюр одного файла изображения"""
+    return hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:20] + "-"
+
+
+def _disk_cache_path(path, width, height, device_pixel_ratio=1.0):
+    """Файл миниатюры: <файл>-<версия файла>-<размер>.png (OSError, если файла нет)"""
+    stat = os.stat(path)
+    name = (f"{_source_prefix(path)}{stat.st_mtime_ns}-{stat.st_size}-"
+            f"{width}x{height}@{device_pixel_ratio:g}.png")
+    return os.path.join(THUMBNAIL_CACHE_DIR, name)
+
+
+def _cache_entries():
+    try:
+        return list(os.scandir(THUMBNAIL_CACHE_DIR))
+    except OSError:
+        return []
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _remove_stale_versions(path, disk_path):
+    """Удаляет миниатюры прежних версий файла (изображение заменили по тому же пути)"""
+    prefix = _source_prefix(path)
+    version = os.path.basename(disk_path)[len(prefix):].split("-", 2)[:2]
+    for entry in _cache_entries():
+        if entry.name.startswith(prefix) and entry.name[len(prefix):].split("-", 2)[:2] != version:
+            _remove_quietly(entry.path)
+
+
+def remove_disk_thumbnails(path):
+    """Удаляет все миниатюры файла изображения (вызывается при удалении изображения)"""
+    prefix = _source_prefix(path)
+    for entry in _cache_entries():
+        if entry.name.startswith(prefix):
+            _remove_quietly(entry.path)
+
+
+def prune_disk_cache(limit_mb=DISK_CACHE_LIMIT_MB):
+    """Ограничивает объем дискового кэша: удаляются давно записанные миниатюры
+    и брошенные временные файлы. Возвращает число удаленных файлов."""
+    removed = 0
+    files = []
+    for entry in _cache_entries():
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        if entry.name.endswith(".tmp"):
+            if time.time() - stat.st_mtime > 3600:
+                _remove_quietly(entry.path)
+                removed += 1
+            continue
+        files.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in files)
+    limit = limit_mb * 1024 * 1024
+    for _, size, file_path in sorted(files):
+        if total <= limit:
+            break
+        _remove_quietly(file_path)
+        total -= size
+        removed += 1
+    return removed
+
+
+def _save_atomically(image, target_path):
+    """Запись через временный файл: другие потоки/процессы не увидят недописанный PNG"""
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    tmp_path = f"{target_path}.{os.getpid()}.{id(image)}.tmp"
+    try:
+        if image.save(tmp_path, "PNG"):
+            os.replace(tmp_path, target_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_thumbnail_image(path, width, height, device_pixel_ratio=1.0):
+    """Миниатюра в виде QImage: дисковый кэш, иначе декодирование и уменьшение.
+
+    Использует только QImage/QImageReader, поэтому может вызываться из рабочих потоков.
+    Возвращает пустой QImage, если файл отсутствует или не читается.
+    """
+    try:
+        disk_path = _disk_cache_path(path, width, height, device_pixel_ratio)
+    except OSError:
+        return QImage()
+
+    if os.path.exists(disk_path):
+        image = QImage(disk_path)
+        if not image.isNull():
+            return image
+
+    target = QSize(round(width * device_pixel_ratio), round(height * device_pixel_ratio))
+
+    # Декодер сразу выдает уменьшенное изображение (JPEG масштабируется при
+    # распаковке), поэтому полноразмерная копия в памяти не создается
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    source_size = reader.size()
+    if source_size.isValid():
+        reader.setScaledSize(source_size.scaled(target, Qt.KeepAspectRatio))
+
+    image = reader.read()
+    if image.isNull():
+        return QImage()
+    if not source_size.isValid():
+        image = image.scaled(target, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+    try:
+        _save_atomically(image, disk_path)
+        _remove_stale_versions(path, disk_path)
+    except OSError as e:
+        print(f"Не удалось сохранить миниатюру {path}: {e}")
+    return image
+
+
+def _configure_memory_cache():
+    global _memory_cache_configured
+    if not _memory_cache_configured:
+        QPixmapCache.setCacheLimit(MEMORY_CACHE_LIMIT_KB)
+        _memory_cache_configured = True
+
+
+def cached_thumbnail(path, width, height, device_pixel_ratio=1.0):
+    """Миниатюра из памяти без обращения к диску (None, если ее там нет)"""
+    _configure_memory_cache()
+    try:
+        key = thumbnail_key(path, width, height, device_pixel_ratio)
+    except OSError:
+        return None
+    pixmap = QPixmapCache.find(key)
+    if pixmap is None or pixmap.isNull():
+        return None
+    return pixmap
+
+
+def pixmap_from_image(path, image, width, height, device_pixel_ratio=1.0):
+    """Превращает готовую миниатюру в QPixmap и кладет ее в кэш памяти (только GUI-поток)"""
+    _configure_memory_cache()
+    pixmap = QPixmap.fromImage(image)
+    pixmap.setDevicePixelRatio(device_pixel_ratio)
+    try:
+        QPixmapCache.insert(thumbnail_key(path, width, height, device_pixel_ratio), pixmap)
+    except OSError:
+        pass
+    return pixmap
+
+
+def get_thumbnail(path, width, height, device_pixel_ratio=1.0):
+    """Миниатюра в виде QPixmap (только GUI-поток): память -> диск -> декодирование.
+
+    Возвращает пустой QPixmap, если изображение недоступно.
+    """
+    pixmap = cached_thumbnail(path, width, height, device_pixel_ratio)
+    if pixmap is not None:
+        return pixmap
+
+    image = load_thumbnail_image(path, width, height, device_pixel_ratio)
+    if image.isNull():
+        return QPixmap()
+    return pixmap_from_image(path, image, width, height, device_pixel_ratio)
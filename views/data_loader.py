@@ -0,0 +1,103 @@
+# views/data_loader.py
+import traceback
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+from database import QueryCancelToken, cancellable
+
+
+class _TaskSignals(QObject):
+    """Сигналы задачи (QRunnable сам по себе не QObject)"""
+    finished = Signal(int, object)
+    error = Signal(int, str)
+
+
+class _LoadTask(QRunnable):
+    """Вызов метода сервиса в фоновом потоке"""
+
+    def __init__(self, generation, func, args, kwargs):
+        super().__init__()
+        self.generation = generation
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.cancel_token = QueryCancelToken()
+        self.signals = _TaskSignals()
+
+    def run(self):
+        if self.cancel_token.cancelled:
+            self.signals.error.emit(self.generation, "Запрос отменен")
+            return
+        try:
+            with cancellable(self.cancel_token):
+                result = self.func(*self.args, **self.kwargs)
+        except Exception as e:
+            traceback.print_exc()
+            self.signals.error.emit(self.generation, str(e))
+            return
+        self.signals.finished.emit(self.generation, result)
+
+
+class DataLoader(QObject):
+    """Загрузчик данных вне UI-потока.
+
+    Каждый вызов load() получает номер поколения; результат доставляется
+    сигналом loaded только если за это время не был запущен более новый запрос.
+    При cancel_superseded=True вытесненный запрос прерывается и на сервере БД.
+    """
+    loading_started = Signal()
+    loaded = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, parent=None, pool=None, cancel_superseded=True):
+        super().__init__(parent)
+        self._pool = pool or QThreadPool.globalInstance()
+        self.cancel_superseded = cancel_superseded
+        self._generation = 0
+        self._tasks = {}  # Держим ссылки на задачи до получения результата
+
+    @property
+    def is_loading(self):
+        return self._generation in self._tasks
+
+    def load(self, func, *args, **kwargs):
+        """Запускает func(*args, **kwargs) в пуле потоков, возвращает номер запроса"""
+        if self.cancel_superseded:
+            self._cancel_pending()
+        self._generation += 1
+        task = _LoadTask(self._generation, func, args, kwargs)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.error.connect(self._on_error)
+        self._tasks[self._generation] = task
+
+        self.loading_started.emit()
+        self._pool.start(task)
+        return self._generation
+
+    def cancel(self):
+        """Отменяет текущий запрос (его результат будет отброшен)"""
+        self._cancel_pending()
+        self._generation += 1
+
+    def _cancel_pending(self):
+        for generation, task in list(self._tasks.items()):
+            # Еще не начатую задачу просто убираем из очереди пула
+            if self._pool.tryTake(task):
+                self._tasks.pop(generation, None)
+            else:
+                task.cancel_token.cancel()
+
+    @Slot(int, object)
+    def _on_finished(self, generation, result):
+        self._tasks.pop(generation, None)
+        if generation != self._generation:
+            print(f"   ⏭️ Устаревший результат запроса #{generation} отброшен")
+            return
+        self.loaded.emit(result)
+
+    @Slot(int, str)
+    def _on_error(self, generation, message):
+        self._tasks.pop(generation, None)
+        if generation != self._generation:
+            return
+        self.failed.emit(message)
@@ -0,0 +1,130 @@
+# views/image_loader.py
+import os
+import traceback
+from collections import OrderedDict
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+from PySide6.QtGui import QImage
+
+from thumbnail_cache import cached_thumbnail, load_thumbnail_image, pixmap_from_image
+
+# Сколько неудачных декодирований помнить (самые старые забываются)
+FAILED_KEYS_LIMIT = 1000
+
+
+def _file_stamp(path):
+    """(mtime, размер) файла или None, если файла нет: по нему видно, что файл заменили"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _ImageTaskSignals(QObject):
+    """Сигналы задачи декодирования (QRunnable сам по себе не QObject)"""
+    finished = Signal(object, QImage)
+
+
+class _ImageTask(QRunnable):
+    """Декодирование миниатюры в рабочем потоке (только QImage, без QPixmap)"""
+
+    def __init__(self, key):
+        super().__init__()
+        self.key = key
+        self.signals = _ImageTaskSignals()
+
+    def run(self):
+        path, width, height, device_pixel_ratio = self.key
+        try:
+            image = load_thumbnail_image(path, width, height, device_pixel_ratio)
+        except Exception:
+            traceback.print_exc()
+            image = QImage()
+        self.signals.finished.emit(self.key, image)
+
+
+class ImageLoader(QObject):
+    """Фоновая загрузка миниатюр для списка товаров.
+
+    pixmap() сразу возвращает готовую миниатюру из памяти или None и ставит
+    декодирование в очередь собственного пула потоков. Более поздние запросы
+    получают больший приоритет: последними запрашивают карточки, которые
+    сейчас рисуются, т.е. видны на экране. Когда изображение готово,
+    отправляется сигнал image_ready(путь).
+    """
+    image_ready = Signal(str)
+
+    def __init__(self, parent=None, max_threads=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        if max_threads is None:
+            max_threads = int(os.getenv("IMAGE_LOADER_THREADS",
+                                        str(max(2, QThreadPool.globalInstance().maxThreadCount() // 2))))
+        self._pool.setMaxThreadCount(max_threads)
+        self._pending = {}  # ключ -> задача (в очереди или выполняется)
+        self._failed = OrderedDict()  # Ключ, который не удалось декодировать -> _file_stamp файла
+        self._priority = 0
+
+    def pixmap(self, path, width, height, device_pixel_ratio=1.0):
+        """Готовая миниатюра или None (тогда загрузка запускается в фоне)"""
+        pixmap = cached_thumbnail(path, width, height, device_pixel_ratio)
+        if pixmap is not None:
+            return pixmap
+
+        key = (path, width, height, device_pixel_ratio)
+        if key in self._failed:
+            if self._failed[key] == _file_stamp(path):
+                return None
+            del self._failed[key]  # Файл заменили (например, в окне редактирования) - пробуем снова
+        self._request(key)
+        return None
+
+    def is_failed(self, path, width, height, device_pixel_ratio=1.0):
+        return (path, width, height, device_pixel_ratio) in self._failed
+
+    def invalidate(self, path=None):
+        """Забывает неудачные декодирования файла (или всех файлов, если path не задан)"""
+        if path is None:
+            self._failed.clear()
+            return
+        for key in [key for key in self._failed if key[0] == path]:
+            del self._failed[key]
+
+    def _request(self, key):
+        self._priority += 1
+        task = self._pending.get(key)
+        if task is not None:
+            # Задача уже в очереди: поднимаем ее приоритет, выполняющуюся не трогаем
+            if self._pool.tryTake(task):
+                self._pool.start(task, self._priority)
+            return
+
+        task = _ImageTask(key)
+        task.signals.finished.connect(self._on_finished)
+        self._pending[key] = task
+        self._pool.start(task, self._priority)
+
+    def cancel_except(self, paths):
+        """Убирает из очереди задачи для изображений, которых больше нет на экране"""
+        paths = set(paths)
+        for key, task in list(self._pending.items()):
+            if key[0] not in paths and self._pool.tryTake(task):
+                self._pending.pop(key, None)
+
+    def cancel_all(self):
+        self.cancel_except(())
+
+    @Slot(object, QImage)
+    def _on_finished(self, key, image):
+        self._pending.pop(key, None)
+        if image.isNull():
+            self._failed[key] = _file_stamp(key[0])
+            self._failed.move_to_end(key)
+            while len(self._failed) > FAILED_KEYS_LIMIT:
+                self._failed.popitem(last=False)
+            return
+
+        path, width, height, device_pixel_ratio = key
+        pixmap_from_image(path, image, width, height, device_pixel_ratio)
+        self.image_ready.emit(path)
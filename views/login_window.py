@@ -2,9 +2,10 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QLineEdit, QPushButton, QFrame, QMessageBox)
 from PySide6.QtCore import Signal, Qt
-from PySide6.QtGui import QFont, QPixmap, QIcon
+from PySide6.QtGui import QFont, QIcon
 import os
 from auth_service import AuthService
+from thumbnail_cache import LOGIN_ICON_SIZE, get_thumbnail
 
 class LoginWindow(QWidget):
     login_success = Signal(object)
@@ -45,9 +46,9 @@ class LoginWindow(QWidget):
         
         icon_label = QLabel()
         if os.path.exists("resources/images/icon.png"):
-            pixmap = QPixmap("resources/images/icon.png")
-            scaled_pixmap = pixmap.scaled(120, 120, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            icon_label.setPixmap(scaled_pixmap)
+            pixmap = get_thumbnail("resources/images/icon.png", LOGIN_ICON_SIZE, LOGIN_ICON_SIZE,
+                                   icon_label.devicePixelRatioF())
+            icon_label.setPixmap(pixmap)
         icon_label.setAlignment(Qt.AlignCenter)
         
         title_label = QLabel("Магазин обуви")
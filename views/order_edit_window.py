@@ -6,8 +6,9 @@ from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
 from PySide6.QtCore import Signal, Qt, QDateTime
 from PySide6.QtGui import QFont, QColor
 
-from order_service import OrderService
+from order_service import OrderService, ORDER_STATUSES
 from product_service import ProductService
+from views.reference_data import reference_data
 
 class OrderEditWindow(QWidget):
     order_saved = Signal()
@@ -85,13 +86,7 @@ class OrderEditWindow(QWidget):
         # Статус заказа (выпадающий список)
         info_layout.addWidget(QLabel("Статус заказа*:"), 1, 0)
         self.status_combo = QComboBox()
-        self.status_combo.addItems([
-            "новый",
-            "в обработке", 
-            "собран",
-            "доставлен",
-            "отменен"
-        ])
+        self.status_combo.addItems(ORDER_STATUSES)
         self.status_combo.setStyleSheet("""
             QComboBox {
                 padding: 6px;
@@ -428,24 +423,18 @@ class OrderEditWindow(QWidget):
         self.setLayout(layout)
     
     def load_pickup_points(self):
-        """Загрузка списка пунктов выдачи"""
+        """Список пунктов выдачи из общего справочника (без запроса при каждом открытии)"""
         try:
-            self.pickup_points = OrderService.get_all_pickup_points()
-            self.address_combo.clear()
-            self.address_combo.addItem("")  # Пустой элемент
-            for point in self.pickup_points:
-                if point and point.address:
-                    self.address_combo.addItem(point.address)
+            reference_data().bind_combo(self.address_combo, "pickup_points")
+            self.address_combo.setEditText("")
         except Exception as e:
             print(f"❌ Ошибка загрузки пунктов выдачи: {e}")
     
     def load_products(self):
-        """Загрузка списка товаров для выбора"""
+        """Список товаров для выбора из общего справочника"""
         try:
-            products = ProductService.get_all_products()
-            self.product_combo.clear()
-            for product in products:
-                self.product_combo.addItem(f"{product.article} - {product.name}", product.article)
+            reference_data().bind_combo(self.product_combo, "products")
+            self.product_combo.setCurrentIndex(0 if self.product_combo.count() else -1)
         except Exception as e:
             print(f"❌ Ошибка загрузки товаров: {e}")
     
@@ -612,13 +601,17 @@ class OrderEditWindow(QWidget):
         if address:
             order_data['pickup_point_address'] = address
         
+        # Товары заказа сохраняются вместе с заказом
+        items_data = [{
+            'product_article': item['product'].article,
+            'quantity': item['quantity']
+        } for item in self.selected_products]
+        
         try:
             if self.is_editing:
                 # Обновление существующего заказа
-                result = OrderService.update_order(self.order.id, order_data)
+                result = OrderService.save_order(order_data, items_data, order_id=self.order.id)
                 if result:
-                    # Сохраняем товары в заказе
-                    self.save_order_items(self.order.id)
                     QMessageBox.information(self, "Успех", "Заказ успешно обновлен")
                     self.order_saved.emit()
                     self.close()
@@ -628,10 +621,8 @@ class OrderEditWindow(QWidget):
                 # Создание нового заказа
                 order_data['user_id'] = int(self.user_id_input.text()) if hasattr(self, 'user_id_input') else 1
                 
-                result = OrderService.create_order(order_data)
+                result = OrderService.save_order(order_data, items_data)
                 if result:
-                    # Сохраняем товары в заказе
-                    self.save_order_items(result.id)
                     QMessageBox.information(self, "Успех", "Заказ успешно создан")
                     self.order_saved.emit()
                     self.close()
@@ -640,20 +631,4 @@ class OrderEditWindow(QWidget):
                     
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Произошла ошибка: {str(e)}")
-            print(f"❌ Ошибка при сохранении заказа: {e}")
-    
-    def save_order_items(self, order_id):
-        """Сохранение товаров в заказе"""
-        if not self.selected_products:
-            return
-        
-        items_data = []
-        for item in self.selected_products:
-            items_data.append({
-                'product_article': item['product'].article,
-                'quantity': item['quantity']
-            })
-        
-        # Используем метод из order_service для сохранения товаров
-        from order_service import OrderService
-        OrderService.add_order_items(order_id, items_data)
\ No newline at end of file
+            print(f"❌ Ошибка при сохранении заказа: {e}")
\ No newline at end of file
@@ -1,22 +1,80 @@
 # views/order_list_window.py - ИСПРАВЛЕННЫЙ С ОБРАБОТКОЙ ОКОН
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                             QPushButton, QMessageBox, QFrame, QScrollArea)
-from PySide6.QtCore import Qt, Signal
+                             QPushButton, QMessageBox, QFrame, QTableView,
+                             QAbstractItemView, QHeaderView, QGridLayout,
+                             QComboBox, QDateEdit, QLineEdit, QFileDialog,
+                             QProgressDialog)
+from PySide6.QtCore import Qt, Signal, QTimer, QDate, QObject
 from PySide6.QtGui import QFont
+import os
 
-from order_service import OrderService
+from order_service import OrderService, ORDER_STATUSES
 from views.order_edit_window import OrderEditWindow
-from views.order_card_widget import OrderCardWidget
+from views.order_table_model import OrderTableModel
+from views.data_loader import DataLoader
+from views.reference_data import reference_data
+
+# Минимальная дата в полях фильтра означает "не задано" (показывается текст вместо даты)
+NO_DATE = QDate(2000, 1, 1)
+
+
+class ExportProgress(QObject):
+    """Колбэк прогресса для OrderService.export_orders: вызывается в фоновом потоке,
+    сигнал доставляется в UI-поток; после отмены возвращает False"""
+    changed = Signal(int, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def __call__(self, done, total):
+        self.changed.emit(done, total)
+        return not self.cancelled
+
 
 class OrderListWindow(QWidget):
-    """Окно списка заказов в виде карточек"""
+    """Окно списка заказов (таблица на модели, рисуются только видимые строки)"""
     data_updated = Signal()
     
+    # Задержка (мс) между последним изменением текста/даты и запросом
+    FILTER_DEBOUNCE_MS = int(os.getenv("ORDER_FILTER_DEBOUNCE_MS", "300"))
+    
     def __init__(self, user):
         super().__init__()
         self.user = user
         self.orders = []
         self.current_edit_window = None  # Чтобы предотвратить множественное редактирование
+        self.page_query = {}  # Параметры текущей выборки для подгрузки следующих страниц
+        self.next_cursor = None
+        self.sort_indicator = (OrderTableModel.COLUMN_ORDER_DATE, Qt.DescendingOrder)
+
+        # Загрузка заказов выполняется в фоновом потоке
+        self.loader = DataLoader(self)
+        self.loader.loading_started.connect(self.on_loading_started)
+        self.loader.loaded.connect(self.on_orders_loaded)
+        self.loader.failed.connect(self.on_loading_failed)
+
+        # Следующие страницы подгружаются отдельно при прокрутке
+        self.page_loader = DataLoader(self)
+        self.page_loader.loaded.connect(self.on_page_loaded)
+        self.page_loader.failed.connect(self.on_loading_failed)
+
+        # Ввод артикула и дат: запрос уходит после паузы
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(self.FILTER_DEBOUNCE_MS)
+        self.filter_timer.timeout.connect(self.apply_filters)
+
+        # Выгрузка заказов в файл (не вытесняется загрузкой списка)
+        self.export_loader = DataLoader(self, cancel_superseded=False)
+        self.export_loader.loaded.connect(self.on_export_finished)
+        self.export_loader.failed.connect(self.on_export_failed)
+        self.export_dialog = None
+        self.export_path = None
+
         self.setup_ui()
         self.load_orders()
         
@@ -45,27 +103,88 @@ class OrderListWindow(QWidget):
         if self.user and self.user.role.lower() == 'администратор':
             button_panel = self.create_button_panel()
             layout.addWidget(button_panel)
+
+        # Фильтры списка заказов
+        layout.addWidget(self.create_filter_panel())
+
+        # Индикатор загрузки
+        self.loading_label = QLabel("Загрузка заказов...")
+        self.loading_label.setAlignment(Qt.AlignCenter)
+        self.loading_label.setStyleSheet("font-size: 14px; color: #666666; font-family: \"Times New Roman\"; font-weight: bold;")
+        self.loading_label.hide()
+        layout.addWidget(self.loading_label)
+
+        # Таблица заказов
+        self.order_model = OrderTableModel(self)
+        self.order_view = QTableView()
+        self.order_view.setModel(self.order_model)
+        self.order_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.order_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.order_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.order_view.setWordWrap(False)
+        self.order_view.setAlternatingRowColors(True)
+        self.order_view.verticalHeader().setDefaultSectionSize(36)
+        self.order_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.order_view.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.order_view.horizontalHeader().setSectionResizeMode(
+            OrderTableModel.COLUMN_ADDRESS, QHeaderView.Stretch)
+        self.order_view.setColumnWidth(OrderTableModel.COLUMN_ARTICLE, 220)
+        self.order_view.setColumnWidth(OrderTableModel.COLUMN_STATUS, 120)
+        self.order_view.setColumnWidth(OrderTableModel.COLUMN_ORDER_DATE, 140)
+        self.order_view.setColumnWidth(OrderTableModel.COLUMN_DELIVERY_DATE, 140)
+        self.order_view.setColumnWidth(OrderTableModel.COLUMN_USER, 200)
+        self.order_view.setColumnWidth(OrderTableModel.COLUMN_ITEMS, 80)
+        self.order_view.setColumnWidth(OrderTableModel.COLUMN_TOTAL, 120)
+        # Сортировка по клику на заголовок выполняется в БД (только столбцы с индексами)
+        header = self.order_view.horizontalHeader()
+        header.setSectionsClickable(True)
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(*self.sort_indicator)
+        header.sortIndicatorChanged.connect(self.on_sort_changed)
+        self.order_view.verticalScrollBar().valueChanged.connect(self.maybe_load_next_page)
+        self.order_view.setStyleSheet("""
+            QTableView {
+                background-color: white;
+                alternate-background-color: #F8FFF8;
+                color: #000000;
+                border: 1px solid #cccccc;
+                font-family: "Times New Roman";
+                font-size: 14px;
+                selection-background-color: #00FA9A;
+                selection-color: #000000;
+            }
+            QHeaderView::section {
+                background-color: #7FFF00;
+                color: #000000;
+                font-weight: bold;
+                padding: 5px;
+                border: 1px solid #cccccc;
+            }
+        """)
+        
+        if self.user and self.user.role.lower() == 'администратор':
+            self.order_view.doubleClicked.connect(self.on_order_double_clicked)
+            self.order_view.selectionModel().selectionChanged.connect(self.update_action_buttons)
         
-        # Контейнер для заказов
-        self.orders_container = QWidget()
-        self.orders_layout = QVBoxLayout(self.orders_container)
-        self.orders_layout.setSpacing(10)
-        self.orders_layout.setContentsMargins(5, 5, 5, 5)
-        
-        # Скроллируемая область
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setWidget(self.orders_container)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        scroll_area.setStyleSheet("""
-            QScrollArea {
-                border: none;
-                background-color: transparent;
+        self.empty_label = QLabel("ЗАКАЗЫ НЕ НАЙДЕНЫ")
+        self.empty_label.setAlignment(Qt.AlignCenter)
+        self.empty_label.setStyleSheet("""
+            QLabel {
+                font-size: 18px; 
+                color: #000000;
+                padding: 40px;
+                font-family: "Times New Roman";
+                font-weight: bold;
             }
         """)
+        self.empty_label.hide()
         
-        layout.addWidget(scroll_area, 1)
+        layout.addWidget(self.empty_label)
+        layout.addWidget(self.order_view, 1)
         self.setLayout(layout)
+        
+        if self.user and self.user.role.lower() == 'администратор':
+            self.update_action_buttons()
     
     def create_button_panel(self):
         """Создает панель управления для администратора"""
@@ -101,56 +220,361 @@ class OrderListWindow(QWidget):
         """)
         add_btn.clicked.connect(self.add_order)
         
+        # Действия над выбранной строкой таблицы
+        self.edit_btn = QPushButton("Редактировать")
+        self.delete_btn = QPushButton("Удалить")
+        for btn in (self.edit_btn, self.delete_btn):
+            btn.setMinimumHeight(40)
+            btn.setStyleSheet(add_btn.styleSheet() + """
+                QPushButton:disabled {
+                    background-color: #6c757d;
+                    border-color: #6c757d;
+                }
+            """)
+        self.edit_btn.clicked.connect(lambda: self.edit_order(self.selected_order()))
+        self.delete_btn.clicked.connect(lambda: self.delete_order(self.selected_order()))
+        
         layout.addWidget(add_btn)
+        layout.addWidget(self.edit_btn)
+        layout.addWidget(self.delete_btn)
         layout.addStretch()
         
         panel.setLayout(layout)
         return panel
     
+    def create_filter_panel(self):
+        """Панель фильтров: статус, пункт выдачи, клиент, даты, артикул товара"""
+        panel = QFrame()
+        panel.setObjectName("filterPanel")
+        panel.setStyleSheet("""
+            QFrame#filterPanel {
+                background-color: #F8FFF8;
+                border: 2px solid #7FFF00;
+                border-radius: 8px;
+                padding: 5px;
+            }
+            QLabel {
+                color: #000000;
+            }
+            QComboBox, QDateEdit, QLineEdit {
+                padding: 4px;
+                border: 1px solid #ccc;
+                border-radius: 4px;
+                background-color: white;
+                color: #000000;
+                font-family: "Times New Roman";
+                font-size: 13px;
+                min-height: 26px;
+            }
+            QComboBox QAbstractItemView {
+                background-color: white;
+                color: #000000;
+                selection-background-color: #00FA9A;
+                selection-color: #000000;
+            }
+        """)
+        
+        layout = QGridLayout()
+        layout.setHorizontalSpacing(10)
+        
+        def caption(text):
+            label = QLabel(text)
+            label.setFont(QFont("Times New Roman", 10, QFont.Bold))
+            return label
+        
+        # Данные элемента - значение фильтра для OrderService (None - без фильтра)
+        self.status_filter = QComboBox()
+        self.status_filter.addItem("Все статусы", None)
+        for status in ORDER_STATUSES:
+            self.status_filter.addItem(status, status)
+        
+        self.pickup_filter = QComboBox()
+        self.pickup_filter.setMinimumWidth(220)
+        self.customer_filter = QComboBox()
+        self.customer_filter.setMinimumWidth(180)
+        self.fill_choice_filters()
+        reference_data().refreshed.connect(self.fill_choice_filters)
+        
+        self.order_date_from = self.create_date_filter("с: любая")
+        self.order_date_to = self.create_date_filter("по: любая")
+        self.delivery_date_from = self.create_date_filter("с: любая")
+        self.delivery_date_to = self.create_date_filter("по: любая")
+        
+        self.article_filter = QLineEdit()
+        self.article_filter.setPlaceholderText("Артикул товара")
+        self.article_filter.setClearButtonEnabled(True)
+        
+        reset_btn = QPushButton("Сбросить")
+        reset_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #7FFF00;
+                color: #000000;
+                font-weight: bold;
+                padding: 5px 12px;
+                border-radius: 6px;
+                font-family: "Times New Roman";
+            }
+            QPushButton:hover {
+                background-color: #00FA9A;
+            }
+        """)
+        reset_btn.clicked.connect(self.reset_filters)
+        
+        # Выгрузка заказов по текущим фильтрам (CSV / JSON Lines)
+        export_btn = QPushButton("Выгрузить...")
+        export_btn.setStyleSheet(reset_btn.styleSheet())
+        export_btn.clicked.connect(self.export_orders)
+        
+        self.total_label = QLabel("")
+        self.total_label.setFont(QFont("Times New Roman", 10, QFont.Bold))
+        
+        layout.addWidget(caption("СТАТУС:"), 0, 0)
+        layout.addWidget(self.status_filter, 0, 1)
+        layout.addWidget(caption("ПУНКТ ВЫДАЧИ:"), 0, 2)
+        layout.addWidget(self.pickup_filter, 0, 3, 1, 2)
+        layout.addWidget(caption("КЛИЕНТ:"), 0, 5)
+        layout.addWidget(self.customer_filter, 0, 6)
+        layout.addWidget(self.total_label, 0, 7)
+        layout.addWidget(caption("ДАТА ЗАКАЗА:"), 1, 0)
+        layout.addWidget(self.order_date_from, 1, 1)
+        layout.addWidget(self.order_date_to, 1, 2)
+        layout.addWidget(caption("ДАТА ДОСТАВКИ:"), 1, 3)
+        layout.addWidget(self.delivery_date_from, 1, 4)
+        layout.addWidget(self.delivery_date_to, 1, 5)
+        layout.addWidget(self.article_filter, 1, 6)
+        layout.addWidget(reset_btn, 1, 7)
+        layout.addWidget(export_btn, 1, 8)
+        layout.setColumnStretch(3, 1)
+        
+        for combo in (self.status_filter, self.pickup_filter, self.customer_filter):
+            combo.currentIndexChanged.connect(self.apply_filters)
+        for date_edit in self.date_filters():
+            date_edit.dateChanged.connect(lambda *_: self.filter_timer.start())
+        self.article_filter.textChanged.connect(lambda *_: self.filter_timer.start())
+        
+        panel.setLayout(layout)
+        return panel
+    
+    def create_date_filter(self, special_text):
+        date_edit = QDateEdit()
+        date_edit.setCalendarPopup(True)
+        date_edit.setDisplayFormat("dd.MM.yyyy")
+        date_edit.setMinimumDate(NO_DATE)
+        date_edit.setSpecialValueText(special_text)
+        date_edit.setDate(NO_DATE)
+        return date_edit
+    
+    def date_filters(self):
+        return (self.order_date_from, self.order_date_to,
+                self.delivery_date_from, self.delivery_date_to)
+    
+    @staticmethod
+    def date_value(date_edit):
+        """Дата из поля фильтра (None - не задана)"""
+        if date_edit.date() <= NO_DATE:
+            return None
+        return date_edit.date().toPython()
+    
+    def fill_choice_filters(self, name=None):
+        """Пункты выдачи и клиенты из общего справочника (первый элемент - «все»)"""
+        for combo, reference, all_text in ((self.pickup_filter, "pickup_points", "Все пункты выдачи"),
+                                           (self.customer_filter, "customers", "Все клиенты")):
+            if name is not None and name != reference:
+                continue
+            model = reference_data().model(reference)
+            current = combo.currentData()
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItem(all_text, None)
+            for row in range(model.rowCount()):
+                item = model.item(row)
+                combo.addItem(item.text(), item.data(Qt.UserRole))
+            combo.setCurrentIndex(max(combo.findData(current), 0) if current is not None else 0)
+            combo.blockSignals(False)
+    
+    def current_filters(self):
+        """Фильтры для OrderService.get_orders_page"""
+        return {
+            'status': self.status_filter.currentData(),
+            'pickup_point_id': self.pickup_filter.currentData(),
+            'user_id': self.customer_filter.currentData(),
+            'order_date_from': self.date_value(self.order_date_from),
+            'order_date_to': self.date_value(self.order_date_to),
+            'delivery_date_from': self.date_value(self.delivery_date_from),
+            'delivery_date_to': self.date_value(self.delivery_date_to),
+            'product_article': self.article_filter.text().strip() or None,
+        }
+    
+    def current_sort(self):
+        """Ключ сортировки (ORDER_SORT_KEYS) по индикатору в заголовке таблицы"""
+        column, order = self.sort_indicator
+        direction = "asc" if order == Qt.AscendingOrder else "desc"
+        return f"{OrderTableModel.SORT_KEYS[column]}_{direction}"
+    
+    def on_sort_changed(self, column, order):
+        """Клик по заголовку: столбцы без индекса не сортируются"""
+        if column not in OrderTableModel.SORT_KEYS:
+            header = self.order_view.horizontalHeader()
+            header.blockSignals(True)
+            header.setSortIndicator(*self.sort_indicator)
+            header.blockSignals(False)
+            return
+        self.sort_indicator = (column, order)
+        self.apply_filters()
+    
+    def reset_filters(self):
+        widgets = (self.status_filter, self.pickup_filter, self.customer_filter,
+                   self.article_filter) + self.date_filters()
+        for widget in widgets:
+            widget.blockSignals(True)
+        self.status_filter.setCurrentIndex(0)
+        self.pickup_filter.setCurrentIndex(0)
+        self.customer_filter.setCurrentIndex(0)
+        self.article_filter.clear()
+        for date_edit in self.date_filters():
+            date_edit.setDate(NO_DATE)
+        for widget in widgets:
+            widget.blockSignals(False)
+        self.apply_filters()
+    
+    def apply_filters(self):
+        """Первая страница заказов по текущим фильтрам и сортировке"""
+        self.filter_timer.stop()
+        self.load_first_page({'sort_by': self.current_sort(), **self.current_filters()})
+    
     def load_orders(self):
-        """Загрузка всех заказов"""
+        """Перезагрузка списка заказов (с текущими фильтрами)"""
         print("   📥 Загружаем заказы...")
-        self.orders = OrderService.get_all_orders()
-        print(f"   ✅ Загружено заказов: {len(self.orders)}")
+        self.apply_filters()
+    
+    def load_first_page(self, page_query):
+        """Загрузка первой страницы выборки (более новый запрос вытесняет предыдущий
+        вместе с подгрузкой страниц)"""
+        self.page_loader.cancel()
+        self.page_query = page_query
+        self.next_cursor = None
+        self.loader.load(OrderService.get_orders_page, **page_query)
+    
+    def maybe_load_next_page(self, *args):
+        """Подгрузка следующей страницы, когда пользователь докрутил почти до конца"""
+        if self.next_cursor is None or self.loader.is_loading or self.page_loader.is_loading:
+            return
+        scroll_bar = self.order_view.verticalScrollBar()
+        if scroll_bar.value() >= scroll_bar.maximum() - scroll_bar.pageStep():
+            print("   📥 Подгружаем следующую страницу заказов...")
+            self.page_loader.load(OrderService.get_orders_page, cursor=self.next_cursor,
+                                  **self.page_query)
+
+    def export_orders(self):
+        """Выгрузка заказов, прошедших текущие фильтры, с индикатором прогресса"""
+        if self.export_loader.is_loading:
+            return
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Выгрузка заказов", "orders.csv", "CSV (*.csv);;JSON Lines (*.jsonl)")
+        if not path:
+            return
+        if not os.path.splitext(path)[1]:
+            path += ".jsonl" if "jsonl" in selected_filter else ".csv"
+        
+        progress = ExportProgress(self)
+        self.export_dialog = QProgressDialog("Выгрузка заказов...", "Отмена", 0, 0, self)
+        self.export_dialog.setWindowTitle("Выгрузка заказов")
+        self.export_dialog.setWindowModality(Qt.WindowModal)
+        self.export_dialog.setMinimumDuration(0)
+        self.export_dialog.setAutoClose(False)
+        self.export_dialog.canceled.connect(progress.cancel)
+        progress.changed.connect(self.on_export_progress)
+        self.export_dialog.show()
+        
+        self.export_path = path
+        print(f"   📤 Выгрузка заказов в {path}")
+        self.export_loader.load(OrderService.export_orders, path, progress=progress,
+                                **self.current_filters())
+    
+    def on_export_progress(self, done, total):
+        if self.export_dialog is None:
+            return
+        self.export_dialog.setMaximum(total)
+        self.export_dialog.setValue(min(done, total))
+        self.export_dialog.setLabelText(f"Выгружено заказов: {done} из {total}")
+    
+    def close_export_dialog(self):
+        if self.export_dialog is not None:
+            self.export_dialog.canceled.disconnect()
+            self.export_dialog.close()
+            self.export_dialog = None
+    
+    def on_export_finished(self, rows):
+        self.close_export_dialog()
+        if rows is None:
+            QMessageBox.information(self, "Выгрузка заказов", "Выгрузка прервана")
+        else:
+            QMessageBox.information(self, "Выгрузка заказов",
+                                    f"Выгружено строк: {rows}\nФайл: {self.export_path}")
+    
+    def on_export_failed(self, message):
+        self.close_export_dialog()
+        QMessageBox.critical(self, "Ошибка", f"Не удалось выгрузить заказы: {message}")
+    
+    def on_loading_started(self):
+        """Показываем состояние загрузки"""
+        self.loading_label.setText("Загрузка заказов...")
+        self.loading_label.show()
+
+    def on_orders_loaded(self, result):
+        """Первая страница: (заказы, курсор следующей страницы, всего по фильтрам)"""
+        self.loading_label.hide()
+        orders, self.next_cursor, total = result
+        print(f"   ✅ Загружено заказов: {len(orders)} из {total}")
+        self.total_label.setText(f"Найдено: {total}")
+        self.order_model.set_orders(orders)
+        self.orders = self.order_model.orders()
+        self.order_view.scrollToTop()
         self.display_orders()
+        # Если страница не заполнила экран, прокрутки не будет - догружаем сразу
+        QTimer.singleShot(0, self.maybe_load_next_page)
+    
+    def on_page_loaded(self, result):
+        """Получение очередной страницы при прокрутке"""
+        orders, self.next_cursor, _ = result
+        self.order_model.append_orders(orders)
+        print(f"   ✅ Подгружено заказов: {len(orders)}, всего: {len(self.orders)}")
+        QTimer.singleShot(0, self.maybe_load_next_page)
+
+    def on_loading_failed(self, message):
+        """Ошибка фоновой загрузки"""
+        self.loading_label.setText(f"Ошибка загрузки заказов: {message}")
+        self.loading_label.show()
     
     def display_orders(self):
-        """Отображение заказов в виде карточек"""
-        # Очищаем контейнер
-        for i in reversed(range(self.orders_layout.count())): 
-            widget = self.orders_layout.itemAt(i).widget()
-            if widget is not None:
-                widget.setParent(None)
-        
-        # Добавляем заказы
+        """Отображение заказов в таблице (или надписи, если ничего не найдено)"""
         if not self.orders:
-            no_orders_label = QLabel("ЗАКАЗЫ НЕ НАЙДЕНЫ")
-            no_orders_label.setAlignment(Qt.AlignCenter)
-            no_orders_label.setStyleSheet("""
-                QLabel {
-                    font-size: 18px; 
-                    color: #000000;
-                    padding: 40px;
-                    font-family: "Times New Roman";
-                    font-weight: bold;
-                }
-            """)
-            self.orders_layout.addWidget(no_orders_label)
+            self.order_view.hide()
+            self.empty_label.show()
             print("   ⚠️ Заказы не найдены")
         else:
-            for order in self.orders:
-                card = OrderCardWidget(order, self.user)
-                
-                # Подключаем сигналы (для администратора)
-                if self.user and self.user.role.lower() == 'администратор':
-                    card.edit_requested.connect(self.edit_order)
-                    card.delete_requested.connect(self.delete_order)
-                
-                self.orders_layout.addWidget(card)
-            
+            self.empty_label.hide()
+            self.order_view.show()
             print(f"   ✅ Отображено заказов: {len(self.orders)}")
         
-        self.orders_layout.addStretch()
+        if self.user and self.user.role.lower() == 'администратор':
+            self.update_action_buttons()
+    
+    def selected_order(self):
+        """Заказ в выбранной строке таблицы"""
+        rows = self.order_view.selectionModel().selectedRows()
+        if not rows:
+            return None
+        return self.order_model.order_at(rows[0].row())
+    
+    def update_action_buttons(self, *args):
+        has_selection = self.selected_order() is not None
+        self.edit_btn.setEnabled(has_selection)
+        self.delete_btn.setEnabled(has_selection)
+    
+    def on_order_double_clicked(self, index):
+        """Двойной клик по строке - редактирование"""
+        self.edit_order(self.order_model.order_at(index.row()))
     
     def add_order(self):
         """Добавление нового заказа (только администратор)"""
@@ -170,6 +594,8 @@ class OrderListWindow(QWidget):
     
     def edit_order(self, order):
         """Редактирование заказа (только администратор)"""
+        if order is None:
+            return
         if self.user and self.user.role.lower() == 'администратор':
             print(f"   ✏️ Редактирование заказа: {order.id}")
             
@@ -179,13 +605,22 @@ class OrderListWindow(QWidget):
                                   "Закройте окно редактирования перед открытием нового.")
                 return
             
-            self.current_edit_window = OrderEditWindow(order, parent=self)
+            # Для редактора загружаем заказ полностью (товары, пункт выдачи)
+            full_order = OrderService.get_order_by_id(order.id)
+            if not full_order:
+                QMessageBox.warning(self, "Ошибка", "Заказ не найден")
+                self.load_orders()
+                return
+            
+            self.current_edit_window = OrderEditWindow(full_order, parent=self)
             self.current_edit_window.order_saved.connect(self.on_order_saved)
             self.current_edit_window.destroyed.connect(lambda: setattr(self, 'current_edit_window', None))
             self.current_edit_window.show()
     
     def delete_order(self, order):
         """Удаление заказа (только администратор)"""
+        if order is None:
+            return
         if self.user and self.user.role.lower() == 'администратор':
             print(f"   🗑️ Удаление заказа: {order.id}")
             
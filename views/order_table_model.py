@@ -0,0 +1,137 @@
+# views/order_table_model.py
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QColor, QFont
+
+# Подсветка статуса (как в карточке заказа)
+STATUS_COLORS = {
+    'выполнен': "#d4edda",
+    'доставлен': "#d4edda",
+    'отменен': "#f8d7da",
+    'отменён': "#f8d7da",
+    'в обработке': "#fff3cd",
+    'обработка': "#fff3cd",
+}
+
+
+def _format_date(value):
+    if not value:
+        return "Не указана"
+    try:
+        return value.strftime("%d.%m.%Y %H:%M")
+    except Exception:
+        return "Ошибка формата"
+
+
+class OrderTableModel(QAbstractTableModel):
+    """Табличная модель списка заказов: QTableView рисует только видимые строки.
+    Строки - плоские записи OrderService.get_orders_page (артикул и суммы посчитаны в БД)"""
+    OrderRole = Qt.UserRole + 1
+
+    COLUMN_ARTICLE = 0
+    COLUMN_STATUS = 1
+    COLUMN_ADDRESS = 2
+    COLUMN_ORDER_DATE = 3
+    COLUMN_DELIVERY_DATE = 4
+    COLUMN_USER = 5
+    COLUMN_ITEMS = 6
+    COLUMN_TOTAL = 7
+
+    HEADERS = ["Артикул заказа", "Статус", "Адрес пункта выдачи",
+               "Дата заказа", "Дата доставки", "Пользователь", "Позиций", "Сумма"]
+
+    # Столбцы, по которым список сортируется в БД (ключи ORDER_SORT_KEYS без направления)
+    SORT_KEYS = {
+        COLUMN_STATUS: "status",
+        COLUMN_ORDER_DATE: "order_date",
+        COLUMN_DELIVERY_DATE: "delivery_date",
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._orders = []
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._orders)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        if orientation == Qt.Vertical and role == Qt.DisplayRole:
+            return section + 1
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._orders):
+            return None
+
+        order = self._orders[index.row()]
+        column = index.column()
+
+        if role == self.OrderRole:
+            return order
+        if role == Qt.ToolTipRole and column == self.COLUMN_TOTAL:
+            return (f"Без скидки: {order.gross_total:.2f} ₽\n"
+                    f"Скидка: {order.gross_total - order.net_total:.2f} ₽")
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return self._display_value(order, column)
+        if role == Qt.TextAlignmentRole and column in (self.COLUMN_ITEMS, self.COLUMN_TOTAL):
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        if role == Qt.BackgroundRole and column == self.COLUMN_STATUS:
+            color = STATUS_COLORS.get(str(order.status or "").lower())
+            return QColor(color) if color else None
+        if role == Qt.FontRole and column == self.COLUMN_STATUS:
+            font = QFont("Times New Roman", 11)
+            font.setBold(True)
+            return font
+        if role == Qt.ForegroundRole:
+            return QColor("#000000")
+        return None
+
+    def _display_value(self, order, column):
+        if column == self.COLUMN_ARTICLE:
+            return order.article or "Без товаров"
+        if column == self.COLUMN_STATUS:
+            return order.status or "не указан"
+        if column == self.COLUMN_ADDRESS:
+            return order.pickup_point_address or "Не указан"
+        if column == self.COLUMN_ORDER_DATE:
+            return _format_date(order.order_date)
+        if column == self.COLUMN_DELIVERY_DATE:
+            return _format_date(order.delivery_date)
+        if column == self.COLUMN_USER:
+            return order.user_full_name or "Неизвестно"
+        if column == self.COLUMN_ITEMS:
+            return order.item_count
+        if column == self.COLUMN_TOTAL:
+            return f"{order.net_total:.2f} ₽"
+        return None
+
+    def set_orders(self, orders):
+        self.beginResetModel()
+        self._orders = list(orders)
+        self.endResetModel()
+
+    def append_orders(self, orders):
+        """Добавление следующей страницы в конец списка"""
+        orders = list(orders)
+        if not orders:
+            return
+        first = len(self._orders)
+        self.beginInsertRows(QModelIndex(), first, first + len(orders) - 1)
+        self._orders.extend(orders)
+        self.endInsertRows()
+
+    def orders(self):
+        return self._orders
+
+    def order_at(self, row):
+        if 0 <= row < len(self._orders):
+            return self._orders[row]
+        return None
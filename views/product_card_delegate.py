@@ -0,0 +1,212 @@
+# views/product_card_delegate.py
+from PySide6.QtWidgets import QStyledItemDelegate, QToolTip
+from PySide6.QtCore import Qt, Signal, QSize, QRect, QRectF, QEvent
+from PySide6.QtGui import QFont, QColor, QPen, QPainter, QTextDocument
+import os
+
+from thumbnail_cache import CARD_THUMBNAIL_SIZE, get_thumbnail
+from views.product_list_model import ProductListModel
+
+CARD_HEIGHT = 230
+IMAGE_SIZE = CARD_THUMBNAIL_SIZE
+DEFAULT_IMAGE_PATHS = [
+    "resources/images/picture.png",
+    "picture.png",
+    "resources/picture.png"
+]
+
+
+class ProductCardDelegate(QStyledItemDelegate):
+    """Рисует карточку товара (как ProductCardWidget) только для видимых строк списка"""
+    delete_requested = Signal(object)
+
+    def __init__(self, is_admin=False, parent=None, image_loader=None):
+        super().__init__(parent)
+        self.is_admin = is_admin
+        self.image_loader = image_loader  # ImageLoader: фоновое декодирование изображений
+        self.info_font = QFont("Times New Roman", 11)
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), CARD_HEIGHT)
+
+    # === Геометрия карточки ===
+    def _card_rect(self, option):
+        return option.rect.adjusted(10, 5, -10, -5)
+
+    def _image_rect(self, card):
+        return QRect(card.left() + 10, card.center().y() - 95, 190, 190)
+
+    def _right_rect(self, card):
+        return QRect(card.right() - 120, card.center().y() - 95, 110, 190)
+
+    def _delete_button_rect(self, card):
+        right = self._right_rect(card)
+        return QRect(right.left(), right.top(), right.width(), 30)
+
+    def _info_rect(self, card):
+        image = self._image_rect(card)
+        right = self._right_rect(card)
+        return QRect(image.right() + 15, card.top() + 8,
+                     right.left() - image.right() - 30, card.height() - 16)
+
+    # === Отрисовка ===
+    def paint(self, painter, option, index):
+        product = index.data(ProductListModel.ProductRole)
+        if product is None:
+            return
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        discount = product.discount or 0
+        highlighted = discount > 15  # Подсветка согласно ТЗ
+        text_color = QColor("white") if highlighted else QColor("#000000")
+
+        card = self._card_rect(option)
+        painter.setPen(QPen(QColor("white") if highlighted else QColor("#cccccc"), 1))
+        painter.setBrush(QColor("#229c6d") if highlighted else QColor("#FFFFFF"))
+        painter.drawRoundedRect(QRectF(card), 5, 5)
+
+        self._paint_image(painter, product, self._image_rect(card), self._device_pixel_ratio(option, painter))
+        self._paint_info(painter, product, self._info_rect(card), highlighted)
+        self._paint_discount(painter, index, discount, card, text_color)
+
+        painter.restore()
+
+    def _device_pixel_ratio(self, option, painter):
+        if option.widget is not None:
+            return option.widget.devicePixelRatioF()
+        return painter.device().devicePixelRatioF()
+
+    def _paint_image(self, painter, product, rect, device_pixel_ratio=1.0):
+        pixmap = self._product_pixmap(product, device_pixel_ratio)
+        if pixmap is None:
+            painter.setPen(QPen(QColor("#cccccc"), 1, Qt.DashLine))
+            painter.setBrush(Qt.NoBrush)
+            painter.drawRect(rect.adjusted(5, 5, -5, -5))
+            painter.setPen(QColor("#666666"))
+            painter.setFont(QFont("Times New Roman", 11))
+            painter.drawText(rect, Qt.AlignCenter, "Нет\nизображения")
+            return
+
+        # Размер миниатюры в логических пикселях (на HiDPI пиксельный размер больше)
+        size = pixmap.deviceIndependentSize()
+        x = rect.left() + (rect.width() - round(size.width())) // 2
+        y = rect.top() + (rect.height() - round(size.height())) // 2
+        painter.drawPixmap(x, y, pixmap)
+
+    def image_path(self, product):
+        """Путь к изображению товара (None, если у товара нет своего файла)"""
+        if product.image_path:
+            path = os.path.join("resources/images", product.image_path)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _product_pixmap(self, product, device_pixel_ratio=1.0):
+        """Миниатюра товара 180x180; пока она декодируется в фоне, рисуется заглушка"""
+        path = self.image_path(product)
+        if path is not None:
+            if self.image_loader is None:
+                pixmap = get_thumbnail(path, IMAGE_SIZE, IMAGE_SIZE, device_pixel_ratio)
+                if not pixmap.isNull():
+                    return pixmap
+            else:
+                pixmap = self.image_loader.pixmap(path, IMAGE_SIZE, IMAGE_SIZE, device_pixel_ratio)
+                if pixmap is not None:
+                    return pixmap
+        return self._placeholder_pixmap(device_pixel_ratio)
+
+    def _placeholder_pixmap(self, device_pixel_ratio=1.0):
+        # Заглушка одна на все карточки: декодируется один раз и живет в кэше памяти
+        for path in DEFAULT_IMAGE_PATHS:
+            pixmap = get_thumbnail(path, IMAGE_SIZE, IMAGE_SIZE, device_pixel_ratio)
+            if not pixmap.isNull():
+                return pixmap
+        return None
+
+    def _paint_info(self, painter, product, rect, highlighted):
+        original_price = float(product.price) if product.price else 0
+        discount = product.discount or 0
+        # Цена со скидкой считается в БД (Product.final_price)
+        final_price = float(product.final_price) if product.final_price is not None else original_price
+
+        if discount > 0:
+            price_html = (f"<b>Цена:</b> <span style='color: red; text-decoration: line-through;'>"
+                          f"{original_price:.2f} ₽</span> → <b>Итоговая цена:</b> {final_price:.2f} ₽")
+        else:
+            price_html = f"<b>Цена:</b> {original_price:.2f} ₽"
+
+        description = product.description or 'Нет описания'
+        if len(description) > 160:
+            description = description[:160].rstrip() + "…"
+
+        stock_quantity = product.stock_quantity or 0
+        text_color = "white" if highlighted else "#000000"
+        stock_color = "#1E90FF" if stock_quantity == 0 and not highlighted else text_color
+
+        html = f"""
+            <div style='color: {text_color};'>
+            <p><b>Категория товара:</b> {product.category or 'Не указана'} | <b>Название товара:</b> {product.name}</p>
+            <p><b>Описание товара:</b> {description}</p>
+            <p><b>Производитель:</b> {product.manufacturer or 'Не указан'}</p>
+            <p><b>Поставщик:</b> {product.supplier or 'Не указан'}</p>
+            <p>{price_html}</p>
+            <p><b>Единица измерения:</b> {product.unit or 'шт.'}</p>
+            <p style='color: {stock_color};'><b>Количество на складе:</b> {stock_quantity}</p>
+            </div>
+        """
+
+        document = QTextDocument()
+        document.setDefaultFont(self.info_font)
+        document.setDefaultStyleSheet("p { margin: 0px 0px 3px 0px; }")
+        document.setTextWidth(rect.width())
+        document.setHtml(html)
+
+        painter.save()
+        painter.translate(rect.topLeft())
+        painter.setClipRect(QRect(0, 0, rect.width(), rect.height()))
+        document.drawContents(painter)
+        painter.restore()
+
+    def _paint_discount(self, painter, index, discount, card, text_color):
+        right = self._right_rect(card)
+
+        if self.is_admin:
+            button = self._delete_button_rect(card)
+            can_delete = index.data(ProductListModel.CanDeleteRole)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor("#7FFF00") if can_delete else QColor("#6c757d"))
+            painter.drawRoundedRect(QRectF(button), 4, 4)
+            painter.setPen(QColor("black"))
+            painter.setFont(QFont("Times New Roman", 9, QFont.Bold))
+            painter.drawText(button, Qt.AlignCenter, "Удалить")
+
+        painter.setPen(text_color)
+        painter.setFont(QFont("Times New Roman", 24, QFont.Bold))
+        discount_rect = QRect(right.left(), right.top() + 50, right.width(), 70)
+        painter.drawText(discount_rect, Qt.AlignCenter, f"{discount}%")
+
+        painter.setFont(QFont("Times New Roman", 11, QFont.Bold))
+        caption_rect = QRect(right.left(), discount_rect.bottom(), right.width(), 50)
+        painter.drawText(caption_rect, Qt.AlignCenter, "Действующая\nскидка")
+
+    # === Кнопка удаления ===
+    def editorEvent(self, event, model, option, index):
+        if (self.is_admin and event.type() == QEvent.MouseButtonRelease
+                and event.button() == Qt.LeftButton):
+            button = self._delete_button_rect(self._card_rect(option))
+            if button.contains(event.position().toPoint()):
+                if index.data(ProductListModel.CanDeleteRole):
+                    self.delete_requested.emit(index.data(ProductListModel.ProductRole))
+                return True
+        return super().editorEvent(event, model, option, index)
+
+    def helpEvent(self, event, view, option, index):
+        # Подсказка для недоступной кнопки удаления, как у карточки
+        if self.is_admin and not index.data(ProductListModel.CanDeleteRole):
+            button = self._delete_button_rect(self._card_rect(option))
+            if button.contains(event.pos()):
+                QToolTip.showText(event.globalPos(), "Товар присутствует в заказе, удаление невозможно", view)
+                return True
+        return super().helpEvent(event, view, option, index)
@@ -1,9 +1,11 @@
 # views/product_card_widget.py
 from PySide6.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QLabel, QFrame, QSizePolicy, QMessageBox, QPushButton
 from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QPixmap, QFont, QIcon
+from PySide6.QtGui import QFont, QIcon
 import os
 
+from thumbnail_cache import CARD_THUMBNAIL_SIZE, get_thumbnail
+
 class ProductCardWidget(QWidget):
     delete_requested = Signal(object)
     edit_requested = Signal(object)  # Добавлен сигнал для редактирования
@@ -94,9 +96,10 @@ class ProductCardWidget(QWidget):
         if image_filename and os.path.exists(os.path.join(images_dir, image_filename)):
             try:
                 image_path = os.path.join(images_dir, image_filename)
-                pixmap = QPixmap(image_path)
+                pixmap = get_thumbnail(image_path, CARD_THUMBNAIL_SIZE, CARD_THUMBNAIL_SIZE,
+                                       photo_label.devicePixelRatioF())
                 if not pixmap.isNull():
-                    photo_label.setPixmap(pixmap.scaled(180, 180, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+                    photo_label.setPixmap(pixmap)
                     return
             except Exception as e:
                 print(f"Ошибка загрузки изображения {image_filename}: {e}")
@@ -114,9 +117,10 @@ class ProductCardWidget(QWidget):
         for default_path in default_paths:
             if os.path.exists(default_path):
                 try:
-                    pixmap = QPixmap(default_path)
+                    pixmap = get_thumbnail(default_path, CARD_THUMBNAIL_SIZE, CARD_THUMBNAIL_SIZE,
+                                           photo_label.devicePixelRatioF())
                     if not pixmap.isNull():
-                        photo_label.setPixmap(pixmap.scaled(180, 180, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+                        photo_label.setPixmap(pixmap)
                         return
                 except Exception:
                     continue
@@ -140,7 +144,7 @@ class ProductCardWidget(QWidget):
         
         original_price = float(self.product.price) if self.product.price else 0
         discount = self.product.discount or 0
-        final_price = original_price * (1 - discount / 100)
+        final_price = float(self.product.final_price) if self.product.final_price is not None else original_price
         
         # Категория и название
         category_name_label = QLabel(f"<b>Категория товара:</b> {self.product.category or 'Не указана'} | <b>Название товара:</b> {self.product.name}")
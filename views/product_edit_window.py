@@ -2,12 +2,15 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QLineEdit, QComboBox, QDoubleSpinBox, QSpinBox,
                              QTextEdit, QPushButton, QFileDialog, QMessageBox,
-                             QFrame, QGridLayout, QGroupBox)
+                             QFrame, QGridLayout, QGroupBox, QCompleter)
 from PySide6.QtCore import Signal, Qt
-from PySide6.QtGui import QPixmap, QIcon
+from PySide6.QtGui import QIcon
 import os
 
 from product_service import ProductService
+from image_service import ImageService, ImageIngestError
+from views.reference_data import reference_data
+from thumbnail_cache import EDIT_THUMBNAIL_SIZE, get_thumbnail
 
 class ProductEditWindow(QWidget):
     product_saved = Signal()
@@ -78,10 +81,8 @@ class ProductEditWindow(QWidget):
         form_layout.addWidget(QLabel("Категория*:"), 2, 0)
         self.category_input = QComboBox()
         self.category_input.setEditable(True)
-        self.category_input.addItems([
-            "Кроссовки", "Туфли", "Ботинки", "Сапоги", "Тапочки", 
-            "Сандалии", "Мокасины", "Босоножки", "Слипоны"
-        ])
+        reference_data().bind_combo(self.category_input, "categories")
+        self.category_input.setCurrentIndex(0)
         self.category_input.setStyleSheet("""
             QComboBox {
                 color: #000000;
@@ -100,10 +101,8 @@ class ProductEditWindow(QWidget):
         form_layout.addWidget(QLabel("Производитель*:"), 3, 0)
         self.manufacturer_input = QComboBox()
         self.manufacturer_input.setEditable(True)
-        self.manufacturer_input.addItems([
-            "Nike", "Adidas", "Reebok", "Puma", "New Balance",
-            "Geox", "Ecco", "Clarks", "Salomon", "Timberland"
-        ])
+        reference_data().bind_combo(self.manufacturer_input, "manufacturers")
+        self.manufacturer_input.setCurrentIndex(0)
         self.manufacturer_input.setStyleSheet("""
             QComboBox {
                 color: #000000;
@@ -122,6 +121,10 @@ class ProductEditWindow(QWidget):
         form_layout.addWidget(QLabel("Поставщик:"), 4, 0)
         self.supplier_input = QLineEdit()
         self.supplier_input.setStyleSheet("color: #000000;")
+        # Подсказки - поставщики из общего справочника
+        supplier_completer = QCompleter(reference_data().model("suppliers"), self.supplier_input)
+        supplier_completer.setCaseSensitivity(Qt.CaseInsensitive)
+        self.supplier_input.setCompleter(supplier_completer)
         form_layout.addWidget(self.supplier_input, 4, 1)
         
         # Цена
@@ -279,10 +282,10 @@ class ProductEditWindow(QWidget):
             self.load_image_to_label(file_path)
     
     def load_image_to_label(self, path):
-        pixmap = QPixmap(path)
+        pixmap = get_thumbnail(path, EDIT_THUMBNAIL_SIZE, EDIT_THUMBNAIL_SIZE,
+                               self.image_label.devicePixelRatioF())
         if not pixmap.isNull():
-            scaled_pixmap = pixmap.scaled(150, 150, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            self.image_label.setPixmap(scaled_pixmap)
+            self.image_label.setPixmap(pixmap)
             self.image_label.setText("")
     
     def save_product(self):
@@ -311,18 +314,13 @@ class ProductEditWindow(QWidget):
         
         # Обработка изображения
         if self.image_path:
-            import shutil
             try:
-                if self.is_editing:
-                    image_name = f"{self.product.article}.png"
-                else:
-                    image_name = f"{product_data['article']}.png"
-                
-                dest_path = f"resources/images/{image_name}"
-                shutil.copy2(self.image_path, dest_path)
-                product_data['image_path'] = image_name
+                product_data['image_path'] = ImageService.ingest(self.image_path)
+            except ImageIngestError as e:
+                QMessageBox.warning(self, "Ошибка", str(e))
+                return
             except Exception as e:
-                print(f"Ошибка копирования изображения: {e}")
+                print(f"Ошибка сохранения изображения: {e}")
                 QMessageBox.warning(self, "Ошибка", "Не удалось сохранить изображение")
         
         try:
@@ -0,0 +1,58 @@
+# views/product_list_model.py
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex
+
+
+class ProductListModel(QAbstractListModel):
+    """Модель списка товаров для QListView (карточки рисует ProductCardDelegate)"""
+    ProductRole = Qt.UserRole + 1
+    CanDeleteRole = Qt.UserRole + 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._products = []
+        self._blocked_articles = set()  # Товары, присутствующие в заказах
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._products)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._products):
+            return None
+
+        product = self._products[index.row()]
+        if role == self.ProductRole:
+            return product
+        if role == self.CanDeleteRole:
+            return product.article not in self._blocked_articles
+        if role == Qt.DisplayRole:
+            return product.name
+        if role == Qt.ToolTipRole:
+            return f"{product.name} (арт. {product.article})"
+        return None
+
+    def products(self):
+        return self._products
+
+    def product_at(self, row):
+        if 0 <= row < len(self._products):
+            return self._products[row]
+        return None
+
+    def set_products(self, products, blocked_articles=()):
+        """Полная замена списка (новый поиск/фильтр)"""
+        self.beginResetModel()
+        self._products = list(products)
+        self._blocked_articles = set(blocked_articles)
+        self.endResetModel()
+
+    def append_products(self, products, blocked_articles=()):
+        """Добавление очередной страницы в конец списка"""
+        if not products:
+            return
+        first = len(self._products)
+        self.beginInsertRows(QModelIndex(), first, first + len(products) - 1)
+        self._products.extend(products)
+        self._blocked_articles.update(blocked_articles)
+        self.endInsertRows()
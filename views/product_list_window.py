@@ -1,23 +1,114 @@
 # views/product_list_window.py - ИСПРАВЛЯЕМ РЕГИСТР РОЛЕЙ
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                             QLineEdit, QComboBox, QPushButton, QScrollArea,
-                             QFrame, QGridLayout, QMessageBox, QSizePolicy)
+                             QLineEdit, QComboBox, QPushButton, QListView,
+                             QFrame, QGridLayout, QMessageBox, QSizePolicy,
+                             QAbstractItemView, QDoubleSpinBox, QSpinBox, QCheckBox,
+                             QFileDialog)
 from PySide6.QtCore import Qt, Signal, QTimer
 from PySide6.QtGui import QFont, QPalette, QColor
+import os
 
 from product_service import ProductService
+from price_list_service import PriceListService
+from catalog_index import CatalogIndex, CATALOG_INDEX_MAX_PRODUCTS
 from views.product_edit_window import ProductEditWindow
-from views.product_card_widget import ProductCardWidget
+from views.product_list_model import ProductListModel
+from views.product_card_delegate import ProductCardDelegate
+from views.data_loader import DataLoader
+from views.image_loader import ImageLoader
+
+
+# Отладочный режим: счетчик отрисовок каталога в консоли (APP_DEBUG=1)
+APP_DEBUG = os.getenv("APP_DEBUG", "0") == "1"
+
+
+def fetch_catalog_page(check_orders=False, with_facets=False, **page_query):
+    """Страница каталога для фоновой загрузки:
+    (товары, курсор, артикулы в заказах, фасеты или None)"""
+    if with_facets:
+        # Первая страница выборки: товары, артикулы в заказах и фасеты через одно соединение
+        return ProductService.get_catalog_first_page(check_orders=check_orders, **page_query)
+    products, next_cursor = ProductService.get_products_page(**page_query)
+    blocked = set()
+    if check_orders:
+        blocked = ProductService.get_articles_in_orders([product.article for product in products])
+    return products, next_cursor, blocked, None
+
+
+def build_catalog_index(check_orders=False):
+    """Индекс каталога для поиска в памяти: (индекс или None, артикулы в заказах)"""
+    index = CatalogIndex.shared()
+    if index is None:
+        return None, set()
+    blocked = ProductService.get_all_articles_in_orders() if check_orders else set()
+    return index, blocked
+
+
+def search_catalog_index(index, blocked, search_text, supplier, sort_by, **filters):
+    """Поиск по индексу каталога: (товары, None, артикулы в заказах, фасеты).
+    None - индекс устарел (каталог менялся), искать нужно в БД."""
+    if not index.is_current():
+        return None
+    products = index.search(search_text, supplier, sort_by, **filters)
+    facets = index.facets(search_text, **filters)
+    return products, None, blocked, facets
+
 
 class ProductListWindow(QWidget):
     data_updated = Signal()
     
+    # Задержка (мс) между последним нажатием клавиши и запросом поиска
+    SEARCH_DEBOUNCE_MS = int(os.getenv("SEARCH_DEBOUNCE_MS", "300"))
+    
     def __init__(self, user):
         super().__init__()
         self.user = user
         self.products = []
         self.current_edit_window = None
-        
+        self.page_query = {}  # Параметры текущей выборки для подгрузки следующих страниц
+        self.next_cursor = None
+
+        # Загрузка товаров выполняется в фоновом потоке
+        self.loader = DataLoader(self)
+        self.loader.loading_started.connect(self.on_loading_started)
+        self.loader.loaded.connect(self.on_products_loaded)
+        self.loader.failed.connect(self.on_loading_failed)
+
+        # Следующие страницы каталога подгружаются отдельно при прокрутке
+        self.page_loader = DataLoader(self)
+        self.page_loader.loaded.connect(self.on_page_loaded)
+        self.page_loader.failed.connect(self.on_loading_failed)
+
+        # Поиск: нажатия клавиш объединяются, запрос уходит после паузы в наборе
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.apply_filters)
+
+        # Небольшой каталог целиком индексируется в памяти: поиск без запросов к БД
+        self.catalog_index = None
+        self.catalog_blocked = set()
+        self.index_loader = DataLoader(self)
+        self.index_loader.loaded.connect(self.on_catalog_index_ready)
+        # Поиск по индексу - тоже в фоне: перед ним проверяется версия каталога в БД
+        self.index_search_loader = DataLoader(self)
+        self.index_search_loader.loaded.connect(self.on_index_search_loaded)
+        self.index_search_loader.failed.connect(self.on_loading_failed)
+
+        # Загрузка прайс-листа - в фоне и в этом же процессе: слушатели ProductService
+        # (индекс каталога, справочники) получают событие "imported"
+        self.import_loader = DataLoader(self, cancel_superseded=False)
+        self.import_loader.loaded.connect(self.on_price_list_imported)
+        self.import_loader.failed.connect(self.on_price_list_failed)
+
+        # Изображения карточек декодируются в отдельном пуле потоков;
+        # после прокрутки из очереди убираются ушедшие с экрана карточки
+        self.image_loader = ImageLoader(self)
+        self.image_prune_timer = QTimer(self)
+        self.image_prune_timer.setSingleShot(True)
+        self.image_prune_timer.setInterval(100)
+        self.image_prune_timer.timeout.connect(self.prune_offscreen_images)
+
         # Для отладки
         user_role = user.role if user else None
         user_role_lower = user_role.lower() if user_role else None
@@ -34,8 +125,11 @@ class ProductListWindow(QWidget):
             print("   👀 Пользователь не имеет прав управления")
             self.has_management_rights = False
         
+        self.is_admin = user_role_lower == 'администратор'
+        self.render_count = 0  # Сколько раз список товаров перестраивался (см. APP_DEBUG)
+        
         self.setup_ui()
-        self.load_products()
+        self.initial_load()
     
     def setup_ui(self):
         layout = QVBoxLayout()
@@ -65,26 +159,66 @@ class ProductListWindow(QWidget):
             self.check_signals()
         else:
             print("   👀 Панель управления не создается")
-        
-        # Контейнер для товаров
-        self.products_container = QWidget()
-        self.products_layout = QVBoxLayout(self.products_container)
-        self.products_layout.setSpacing(15)
-        self.products_layout.setContentsMargins(5, 5, 5, 5)
-        
-        # Скроллируемая область
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setWidget(self.products_container)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        scroll_area.setStyleSheet("""
-            QScrollArea {
+
+        # Индикатор загрузки
+        self.loading_label = QLabel("Загрузка товаров...")
+        self.loading_label.setAlignment(Qt.AlignCenter)
+        self.loading_label.setStyleSheet("""
+            QLabel {
+                font-size: 14px;
+                color: #666666;
+                font-family: "Times New Roman";
+                font-weight: bold;
+            }
+        """)
+        self.loading_label.hide()
+        layout.addWidget(self.loading_label)
+
+        # Список товаров: модель + делегат рисуют карточки только для видимых строк
+        self.product_model = ProductListModel(self)
+        self.product_delegate = ProductCardDelegate(is_admin=self.is_admin, parent=self,
+                                                    image_loader=self.image_loader)
+        
+        self.product_view = QListView()
+        self.product_view.setModel(self.product_model)
+        self.product_view.setItemDelegate(self.product_delegate)
+        self.product_view.setUniformItemSizes(True)
+        self.product_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.product_view.verticalScrollBar().setSingleStep(20)
+        self.product_view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.product_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.product_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.product_view.setMouseTracking(True)
+        self.product_view.verticalScrollBar().valueChanged.connect(self.maybe_load_next_page)
+        self.product_view.verticalScrollBar().valueChanged.connect(lambda *_: self.image_prune_timer.start())
+        self.image_loader.image_ready.connect(self.on_image_ready)
+        self.product_view.setStyleSheet("""
+            QListView {
                 border: none;
                 background-color: transparent;
             }
         """)
         
-        layout.addWidget(scroll_area, 1)
+        # Редактирование по двойному клику и удаление - только для администратора
+        if self.is_admin:
+            self.product_view.doubleClicked.connect(self.on_product_double_clicked)
+            self.product_delegate.delete_requested.connect(self.delete_product)
+        
+        self.empty_label = QLabel("ТОВАРЫ НЕ НАЙДЕНЫ")
+        self.empty_label.setAlignment(Qt.AlignCenter)
+        self.empty_label.setStyleSheet("""
+            QLabel {
+                font-size: 18px; 
+                color: #666666;
+                padding: 40px;
+                font-family: "Times New Roman";
+                font-weight: bold;
+            }
+        """)
+        self.empty_label.hide()
+        
+        layout.addWidget(self.empty_label)
+        layout.addWidget(self.product_view, 1)
         self.setLayout(layout)
     
     def create_control_panel(self):
@@ -116,6 +250,13 @@ class ProductListWindow(QWidget):
         self.search_input.setMinimumHeight(40)
         self.search_input.setClearButtonEnabled(True)
         
+        # Режим поиска: по подстроке (как раньше) или полнотекстовый с ранжированием
+        self.search_mode_combo = QComboBox()
+        self.search_mode_combo.setObjectName("searchModeCombo")
+        self.search_mode_combo.setMinimumHeight(40)
+        self.search_mode_combo.addItem("По подстроке", "substring")
+        self.search_mode_combo.addItem("По словам (релевантность)", "fulltext")
+        
         # === ФИЛЬТР ПО ПОСТАВЩИКУ ===
         filter_label = QLabel("ФИЛЬТР:")
         filter_label.setFont(QFont("Times New Roman", 10, QFont.Bold))
@@ -124,6 +265,8 @@ class ProductListWindow(QWidget):
         self.supplier_filter = QComboBox()
         self.supplier_filter.setObjectName("supplierFilter")
         self.supplier_filter.setMinimumHeight(40)
+        # Данные элемента - поставщик как в БД; список и количества приходят с фасетами выборки
+        self.supplier_filter.addItem("Все поставщики", "")
         
         # === СОРТИРОВКА ===
         sort_label = QLabel("СОРТИРОВКА:")
@@ -133,14 +276,44 @@ class ProductListWindow(QWidget):
         self.sort_combo = QComboBox()
         self.sort_combo.setObjectName("sortCombo")
         self.sort_combo.setMinimumHeight(40)
-        self.sort_combo.addItems([
-            "По названию (А-Я)",
-            "По названию (Я-А)",
-            "По цена (возрастание)",
-            "По цена (убывание)",
-            "По количеству (возрастание)",
-            "По количеству (убывание)"
-        ])
+        # Данные элемента - ключ сортировки ProductService (PRODUCT_SORT_KEYS)
+        self.sort_combo.addItem("По названию (А-Я)", "name_asc")
+        self.sort_combo.addItem("По названию (Я-А)", "name_desc")
+        self.sort_combo.addItem("По цене (возрастание)", "price_asc")
+        self.sort_combo.addItem("По цене (убывание)", "price_desc")
+        self.sort_combo.addItem("По количеству (возрастание)", "stock_quantity_asc")
+        self.sort_combo.addItem("По количеству (убывание)", "stock_quantity_desc")
+        self.sort_combo.addItem("По цене со скидкой (возрастание)", "final_price_asc")
+        self.sort_combo.addItem("По цене со скидкой (убывание)", "final_price_desc")
+        
+        # === ЦЕНА СО СКИДКОЙ, СКИДКА, НАЛИЧИЕ ===
+        price_label = QLabel("ЦЕНА:")
+        price_label.setFont(QFont("Times New Roman", 10, QFont.Bold))
+        price_label.setStyleSheet("color: #000000;")
+        
+        # 0 - без ограничения (показывается текст вместо числа)
+        self.min_price_input = QDoubleSpinBox()
+        self.min_price_input.setRange(0, 1000000)
+        self.min_price_input.setDecimals(2)
+        self.min_price_input.setSuffix(" ₽")
+        self.min_price_input.setSpecialValueText("от: любая")
+        self.min_price_input.setMinimumHeight(40)
+        
+        self.max_price_input = QDoubleSpinBox()
+        self.max_price_input.setRange(0, 1000000)
+        self.max_price_input.setDecimals(2)
+        self.max_price_input.setSuffix(" ₽")
+        self.max_price_input.setSpecialValueText("до: любая")
+        self.max_price_input.setMinimumHeight(40)
+        
+        self.min_discount_input = QSpinBox()
+        self.min_discount_input.setRange(0, 100)
+        self.min_discount_input.setPrefix("скидка от ")
+        self.min_discount_input.setSuffix("%")
+        self.min_discount_input.setMinimumHeight(40)
+        
+        self.in_stock_checkbox = QCheckBox("Только в наличии")
+        self.in_stock_checkbox.setStyleSheet("color: #000000; font-family: \"Times New Roman\"; font-size: 14px;")
         
         # === КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: СТИЛИ ДЛЯ КОМБОБОКСОВ ===
         combo_box_style = """
@@ -231,11 +404,22 @@ class ProductListWindow(QWidget):
         self.search_input.setStyleSheet(line_edit_style)
         self.supplier_filter.setStyleSheet(combo_box_style)
         self.sort_combo.setStyleSheet(combo_box_style)
+        self.search_mode_combo.setStyleSheet(combo_box_style)
+        spin_box_style = line_edit_style.replace("QLineEdit", "QAbstractSpinBox")
+        self.min_price_input.setStyleSheet(spin_box_style)
+        self.max_price_input.setStyleSheet(spin_box_style)
+        self.min_discount_input.setStyleSheet(spin_box_style)
         
         # === ПОДКЛЮЧАЕМ СИГНАЛЫ ===
-        self.search_input.textChanged.connect(self.apply_filters)
-        self.supplier_filter.currentTextChanged.connect(self.apply_filters)
+        self.search_input.textChanged.connect(lambda *_: self.search_timer.start())
+        self.search_input.returnPressed.connect(self.apply_filters)
+        self.search_mode_combo.currentIndexChanged.connect(self.on_search_mode_changed)
+        self.supplier_filter.currentIndexChanged.connect(self.apply_filters)
         self.sort_combo.currentTextChanged.connect(self.apply_filters)
+        self.min_price_input.valueChanged.connect(lambda *_: self.search_timer.start())
+        self.max_price_input.valueChanged.connect(lambda *_: self.search_timer.start())
+        self.min_discount_input.valueChanged.connect(lambda *_: self.search_timer.start())
+        self.in_stock_checkbox.toggled.connect(self.apply_filters)
         
         # === КНОПКИ ДЛЯ АДМИНИСТРАТОРА ===
         user_role = self.user.role.lower() if self.user else None
@@ -267,119 +451,291 @@ class ProductListWindow(QWidget):
             """)
             self.add_btn.clicked.connect(self.add_product)
             
+            self.import_btn = QPushButton("ЗАГРУЗИТЬ ПРАЙС-ЛИСТ")
+            self.import_btn.setMinimumHeight(40)
+            self.import_btn.setStyleSheet(self.add_btn.styleSheet())
+            self.import_btn.clicked.connect(self.import_price_list)
+            
             btn_layout.addWidget(self.add_btn)
+            btn_layout.addWidget(self.import_btn)
             btn_layout.addStretch()
         
         # === РАЗМЕЩЕНИЕ ЭЛЕМЕНТОВ ===
         layout.addWidget(search_label, 0, 0)
-        layout.addWidget(self.search_input, 0, 1, 1, 3)
+        layout.addWidget(self.search_input, 0, 1, 1, 2)
+        layout.addWidget(self.search_mode_combo, 0, 3)
         layout.addWidget(filter_label, 1, 0)
         layout.addWidget(self.supplier_filter, 1, 1)
         layout.addWidget(sort_label, 1, 2)
         layout.addWidget(self.sort_combo, 1, 3)
         
-        if user_role == 'администратор':
-            layout.addLayout(btn_layout, 2, 0, 1, 4)
+        price_layout = QHBoxLayout()
+        price_layout.setSpacing(10)
+        price_layout.addWidget(self.min_price_input)
+        price_layout.addWidget(self.max_price_input)
+        price_layout.addWidget(self.min_discount_input)
+        price_layout.addWidget(self.in_stock_checkbox)
+        price_layout.addStretch()
+        layout.addWidget(price_label, 2, 0)
+        layout.addLayout(price_layout, 2, 1, 1, 3)
         
-        # Загрузка поставщиков
-        self.load_suppliers()
+        if user_role == 'администратор':
+            layout.addLayout(btn_layout, 3, 0, 1, 4)
         
         panel.setLayout(layout)
         return panel
     
-    def load_suppliers(self):
-        """Загрузка списка поставщиков"""
-        if self.has_management_rights:
-            print("   📦 Загружаем список поставщиков...")
-            suppliers = ProductService.get_all_suppliers()
-            self.supplier_filter.addItem("Все поставщики")
-            for supplier in suppliers:
-                if supplier and supplier.strip():
-                    self.supplier_filter.addItem(supplier.strip())
-            print(f"   ✅ Загружено поставщиков: {len(suppliers)}")
+    def update_supplier_facets(self, facets):
+        """Список поставщиков с количеством найденных товаров, например «Kari (42)»"""
+        suppliers = facets.get("supplier", [])
+        selected = self.supplier_filter.currentData() or ""
+        
+        # Перестройка списка не должна запускать новый поиск
+        self.supplier_filter.blockSignals(True)
+        self.supplier_filter.clear()
+        self.supplier_filter.addItem(f"Все поставщики ({sum(count for _, count in suppliers)})", "")
+        for supplier, count in suppliers:
+            self.supplier_filter.addItem(f"{supplier.strip()} ({count})", supplier)
+        if selected and self.supplier_filter.findData(selected) < 0:
+            self.supplier_filter.addItem(f"{selected.strip()} (0)", selected)
+        self.supplier_filter.setCurrentIndex(max(0, self.supplier_filter.findData(selected)))
+        self.supplier_filter.blockSignals(False)
+        print(f"   ✅ Поставщиков в выборке: {len(suppliers)}")
+    
+    def filter_widgets(self):
+        """Элементы панели управления, изменение которых запускает поиск"""
+        if not self.has_management_rights:
+            return []
+        return [self.search_input, self.search_mode_combo, self.supplier_filter, self.sort_combo,
+                self.min_price_input, self.max_price_input, self.min_discount_input,
+                self.in_stock_checkbox]
+    
+    def initial_load(self):
+        """Первичная загрузка экрана: одна фоновая задача (первая страница,
+        фасеты с поставщиками, артикулы в заказах) и одна отрисовка по ее результату.
+        Пока идет настройка, сигналы фильтров заблокированы и не запускают поиск."""
+        widgets = self.filter_widgets()
+        for widget in widgets:
+            widget.blockSignals(True)
+        try:
+            self.load_products()
+            if self.has_management_rights and CATALOG_INDEX_MAX_PRODUCTS > 0:
+                # Индекс для поиска в памяти строится параллельно и список не перерисовывает
+                self.index_loader.load(build_catalog_index, check_orders=self.is_admin)
+        finally:
+            for widget in widgets:
+                widget.blockSignals(False)
     
     def load_products(self):
         """Загрузка всех товаров (для гостя и клиента)"""
         print("   📥 Загружаем товары...")
-        self.products = ProductService.get_all_products()
-        print(f"   ✅ Загружено товаров: {len(self.products)}")
-        self.display_products()
+        self.load_first_page({})
     
     def apply_filters(self):
         """Применение фильтров в реальном времени"""
         print(f"🎯 apply_filters вызван! has_management_rights={self.has_management_rights}")
         if not self.has_management_rights:
             return
+        
+        # Отложенный поиск больше не нужен - применяем фильтры сразу
+        self.search_timer.stop()
     
-    # Получаем значения фильтров
+        # Получаем значения фильтров
         search_text = self.search_input.text().strip()
-        supplier = self.supplier_filter.currentText()
-        sort_option = self.sort_combo.currentText()
-        
-        print(f"   🔍 Применяем фильтры: поиск='{search_text}', поставщик='{supplier}', сортировка='{sort_option}'")
-        
-        # Преобразуем в параметры для сервиса
-        sort_mapping = {
-            "По названию (А-Я)": "name_asc",
-            "По названию (Я-А)": "name_desc",
-            "По цене (возрастание)": "price_asc",
-            "По цене (убывание)": "price_desc",
-            "По количеству (возрастание)": "stock_quantity_asc",
-            "По количеству (убывание)": "stock_quantity_desc"
-        }
+        supplier = self.supplier_filter.currentData() or ""
+        sort_by = self.sort_combo.currentData() or "name_asc"
         
-        sort_by = sort_mapping.get(sort_option, "name_asc")
+        print(f"   🔍 Применяем фильтры: поиск='{search_text}', поставщик='{supplier}', сортировка='{sort_by}'")
         
-        # Применяем фильтры - ОБЯЗАТЕЛЬНО для любых изменений
-        self.products = ProductService.get_products_with_filters(
-            search_text=search_text,
-            supplier_filter=supplier if supplier != "Все поставщики" else "",
-            sort_by=sort_by
-        )
+        filters = self.current_filters()
+        
+        # Поиск по подстроке в индексе каталога: без поискового запроса к БД,
+        # если версия каталога не изменилась (иначе - поиск в БД, см. on_index_search_loaded)
+        if self.catalog_index is not None and self.search_mode_combo.currentData() != "fulltext":
+            self.loader.cancel()
+            self.page_loader.cancel()
+            self.page_query = {}
+            self.index_search_loader.load(search_catalog_index, self.catalog_index, self.catalog_blocked,
+                                          search_text, supplier, sort_by, **filters)
+            return
+        self.index_search_loader.cancel()
+        
+        # Полнотекстовый режим: результаты упорядочены по релевантности (одна страница с LIMIT)
+        if self.search_mode_combo.currentData() == "fulltext" and search_text:
+            self.page_loader.cancel()
+            self.next_cursor = None
+            is_admin = self.is_admin
+            
+            def fetch_ranked():
+                products = ProductService.search_products_fulltext(search_text, supplier, **filters)
+                blocked = ProductService.get_articles_in_orders(
+                    [product.article for product in products]) if is_admin else set()
+                facets = ProductService.get_facets(search_text, fulltext=True, **filters)
+                return products, None, blocked, facets
+            
+            self.loader.load(fetch_ranked)
+            return
         
-        print(f"   ✅ После фильтрации товаров: {len(self.products)}")
+        # Применяем фильтры - ОБЯЗАТЕЛЬНО для любых изменений
+        self.load_first_page({
+            'search_text': search_text,
+            'supplier_filter': supplier,
+            'sort_by': sort_by,
+            **filters
+        })
+    
+    def current_filters(self):
+        """Фильтры по цене со скидкой, скидке и наличию (0 в поле цены - без ограничения)"""
+        min_price = self.min_price_input.value()
+        max_price = self.max_price_input.value()
+        return {
+            'min_price': min_price or None,
+            'max_price': max_price or None,
+            'min_discount': self.min_discount_input.value() or None,
+            'in_stock_only': self.in_stock_checkbox.isChecked(),
+        }
+    
+    def load_first_page(self, page_query):
+        """Загрузка первой страницы выборки (запрос выполняется в фоне,
+        более новый запрос вытесняет предыдущий вместе с подгрузкой страниц)"""
+        self.page_loader.cancel()
+        self.page_query = page_query
+        self.next_cursor = None
+        self.loader.load(fetch_catalog_page, check_orders=self.is_admin,
+                         with_facets=self.has_management_rights, **page_query)
+    
+    def maybe_load_next_page(self, *args):
+        """Подгрузка следующей страницы, когда пользователь докрутил почти до конца"""
+        if self.next_cursor is None or self.loader.is_loading or self.page_loader.is_loading:
+            return
+        scroll_bar = self.product_view.verticalScrollBar()
+        if scroll_bar.value() >= scroll_bar.maximum() - scroll_bar.pageStep():
+            print("   📥 Подгружаем следующую страницу товаров...")
+            self.page_loader.load(fetch_catalog_page, check_orders=self.is_admin,
+                                  cursor=self.next_cursor, **self.page_query)
+
+    def visible_rows(self):
+        """Диапазон строк, которые сейчас видны в списке"""
+        viewport = self.product_view.viewport()
+        first = self.product_view.indexAt(viewport.rect().topLeft())
+        last = self.product_view.indexAt(viewport.rect().bottomLeft())
+        if not first.isValid():
+            return range(0)
+        last_row = last.row() if last.isValid() else self.product_model.rowCount() - 1
+        return range(first.row(), last_row + 1)
+
+    def prune_offscreen_images(self):
+        """Декодируем только изображения видимых карточек, остальные убираем из очереди"""
+        paths = []
+        for row in self.visible_rows():
+            product = self.product_model.product_at(row)
+            if product is not None:
+                paths.append(self.product_delegate.image_path(product))
+        self.image_loader.cancel_except(path for path in paths if path)
+
+    def on_image_ready(self, path):
+        """Изображение декодировано - перерисовываем видимые карточки"""
+        self.product_view.viewport().update()
+
+    def on_catalog_index_ready(self, result):
+        """Индекс каталога построен (или каталог слишком велик для памяти)"""
+        index, blocked = result
+        if index is None:
+            print(f"   🗂️ Каталог больше {CATALOG_INDEX_MAX_PRODUCTS} товаров - поиск выполняется в БД")
+            return
+        self.catalog_index = index
+        self.catalog_blocked = blocked
+        # Поиск в памяти мгновенный, пауза в наборе больше не нужна
+        self.search_timer.setInterval(0)
+
+    def on_index_search_loaded(self, result):
+        """Результат поиска по индексу; None - индекс устарел: ищем в БД и перестраиваем индекс"""
+        if result is None:
+            print("   🗂️ Каталог изменился - поиск в БД, индекс перестраивается")
+            self.catalog_index = None
+            self.search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+            self.index_loader.load(build_catalog_index, check_orders=self.is_admin)
+            self.apply_filters()
+            return
+        self.on_products_loaded(result)
+
+    def on_search_mode_changed(self):
+        """Смена режима поиска (в полнотекстовом режиме сортировка - по релевантности)"""
+        self.sort_combo.setEnabled(self.search_mode_combo.currentData() != "fulltext")
+        self.apply_filters()
+
+    def on_loading_started(self):
+        """Показываем состояние загрузки"""
+        self.loading_label.setText("Загрузка товаров...")
+        self.loading_label.show()
+
+    def on_products_loaded(self, result):
+        """Получение первой страницы: (товары, курсор следующей страницы, артикулы в заказах, фасеты)"""
+        self.loading_label.hide()
+        products, self.next_cursor, blocked, facets = result
+        self.render_count += 1
+        if APP_DEBUG:
+            print(f"   🧪 [debug] Отрисовка каталога #{self.render_count}: {len(products)} товаров")
+        if facets is not None and self.has_management_rights:
+            self.update_supplier_facets(facets)
+        print(f"   ✅ Загружено товаров: {len(products)}")
+        self.image_loader.cancel_all()  # Изображения прежней выборки больше не нужны
+        self.product_model.set_products(products, blocked)
+        self.products = self.product_model.products()
+        self.product_view.scrollToTop()
         self.display_products()
+        # Если страница не заполнила экран, прокрутки не будет - догружаем сразу
+        QTimer.singleShot(0, self.maybe_load_next_page)
+    
+    def on_page_loaded(self, result):
+        """Получение очередной страницы при прокрутке"""
+        products, self.next_cursor, blocked, _ = result
+        self.product_model.append_products(products, blocked)
+        print(f"   ✅ Подгружено товаров: {len(products)}, всего: {len(self.products)}")
+        QTimer.singleShot(0, self.maybe_load_next_page)
+
+    def on_loading_failed(self, message):
+        """Ошибка фоновой загрузки"""
+        self.loading_label.setText(f"Ошибка загрузки товаров: {message}")
+        self.loading_label.show()
     
     def display_products(self):
-        """Отображение товаров в виде карточек"""
-        print("   🖼️ Отображаем товары...")
-        
-        # Очищаем контейнер
-        for i in reversed(range(self.products_layout.count())): 
-            widget = self.products_layout.itemAt(i).widget()
-            if widget is not None:
-                widget.setParent(None)
-        
-        # Добавляем товары
+        """Отображение товаров (карточки рисует делегат списка)"""
         if not self.products:
-            no_products_label = QLabel("ТОВАРЫ НЕ НАЙДЕНЫ")
-            no_products_label.setAlignment(Qt.AlignCenter)
-            no_products_label.setStyleSheet("""
-                QLabel {
-                    font-size: 18px; 
-                    color: #666666;
-                    padding: 40px;
-                    font-family: "Times New Roman";
-                    font-weight: bold;
-                }
-            """)
-            self.products_layout.addWidget(no_products_label)
+            self.product_view.hide()
+            self.empty_label.show()
             print("   ⚠️ Товары не найдены")
         else:
-            for product in self.products:
-                card = ProductCardWidget(product, self.user)
-                
-                # Подключаем сигнал удаления
-                if self.user and self.user.role.lower() == 'администратор':
-                    card.delete_requested.connect(self.on_product_deleted)
-                    # Подключаем сигнал редактирования по двойному клику
-                    card.edit_requested.connect(self.edit_product)
-                
-                self.products_layout.addWidget(card)
-            
+            self.empty_label.hide()
+            self.product_view.show()
             print(f"   ✅ Отображено товаров: {len(self.products)}")
+    
+    def on_product_double_clicked(self, index):
+        """Двойной клик по карточке - редактирование"""
+        product = self.product_model.product_at(index.row())
+        if product is not None:
+            self.edit_product(product)
+    
+    def delete_product(self, product):
+        """Удаление товара по кнопке на карточке (только администратор)"""
+        if not self.is_admin:
+            return
+        
+        reply = QMessageBox.question(
+            self,
+            "Подтверждение удаления",
+            f"Вы уверены, что хотите удалить товар:\n{product.name} (арт. {product.article})?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
         
-        self.products_layout.addStretch()
+        if reply == QMessageBox.Yes:
+            success, message = ProductService.delete_product(product.article)
+            if success:
+                QMessageBox.information(self, "Успех", message)
+                self.on_product_deleted(product)
+            else:
+                QMessageBox.critical(self, "Ошибка", message)
     
     def add_product(self):
         """Добавление нового товара (только администратор)"""
@@ -413,9 +769,48 @@ class ProductListWindow(QWidget):
             self.current_edit_window.destroyed.connect(lambda: setattr(self, 'current_edit_window', None))
             self.current_edit_window.show()
     
+    def import_price_list(self):
+        """Загрузка прайс-листа поставщика (только администратор)"""
+        if not self.is_admin or self.import_loader.is_loading:
+            return
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Загрузка прайс-листа", "", "Прайс-лист (*.csv *.xlsx);;Все файлы (*)")
+        if not path:
+            return
+        print(f"   📥 Загрузка прайс-листа {path}")
+        self.import_btn.setEnabled(False)
+        self.import_btn.setText("ЗАГРУЗКА ПРАЙС-ЛИСТА...")
+        self.import_loader.load(PriceListService.import_price_list, path)
+    
+    def finish_price_list_import(self):
+        self.import_btn.setEnabled(True)
+        self.import_btn.setText("ЗАГРУЗИТЬ ПРАЙС-ЛИСТ")
+    
+    def on_price_list_imported(self, report):
+        self.finish_price_list_import()
+        lines = [f"Добавлено: {report['inserted']}",
+                 f"Обновлено: {report['updated']}",
+                 f"Без изменений: {report['unchanged']}",
+                 f"Отклонено: {report['rejected']}"]
+        errors = report['errors'][:10]
+        if errors:
+            lines.append("")
+            lines += [f"Строка {line_no} ({article or 'без артикула'}): {error}"
+                      for line_no, article, error in errors]
+            if report['rejected'] > len(errors):
+                lines.append(f"... и еще {report['rejected'] - len(errors)} отклоненных строк")
+        QMessageBox.information(self, "Загрузка прайс-листа", "\n".join(lines))
+        if report['inserted'] or report['updated']:
+            self.on_product_saved()
+    
+    def on_price_list_failed(self, message):
+        self.finish_price_list_import()
+        QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить прайс-лист: {message}")
+    
     def on_product_saved(self):
         """Обновление списка после сохранения"""
         print("   🔄 Обновляем список после сохранения")
+        self.image_loader.invalidate()  # Изображение товара могли заменить тем же файлом
         if self.has_management_rights:
             self.apply_filters()
         else:
@@ -460,9 +855,9 @@ class ProductListWindow(QWidget):
             print(f"   Ошибка проверки search_input: {e}")
         
         try:
-            # Для currentTextChanged сигнала QComboBox
-            supplier_receivers = self.supplier_filter.receivers("currentTextChanged")
-            print(f"   supplier_filter.currentTextChanged receivers: {supplier_receivers}")
+            # Для currentIndexChanged сигнала QComboBox
+            supplier_receivers = self.supplier_filter.receivers("currentIndexChanged")
+            print(f"   supplier_filter.currentIndexChanged receivers: {supplier_receivers}")
         except Exception as e:
             print(f"   Ошибка проверки supplier_filter: {e}")
         
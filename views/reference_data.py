@@ -0,0 +1,155 @@
+# views/reference_data.py
+# Справочники приложения (поставщики, категории, производители, пункты выдачи,
+# клиенты, товары для выбора в заказе) загружаются один раз и хранятся в общих Qt-моделях.
+# Модель перечитывается, если истек REFERENCE_DATA_TTL или данные изменились
+# через ProductService / OrderService (справочник помечается устаревшим).
+import os
+import time
+
+from PySide6.QtCore import QObject, Qt, Signal
+from PySide6.QtGui import QStandardItem, QStandardItemModel
+from PySide6.QtWidgets import QComboBox
+
+from order_service import OrderService
+from product_service import ProductService
+
+REFERENCE_DATA_TTL = int(os.getenv("REFERENCE_DATA_TTL", "300"))  # секунд
+
+# Базовые значения для формы товара (дополняются значениями из БД)
+DEFAULT_CATEGORIES = ["Кроссовки", "Туфли", "Ботинки", "Сапоги", "Тапочки",
+                      "Сандалии", "Мокасины", "Босоножки", "Слипоны"]
+DEFAULT_MANUFACTURERS = ["Nike", "Adidas", "Reebok", "Puma", "New Balance",
+                         "Geox", "Ecco", "Clarks", "Salomon", "Timberland"]
+
+# Какие справочники зависят от изменений товаров и заказов
+PRODUCT_SETS = ("suppliers", "categories", "manufacturers", "products")
+ORDER_SETS = ("pickup_points",)
+# Пользователи в приложении не редактируются - только перечитывание по TTL
+USER_SETS = ("customers",)
+
+_store = None
+
+
+class ReferenceDataStore(QObject):
+    """Общие модели справочников для выпадающих списков всех окон"""
+    refreshed = Signal(str)  # Имя перечитанного справочника
+
+    def __init__(self, ttl=REFERENCE_DATA_TTL, parent=None):
+        super().__init__(parent)
+        self.ttl = ttl
+        self._models = {name: QStandardItemModel(self) for name in PRODUCT_SETS + ORDER_SETS + USER_SETS}
+        self._loaded_at = {}
+        self._stale = set(self._models)
+        self._bound = {name: [] for name in self._models}  # Выпадающие списки на каждой модели
+
+        # Слушатели могут вызываться из любого потока - они только помечают справочник
+        ProductService.add_change_listener(self._on_product_changed)
+        OrderService.add_change_listener(self._on_order_changed)
+
+    # === Доступ ===
+    def model(self, name):
+        """Модель справочника (перечитывается, если устарела)"""
+        if self._needs_refresh(name):
+            self.refresh(name)
+        return self._models[name]
+
+    def bind_combo(self, combo, name):
+        """Подключает QComboBox к общей модели справочника.
+        Введенный вручную текст не добавляется в общую модель."""
+        combo.setModel(self.model(name))
+        combo.setInsertPolicy(QComboBox.NoInsert)
+        combo.setCurrentIndex(-1)
+        # Выбор в списке сохраняется при перечитывании справочника (см. _set_items)
+        self._bound[name].append(combo)
+        combo.destroyed.connect(lambda *_: self._bound[name].remove(combo))
+
+    def invalidate(self, *names):
+        self._stale.update(names or self._models)
+
+    def _needs_refresh(self, name):
+        if name in self._stale:
+            return True
+        return time.monotonic() - self._loaded_at.get(name, 0) > self.ttl
+
+    # === Загрузка ===
+    def refresh(self, name):
+        """Перечитывает справочник из БД; модель меняется, только если данные другие"""
+        if name in ("suppliers", "categories", "manufacturers"):
+            # Три справочника товаров - одним запросом GROUPING SETS
+            facets = ProductService.get_facets()
+            self._set_items("suppliers", [(value, value) for value, _ in facets["supplier"]])
+            self._set_items("categories", self._with_defaults(facets["category"], DEFAULT_CATEGORIES))
+            self._set_items("manufacturers", self._with_defaults(facets["manufacturer"], DEFAULT_MANUFACTURERS))
+            for loaded in ("suppliers", "categories", "manufacturers"):
+                self._mark_loaded(loaded)
+        elif name == "products":
+            self._set_items("products", [(f"{article} - {product_name}", article)
+                                         for article, product_name in ProductService.get_product_choices()])
+            self._mark_loaded(name)
+        elif name == "pickup_points":
+            self._set_items("pickup_points", [(point.address, point.id)
+                                              for point in OrderService.get_all_pickup_points()
+                                              if point.address])
+            self._mark_loaded(name)
+        elif name == "customers":
+            self._set_items("customers", [(full_name or f"Пользователь #{user_id}", user_id)
+                                          for user_id, full_name in OrderService.get_customer_choices()])
+            self._mark_loaded(name)
+
+    def _mark_loaded(self, name):
+        self._stale.discard(name)
+        self._loaded_at[name] = time.monotonic()
+        self.refreshed.emit(name)
+
+    @staticmethod
+    def _with_defaults(facet_values, defaults):
+        values = list(defaults)
+        values.extend(value for value, _ in facet_values if value not in defaults)
+        return [(value, value) for value in values]
+
+    def _set_items(self, name, items):
+        model = self._models[name]
+        current = [(model.item(row).text(), model.item(row).data(Qt.UserRole))
+                   for row in range(model.rowCount())]
+        if current == items:
+            return
+
+        # clear() сбрасывает текущий элемент во всех привязанных списках - запоминаем
+        # выбор (и введенный вручную текст) и восстанавливаем его после перезаполнения
+        combos = self._bound[name]
+        selections = [(combo.currentIndex(), combo.currentData(), combo.currentText()) for combo in combos]
+        for combo in combos:
+            combo.blockSignals(True)
+        try:
+            model.clear()
+            for text, value in items:
+                item = QStandardItem(text)
+                item.setData(value, Qt.UserRole)
+                model.appendRow(item)
+            for combo, (index, value, text) in zip(combos, selections):
+                combo.setCurrentIndex(combo.findData(value) if index >= 0 else -1)
+                if combo.isEditable():
+                    combo.setEditText(text)
+        finally:
+            for combo in combos:
+                combo.blockSignals(False)
+
+        # Выбранное значение исчезло из справочника - выбор действительно изменился
+        for combo, (index, _, _) in zip(combos, selections):
+            if index >= 0 and combo.currentIndex() < 0:
+                combo.currentIndexChanged.emit(-1)
+
+    # === Инвалидация ===
+    def _on_product_changed(self, action, article, product):
+        self.invalidate(*PRODUCT_SETS)
+
+    def _on_order_changed(self, action, order_id, order):
+        self.invalidate(*ORDER_SETS)
+
+
+def reference_data():
+    """Хранилище справочников на все приложение (создается при первом обращении)"""
+    global _store
+    if _store is None:
+        _store = ReferenceDataStore()
+    return _store